@@ -0,0 +1,168 @@
+"""生成基准测试用的合成数据文件
+
+python -m benchmarks.generate_data out.csv --rows 100000 --cols 20 --empty-ratio 0.1
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# 各列类型的默认占比
+DEFAULT_TYPE_MIX = {
+    'int': 3,
+    'decimal': 2,
+    'date': 1,
+    'datetime': 1,
+    'text': 2,
+    'cjk': 2,
+    'mixed': 1
+}
+
+# XLS 格式单个工作表的最大行数（含表头）
+XLS_MAX_ROWS = 65536
+
+_CJK_WORDS = np.array([
+    '北京', '上海', '广州', '深圳', '杭州', '成都', '有限公司', '科技', '贸易', '销售',
+    '数据', '客户', '订单', '发票', '仓库', '华东', '华南', '备注', '退货', '张三', '李四'
+])
+_ASCII_WORDS = np.array([
+    'alpha', 'beta', 'gamma', 'delta', 'order', 'customer', 'invoice', 'north', 'south', 'misc'
+])
+
+
+def parse_type_mix(text):
+    """解析 int=3,text=1 形式的类型占比"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_TYPE_MIX:
+            raise ValueError(f"未知的列类型: {name}，可选: {', '.join(DEFAULT_TYPE_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _join_words(rng, words, rows, count):
+    picks = rng.choice(words, size=(count, rows))
+    result = picks[0].astype(object)
+    for part in picks[1:]:
+        result = result + part.astype(object)
+    return result
+
+
+def _column_values(rng, kind, rows):
+    """返回 (字符串列, Excel 中写入的原始值列)"""
+    if kind == 'int':
+        values = rng.integers(-1_000_000, 1_000_000, rows)
+        return values.astype(str).astype(object), values.tolist()
+    if kind == 'decimal':
+        values = rng.integers(0, 10_000_000, rows) / 100
+        return np.char.mod('%.2f', values).astype(object), values.tolist()
+    if kind in ('date', 'datetime'):
+        base = np.datetime64('2020-01-01T00:00:00')
+        unit = 86400 if kind == 'date' else 1
+        stamps = pd.to_datetime(base + rng.integers(0, 5 * 365 * 86400 // unit, rows) * np.timedelta64(unit, 's'))
+        fmt = '%Y-%m-%d' if kind == 'date' else '%Y-%m-%d %H:%M:%S'
+        values = stamps.strftime(fmt).to_numpy(dtype=object)
+        return values, values.tolist()
+    if kind == 'text':
+        values = _join_words(rng, _ASCII_WORDS, rows, 2) + rng.integers(0, 1000, rows).astype(str).astype(object)
+        return values, values.tolist()
+    if kind == 'cjk':
+        values = _join_words(rng, _CJK_WORDS, rows, 3)
+        return values, values.tolist()
+    # mixed：前半部分是整数，后半部分混入文本，类型推断需要扫描到最后才能确定
+    values = rng.integers(0, 100_000, rows).astype(str).astype(object)
+    values[rows // 2:] = 'x' + values[rows // 2:]
+    return values, values.tolist()
+
+
+def generate_table(rows, cols, type_mix=None, empty_ratio=0.0, seed=0):
+    """生成合成表格
+
+    返回 (df, raw)：df 的各列均为字符串，用于写 CSV；raw 为按列保存的原始值，
+    数字列保留为数字，用于写 XLSX/XLS。空单元格在 df 中为空字符串，在 raw 中为 None。
+    """
+    rng = np.random.default_rng(seed)
+    type_mix = type_mix or DEFAULT_TYPE_MIX
+    names = list(type_mix)
+    weights = np.array([type_mix[name] for name in names], dtype=float)
+    kinds = rng.choice(names, size=cols, p=weights / weights.sum())
+
+    data = {}
+    raw = []
+    for i, kind in enumerate(kinds):
+        values, raw_values = _column_values(rng, kind, rows)
+        if empty_ratio > 0:
+            empty = np.flatnonzero(rng.random(rows) < empty_ratio)
+            values[empty] = ''
+            for j in empty:
+                raw_values[j] = None
+        data[f'{kind}_{i}'] = values
+        raw.append(raw_values)
+    return pd.DataFrame(data, dtype=object), raw
+
+
+def _write_xlsx(path, columns, raw):
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    for row in zip(*raw):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def _write_xls(path, columns, raw):
+    try:
+        import xlwt
+    except ImportError:
+        raise RuntimeError("生成 XLS 文件需要安装 xlwt（pip install xlwt）")
+    if raw and len(raw[0]) >= XLS_MAX_ROWS:
+        raise ValueError(f"XLS 格式最多 {XLS_MAX_ROWS - 1} 行数据")
+    workbook = xlwt.Workbook(encoding='utf-8')
+    sheet = workbook.add_sheet('Sheet1')
+    for j, name in enumerate(columns):
+        sheet.write(0, j, name)
+    for i, row in enumerate(zip(*raw), start=1):
+        for j, value in enumerate(row):
+            if value is not None:
+                sheet.write(i, j, value)
+    workbook.save(path)
+
+
+def write_table(path, df, raw):
+    """按扩展名写出 CSV/XLSX/XLS 文件"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        df.to_csv(path, index=False, encoding='utf-8')
+    elif ext == '.xlsx':
+        _write_xlsx(path, list(df.columns), raw)
+    elif ext == '.xls':
+        _write_xls(path, list(df.columns), raw)
+    else:
+        raise ValueError(f"不支持的文件格式: {ext}")
+    return path
+
+
+def generate_file(path, rows, cols, type_mix=None, empty_ratio=0.0, seed=0):
+    df, raw = generate_table(rows, cols, type_mix, empty_ratio, seed)
+    return write_table(path, df, raw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成基准测试用的合成 CSV/XLSX/XLS 文件")
+    parser.add_argument('path', help="输出文件，扩展名决定格式")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--cols', type=int, default=20)
+    parser.add_argument('--type-mix', type=parse_type_mix, default=None,
+                        help="列类型占比，例如 int=3,decimal=1,cjk=2")
+    parser.add_argument('--empty-ratio', type=float, default=0.05, help="空单元格比例")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate_file(args.path, args.rows, args.cols, args.type_mix, args.empty_ratio, args.seed)
+    print(f"已生成 {args.path}")
+
+
+if __name__ == '__main__':
+    main()
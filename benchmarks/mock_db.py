@@ -0,0 +1,114 @@
+"""记录数据库调用的模拟连接，在没有 MariaDB 的环境中运行基准测试
+
+install() 替换 mysql.connector.connect，之后导入流程建立的所有连接（包括并行写入线程的连接）
+都会把调用记录到同一个 MockDatabase 中。模拟连接不保存数据，只统计语句、行数和提交次数，
+测得的写入耗时只包含客户端的数据准备，不包含网络和服务器开销。
+"""
+import threading
+import mysql.connector
+
+
+class MockCursor:
+    def __init__(self, database):
+        self._database = database
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self._result = []
+        self._database.record_execute(sql)
+        if sql.startswith('LOAD DATA'):
+            # 与服务器一样读取整个文件，统计导入的行数
+            with open(params[0], 'rb') as f:
+                self._database.record_rows(sum(1 for _ in f), load_data=True)
+        elif sql.startswith('SHOW GLOBAL VARIABLES'):
+            self._result = [('local_infile', 'ON')]
+        elif sql.startswith('SELECT @@max_allowed_packet'):
+            self._result = [(16 * 1024 * 1024,)]
+        elif 'information_schema.tables' in sql:
+            self._result = [(0,)]
+
+    def executemany(self, sql, rows):
+        self._database.record_rows(len(rows))
+
+    def fetchall(self):
+        result, self._result = self._result, []
+        return result
+
+    def fetchmany(self, size=1):
+        result, self._result = self._result[:size], self._result[size:]
+        return result
+
+    def fetchone(self):
+        return self._result.pop(0) if self._result else None
+
+    def close(self):
+        pass
+
+
+class MockConnection:
+    def __init__(self, database):
+        self._database = database
+        self._connected = True
+
+    def cursor(self, *args, **kwargs):
+        return MockCursor(self._database)
+
+    def commit(self):
+        self._database.record_commit()
+
+    def rollback(self):
+        pass
+
+    def is_connected(self):
+        return self._connected
+
+    def close(self):
+        self._connected = False
+
+
+class MockDatabase:
+    """汇总所有模拟连接上的调用"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.statements = []
+        self.executemany_calls = 0
+        self.load_data_calls = 0
+        self.rows = 0
+        self.commits = 0
+
+    def connect(self, **kwargs):
+        with self._lock:
+            self.connections += 1
+        return MockConnection(self)
+
+    def record_execute(self, sql):
+        with self._lock:
+            self.statements.append(sql)
+
+    def record_rows(self, count, load_data=False):
+        with self._lock:
+            if load_data:
+                self.load_data_calls += 1
+            else:
+                self.executemany_calls += 1
+            self.rows += count
+
+    def record_commit(self):
+        with self._lock:
+            self.commits += 1
+
+    def install(self):
+        mysql.connector.connect = self.connect
+        return self
+
+    def stats(self):
+        with self._lock:
+            return {
+                'connections': self.connections,
+                'executemany_calls': self.executemany_calls,
+                'load_data_calls': self.load_data_calls,
+                'rows': self.rows,
+                'commits': self.commits
+            }
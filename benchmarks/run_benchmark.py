@@ -0,0 +1,261 @@
+"""导入流程基准测试
+
+python -m benchmarks.run_benchmark --rows 200000 --cols 20 --formats csv,xlsx
+python -m benchmarks.run_benchmark --save-baseline      # 记录基准
+python -m benchmarks.run_benchmark                      # 与基准比较，变慢超过阈值时返回 1
+python -m benchmarks.run_benchmark --ci                 # 同上，基准文件不存在或缺少场景时也返回 1
+
+仓库中的 baseline.json 用默认参数在模拟连接上生成，运行环境记录在其中的 _environment 项，
+在其他机器上比较前应先用 --save-baseline 重新生成。
+
+默认使用 mock_db 中的模拟连接；指定 --db-host 时连接本地 MariaDB（目标库中的同名表会被重建）。
+--backend sqlite/duckdb/parquet 时写入临时目录中的本地数据库，不需要数据库服务器也能测得包括写入在内的完整耗时：
+python -m benchmarks.run_benchmark --backend sqlite --formats csv
+每个场景在独立的子进程中运行，因此峰值内存互不影响。
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from modules.metrics import PHASES
+from modules.backends import BACKEND_MARIADB, BACKENDS, LOCAL_BACKEND_EXTENSIONS
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# 默认变慢超过 10% 视为退化；小于 NOISE_SECONDS 的差异视为测量误差
+DEFAULT_THRESHOLD = 0.10
+NOISE_SECONDS = 0.05
+# 基准文件中记录运行环境和参数的项，不是场景
+ENVIRONMENT_KEY = '_environment'
+
+
+def _run_import(path, options, db, queue):
+    """子进程中执行一次导入，通过 queue 返回结果"""
+    try:
+        from benchmarks.mock_db import MockDatabase
+        from modules.job_manager import ImportJob
+        from modules.metrics import peak_rss
+        import xlsx2table
+
+        mock = None
+        if db is None:
+            mock = MockDatabase().install()
+            db = dict(host='localhost', port=3306, user='bench', password='', database='bench')
+        job = ImportJob(os.path.basename(path))
+        xlsx2table.excel2mariadb_with_progress(
+            path, db['user'], db['password'], db['host'], db['database'], db['port'], job=job, **options
+        )
+        if job.progress.get('status') == "导入失败":
+            raise RuntimeError(job.progress.get('message'))
+
+        report = job.metrics.report()
+        queue.put({
+            'phases': {phase: report['phases'].get(phase, 0.0) for phase in PHASES},
+            'total': report['elapsed_seconds'],
+            # 每次运行都在新进程中，进程的内存峰值就是本次导入的峰值
+            'peak_rss_mb': peak_rss() / (1024 * 1024) or None,
+            'db': mock.stats() if mock else None
+        })
+    except Exception as e:
+        queue.put({'error': f'{type(e).__name__}: {e}'})
+
+
+def run_scenario(path, options, db=None, repeat=1):
+    """运行 repeat 次，各项指标取中位数"""
+    ctx = multiprocessing.get_context('spawn')
+    runs = []
+    for _ in range(repeat):
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_import, args=(path, options, db, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        if 'error' in result:
+            return result
+        runs.append(result)
+
+    def median(values):
+        values = [value for value in values if value is not None]
+        return statistics.median(values) if values else None
+
+    return {
+        'phases': {name: median(run['phases'][name] for run in runs) for name in PHASES},
+        'total': median(run['total'] for run in runs),
+        'peak_rss_mb': median(run['peak_rss_mb'] for run in runs),
+        'db': runs[-1]['db']
+    }
+
+
+def local_database(args, db_dir):
+    """本地后端的数据库文件（parquet 为目录），导入时重建同名的表"""
+    path = os.path.join(db_dir, f'bench{LOCAL_BACKEND_EXTENSIONS[args.backend]}')
+    return dict(host='', port='', user='', password='', database=path)
+
+
+def build_scenarios(args, data_dir):
+    from benchmarks.generate_data import generate_table, write_table
+    df, raw = generate_table(args.rows, args.cols, args.type_mix, args.empty_ratio, args.seed)
+    scenarios = []
+    for fmt in args.formats:
+        path = write_table(os.path.join(data_dir, f'bench_{args.rows}x{args.cols}.{fmt}'), df, raw)
+        for streaming in ([False, True] if args.streaming == 'both' else [args.streaming == 'on']):
+            name = f"{fmt}-{args.rows}x{args.cols}-{args.write_method}" + ('-stream' if streaming else '')
+            if args.backend != BACKEND_MARIADB:
+                name += f'-{args.backend}'
+            options = dict(streaming=streaming, write_method=args.write_method, write_workers=args.write_workers,
+                           backend=args.backend)
+            scenarios.append((name, path, options))
+    return scenarios
+
+
+def compare(results, baseline, threshold):
+    """返回退化项列表 [(场景, 指标, 基准值, 当前值)]"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or 'error' in result or 'error' in base:
+            continue
+        metrics = [(phase, base['phases'].get(phase), result['phases'][phase]) for phase in PHASES]
+        metrics.append(('total', base['total'], result['total']))
+        for metric, old, new in metrics:
+            if old is not None and new > old * (1 + threshold) and new - old > NOISE_SECONDS:
+                regressions.append((name, metric, old, new))
+        old_rss, new_rss = base.get('peak_rss_mb'), result['peak_rss_mb']
+        if old_rss and new_rss and new_rss > old_rss * (1 + threshold):
+            regressions.append((name, 'peak_rss_mb', old_rss, new_rss))
+    return regressions
+
+
+def print_results(results, baseline, rows):
+    header = f"{'scenario':<44}" + ''.join(f'{name:>10}' for name in PHASES) + f"{'total':>10}{'rows/s':>12}{'peak MB':>10}"
+    print(header)
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:<44}  失败: {result['error']}")
+            continue
+        line = f"{name:<44}" + ''.join(f"{result['phases'][phase]:>10.3f}" for phase in PHASES)
+        rss = result['peak_rss_mb']
+        line += f"{result['total']:>10.3f}{rows / max(result['total'], 1e-9):>12.0f}{rss if rss is not None else 0:>10.1f}"
+        print(line)
+        base = baseline.get(name)
+        if base and 'error' not in base:
+            print(f"{'  vs baseline':<44}" + ''.join(
+                f"{_ratio(base['phases'].get(phase), result['phases'][phase]):>10}" for phase in PHASES
+            ) + f"{_ratio(base['total'], result['total']):>10}")
+
+
+def _ratio(old, new):
+    if not old:
+        return '-'
+    return f'{new / old:.2f}x'
+
+
+def environment(args):
+    """基准的运行环境和数据参数，不同机器上的耗时不能直接比较"""
+    import pandas as pd
+
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'args': {name: getattr(args, name) for name in ('rows', 'cols', 'type_mix', 'empty_ratio', 'seed', 'formats',
+                                                        'streaming', 'write_method', 'write_workers', 'repeat',
+                                                        'backend')},
+        'database': 'MariaDB' if args.db_host else 'mock' if args.backend == BACKEND_MARIADB else args.backend
+    }
+
+
+def main():
+    from benchmarks.generate_data import DEFAULT_TYPE_MIX, parse_type_mix
+
+    parser = argparse.ArgumentParser(description="导入流程基准测试")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--cols', type=int, default=20)
+    parser.add_argument('--type-mix', type=parse_type_mix, default=DEFAULT_TYPE_MIX)
+    parser.add_argument('--empty-ratio', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--formats', type=lambda s: s.split(','), default=['csv', 'xlsx'],
+                        help="逗号分隔的文件格式：csv,xlsx,xls（xls 需要 xlwt）")
+    parser.add_argument('--streaming', choices=['off', 'on', 'both'], default='off')
+    parser.add_argument('--write-method', choices=['executemany', 'load_data'], default='executemany')
+    parser.add_argument('--write-workers', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', help="生成文件的目录，默认使用临时目录")
+    parser.add_argument('--backend', choices=BACKENDS, default=BACKEND_MARIADB,
+                        help="写入后端，sqlite/duckdb/parquet 写入临时目录中的本地数据库")
+    parser.add_argument('--db-host', help="指定后连接真实的 MariaDB，否则使用模拟连接")
+    parser.add_argument('--db-port', type=int, default=3306)
+    parser.add_argument('--db-user', default='root')
+    parser.add_argument('--db-password', default='')
+    parser.add_argument('--db-name', default='test')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果写入基准文件")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--output', help="把本次结果另存为 JSON")
+    parser.add_argument('--ci', action='store_true', help="基准文件不存在或缺少本次运行的场景时返回 1")
+    args = parser.parse_args()
+
+    db = None
+    if args.db_host:
+        db = dict(host=args.db_host, port=args.db_port, user=args.db_user,
+                  password=args.db_password, database=args.db_name)
+
+    with tempfile.TemporaryDirectory(prefix='xlsx2table_bench_') as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        if args.backend != BACKEND_MARIADB:
+            db = local_database(args, tmp_dir)
+        results = {}
+        for name, path, options in build_scenarios(args, data_dir):
+            print(f"运行 {name} ...", flush=True)
+            results[name] = run_scenario(path, options, db, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print()
+    print_results(results, baseline, args.rows)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        saved.update(results)
+        saved[ENVIRONMENT_KEY] = environment(args)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, ensure_ascii=False, indent=2)
+        print(f"\n已写入基准: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\n未找到基准文件 {args.baseline}，使用 --save-baseline 生成")
+        return 1 if args.ci else 0
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"\n基准中没有以下场景: {', '.join(missing)}")
+        if args.ci:
+            return 1
+    if ENVIRONMENT_KEY in baseline:
+        print(f"\n基准的运行环境: {json.dumps(baseline[ENVIRONMENT_KEY], ensure_ascii=False)}")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n以下指标比基准慢超过 {args.threshold:.0%}:")
+        for name, metric, old, new in regressions:
+            print(f"  {name} {metric}: {old:.3f} -> {new:.3f}")
+        return 1
+    print("\n没有发现性能退化")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,660 @@
+import os
+import abc
+import sqlite3
+import pandas as pd
+import mysql.connector
+from werkzeug.utils import secure_filename
+from modules.db_writer import (WRITE_METHOD_EXECUTEMANY, WRITE_METHOD_LOAD_DATA, connect_options, create_writer,
+                               create_spool_dir, remove_spool_dir, apply_bulk_session, restore_session,
+                               table_exists, server_max_allowed_packet, swap_in_staging_table, global_tuning)
+from modules.incremental import (ROW_HASH_COLUMN, ROW_HASH_TYPE, UNIQUE_KEY_NAME, existing_columns, has_unique_key,
+                                 fetch_row_hashes)
+from modules.schema_options import validate_indexes, deferred_index_sql, index_name
+from modules.table_ddl import fit_row_size, create_table_sql
+from modules.logical_types import (KIND_STRING, KIND_TEXT, KIND_INTEGER, KIND_BIGINT, KIND_DECIMAL, KIND_DOUBLE,
+                                   KIND_DATE, KIND_DATETIME, parse_column_type, mariadb_type)
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
+# 写入后端：mariadb 为 MariaDB/MySQL 服务器；sqlite、duckdb 写入本地数据库文件；
+# parquet 在内存中的 DuckDB 里导入，完成后每个表写成一个 Parquet 文件
+BACKEND_MARIADB = 'mariadb'
+BACKEND_SQLITE = 'sqlite'
+BACKEND_DUCKDB = 'duckdb'
+BACKEND_PARQUET = 'parquet'
+BACKENDS = (BACKEND_MARIADB, BACKEND_SQLITE, BACKEND_DUCKDB, BACKEND_PARQUET)
+# 本地后端的数据库文件扩展名，parquet 的“数据库”是一个目录
+LOCAL_BACKEND_EXTENSIONS = {BACKEND_SQLITE: '.sqlite', BACKEND_DUCKDB: '.duckdb', BACKEND_PARQUET: ''}
+# 本地数据库文件的默认目录
+DEFAULT_LOCAL_DB_DIR = './localdb'
+# 还没有实测吞吐量时预览使用的各后端写入速度（行/秒，不包括转换），只用于粗略估计导入耗时
+DEFAULT_WRITE_ROWS_PER_SECOND = {BACKEND_MARIADB: 20000, BACKEND_SQLITE: 100000, BACKEND_DUCKDB: 300000,
+                                 BACKEND_PARQUET: 300000}
+
+# SQLite 同一时间只允许一个写入事务，等待其他任务提交的最长时间（秒）
+SQLITE_BUSY_TIMEOUT = 600
+# SQLite 批量导入时的设置：加大页缓存；tuning 为 True 时不等待数据写入磁盘，导入结束后恢复
+SQLITE_BULK_PRAGMAS = (('cache_size', -256 * 1024),)
+SQLITE_TUNING_PRAGMAS = (('synchronous', 0),)
+# DuckDB 写入时注册的批次视图名
+DUCKDB_BATCH_VIEW = 'xlsx2table_batch'
+# 写入 Parquet 文件时使用的压缩方式
+PARQUET_COMPRESSION = 'zstd'
+# 写入方式：DuckDB 把整个批次作为 DataFrame 一次插入
+WRITE_METHOD_APPEND = 'append'
+
+# 所有后端的数据库错误，导入时统一按数据库错误报告
+DATABASE_ERRORS = (mysql.connector.Error, sqlite3.Error) + ((duckdb.Error,) if HAS_DUCKDB else ())
+
+
+def local_database_path(directory, backend, database):
+    """本地后端的数据库文件（parquet 为目录）路径，只使用 database 中安全的文件名部分"""
+    name = secure_filename(database or '')
+    if not name:
+        raise ValueError("请填写数据库文件名")
+    extension = LOCAL_BACKEND_EXTENSIONS[backend]
+    if extension and not name.lower().endswith(extension):
+        name += extension
+    return os.path.abspath(os.path.join(directory, name))
+
+
+def create_backend(backend, username, password, host, database, port, write_method=WRITE_METHOD_EXECUTEMANY):
+    """按名称创建写入后端；本地后端的 database 为数据库文件（parquet 为输出目录）路径，其余连接参数不使用"""
+    if backend == BACKEND_MARIADB:
+        return MariaDBBackend(username, password, host, database, port, write_method)
+    if backend == BACKEND_SQLITE:
+        return SQLiteBackend(database)
+    if backend in (BACKEND_DUCKDB, BACKEND_PARQUET):
+        if not HAS_DUCKDB:
+            raise ValueError(f"{backend} 后端需要安装 duckdb（pip install duckdb）")
+        return DuckDBBackend(database) if backend == BACKEND_DUCKDB else ParquetBackend(database)
+    raise ValueError(f"不支持的写入后端: {backend}，可选值为 {', '.join(BACKENDS)}")
+
+
+def ddl_backend(backend):
+    """只用于生成建表语句的后端，不需要连接参数，也不连接数据库（预览使用）"""
+    return create_backend(backend, None, None, None, '', 0)
+
+
+def _quote(name):
+    """SQLite 和 DuckDB 用双引号括起标识符"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _backquote(name):
+    """MariaDB 用反引号括起标识符"""
+    return '`' + str(name).replace('`', '``') + '`'
+
+
+def _column_list(columns, quote):
+    return ", ".join(quote(col) for col in columns)
+
+
+def _local_create_table_sql(table_name, column_names, column_types, primary_key, unique_key, extra_columns,
+                            render_type):
+    definitions = [f'{_quote(col)} {render_type(column_type)}' for col, column_type in zip(column_names, column_types)]
+    definitions += [f'{_quote(col)} {render_type(column_type)}' for col, column_type in extra_columns]
+    if primary_key:
+        definitions.append(f'PRIMARY KEY ({_column_list(primary_key, _quote)})')
+    if unique_key:
+        name, columns = unique_key
+        definitions.append(f'CONSTRAINT {_quote(name)} UNIQUE ({_column_list(columns, _quote)})')
+    return f'CREATE TABLE {_quote(table_name)} ({", ".join(definitions)})'
+
+
+class Backend(abc.ABC):
+    """写入后端的基类，导入流程只通过这里定义的接口建表、写入和提交
+
+    子类实现连接、表结构查询、建表和写入；删除表、行哈希、类型检查和临时表替换在这里统一实现，
+    由类属性区分各后端的限制。
+    """
+
+    name = None
+    # 可以用多个连接并行写入同一个表
+    parallel_writes = False
+    # 支持先导入临时表，完成后替换目标表
+    staging = True
+    # 提交后的数据已持久保存，可以记录检查点
+    durable = True
+    # 行哈希按有符号 64 位整数保存
+    signed_row_hash = False
+    # 新增的行哈希列的类型
+    row_hash_type = 'BIGINT'
+    # 有行大小限制，过长的 VARCHAR 列要转为 TEXT
+    row_size_limited = False
+    # 索引长度有限制，TEXT 列不能建唯一索引
+    index_length_limited = False
+    write_method = WRITE_METHOD_EXECUTEMANY
+    quote = staticmethod(_quote)
+
+    @abc.abstractmethod
+    def connect(self, buffered=False):
+        """打开一个写入连接"""
+
+    @abc.abstractmethod
+    def table_exists(self, cursor, table_name):
+        """表是否存在"""
+
+    @abc.abstractmethod
+    def existing_columns(self, cursor, table_name):
+        """已有的表的 [(列名, MariaDB 写法的列类型)]"""
+
+    @abc.abstractmethod
+    def has_unique_key(self, cursor, table_name, key_columns):
+        """表中是否已有恰好由 key_columns 组成的主键或唯一索引"""
+
+    @abc.abstractmethod
+    def add_unique_key(self, cursor, table_name, key_columns):
+        """为按键更新的键列加上唯一索引"""
+
+    @abc.abstractmethod
+    def create_table_sql(self, table_name, column_names, column_types, primary_key=None, unique_key=None,
+                         extra_columns=(), table_options=None):
+        """建表语句，column_types 为类型推断得到的 MariaDB 写法的列类型"""
+
+    @abc.abstractmethod
+    def apply_bulk_session(self, cursor, upsert=False, tuning=False):
+        """批量导入前修改会话设置，返回 restore_session 恢复时需要的原值"""
+
+    @abc.abstractmethod
+    def restore_session(self, cursor, tuning=()):
+        """提交并恢复 apply_bulk_session 修改的设置"""
+
+    @abc.abstractmethod
+    def create_writer(self, cursor, table_name, column_names, upsert=False, key_columns=None):
+        """返回写入转换后的行的写入器，write(rows) 写入一个批次"""
+
+    def close_connection(self, conn):
+        conn.close()
+
+    def max_packet_bytes(self, cursor):
+        """单条语句允许的最大字节数，没有限制时返回 None"""
+        return None
+
+    def drop_table(self, cursor, table_name):
+        cursor.execute(f'DROP TABLE IF EXISTS {self.quote(table_name)}')
+
+    def add_row_hash_column(self, cursor, table_name):
+        cursor.execute(f'ALTER TABLE {self.quote(table_name)} ADD COLUMN {self.quote(ROW_HASH_COLUMN)} '
+                       f'{self.row_hash_type}')
+
+    def load_row_hashes(self, cursor, table_name):
+        """读取目标表中已有的行哈希，返回排好序的 uint64 数组"""
+        column = self.quote(ROW_HASH_COLUMN)
+        cursor.execute(f'SELECT {column} FROM {self.quote(table_name)} WHERE {column} IS NOT NULL')
+        return fetch_row_hashes(cursor, signed=self.signed_row_hash)
+
+    def validate_key_types(self, column_names, column_types):
+        """键列和主键列要建唯一索引，索引长度有限制时不能是 TEXT"""
+        if not self.index_length_limited:
+            return
+        for col, column_type in zip(column_names, column_types):
+            if 'TEXT' in column_type:
+                raise ValueError(f"键列 {col} 的值过长，无法建立唯一索引")
+
+    def validate_indexes(self, indexes, column_types):
+        """在写入数据之前检查二级索引能否建立，column_types 为 {小写列名: 列类型}"""
+        if self.index_length_limited:
+            validate_indexes(indexes, column_types)
+
+    def fit_column_types(self, column_types, keep=()):
+        """有行大小限制时参见 table_ddl.fit_row_size，否则返回 (列类型, None, [])"""
+        if self.row_size_limited:
+            return fit_row_size(column_types, keep)
+        return list(column_types), None, []
+
+    def tune_server(self, cursor):
+        pass
+
+    def create_indexes(self, cursor, load_table, table_name, indexes, column_types):
+        """在 load_table 上建好缺少的二级索引
+
+        索引名加上目标表名，在整个数据库中唯一的后端（SQLite）也不会与其他表的索引重名。
+        """
+        for index in indexes:
+            kind = 'UNIQUE INDEX' if index['unique'] else 'INDEX'
+            name = self.quote(f'{table_name}__{index_name(index)}')
+            cursor.execute(f'CREATE {kind} IF NOT EXISTS {name} '
+                           f'ON {self.quote(load_table)} ({_column_list(index["columns"], self.quote)})')
+
+    def replace_table(self, cursor, load_table, table_name):
+        """删除目标表后把临时表改名为目标表"""
+        cursor.execute(f'DROP TABLE IF EXISTS {self.quote(table_name)}')
+        cursor.execute(f'ALTER TABLE {self.quote(load_table)} RENAME TO {self.quote(table_name)}')
+
+    def finish_table(self, cursor, load_table, table_name, indexes, column_types):
+        """数据全部写入后在临时表上建好二级索引，使用临时表时再替换目标表"""
+        self.create_indexes(cursor, load_table, table_name, indexes, column_types)
+        if load_table != table_name:
+            self.replace_table(cursor, load_table, table_name)
+
+    def close(self):
+        pass
+
+
+class MariaDBBackend(Backend):
+    """MariaDB/MySQL 服务器，即原有的写入方式
+
+    支持 LOAD DATA、多连接并行写入、临时表原子替换、行大小调整、表选项和批量导入调优。
+    """
+
+    name = BACKEND_MARIADB
+    parallel_writes = True
+    row_hash_type = f'{ROW_HASH_TYPE} NULL'
+    # InnoDB 有行大小限制，索引长度也有限制
+    row_size_limited = True
+    index_length_limited = True
+    quote = staticmethod(_backquote)
+
+    def __init__(self, username, password, host, database, port, write_method=WRITE_METHOD_EXECUTEMANY):
+        port = int(port)
+        self.write_method = write_method
+        self.spool_dir = create_spool_dir() if write_method == WRITE_METHOD_LOAD_DATA else None
+        self.connect_kwargs = dict(
+            user=username,
+            password=password,
+            host=host,
+            database=database,
+            port=port,
+            charset='utf8mb4',
+            **connect_options(write_method, self.spool_dir)
+        )
+        self._global_tuned = False
+
+    def connect(self, buffered=False):
+        return mysql.connector.connect(buffered=buffered, **self.connect_kwargs)
+
+    def close_connection(self, conn):
+        if conn.is_connected():
+            conn.close()
+
+    def max_packet_bytes(self, cursor):
+        return server_max_allowed_packet(cursor)
+
+    def table_exists(self, cursor, table_name):
+        return table_exists(cursor, table_name)
+
+    def existing_columns(self, cursor, table_name):
+        return existing_columns(cursor, table_name)
+
+    def has_unique_key(self, cursor, table_name, key_columns):
+        return has_unique_key(cursor, table_name, key_columns)
+
+    def add_unique_key(self, cursor, table_name, key_columns):
+        keys = ", ".join(f"`{col}`" for col in key_columns)
+        cursor.execute(f'ALTER TABLE `{table_name}` ADD UNIQUE KEY `{UNIQUE_KEY_NAME}` ({keys})')
+
+    def create_table_sql(self, table_name, column_names, column_types, primary_key=None, unique_key=None,
+                         extra_columns=(), table_options=None):
+        return create_table_sql(table_name, column_names, column_types, primary_key, unique_key, extra_columns,
+                                table_options)
+
+    def apply_bulk_session(self, cursor, upsert=False, tuning=False):
+        return apply_bulk_session(cursor, upsert, tuning)
+
+    def restore_session(self, cursor, tuning=()):
+        restore_session(cursor, tuning)
+
+    def tune_server(self, cursor):
+        """修改全局的批量导入调优设置，close 时恢复"""
+        global_tuning.acquire(cursor)
+        self._global_tuned = True
+
+    def create_writer(self, cursor, table_name, column_names, upsert=False, key_columns=None):
+        return create_writer(self.write_method, cursor, table_name, column_names, self.spool_dir, upsert)
+
+    def create_indexes(self, cursor, load_table, table_name, indexes, column_types):
+        """所有缺少的二级索引用一条 ALTER TABLE 建好，参见 schema_options.deferred_index_sql"""
+        index_sql = deferred_index_sql(cursor, load_table, indexes, column_types)
+        if index_sql:
+            cursor.execute(index_sql)
+
+    def replace_table(self, cursor, load_table, table_name):
+        swap_in_staging_table(cursor, load_table, table_name)
+
+    def close(self):
+        if self._global_tuned:
+            self._global_tuned = False
+            global_tuning.release(self.connect_kwargs)
+        remove_spool_dir(self.spool_dir)
+
+
+class SQLiteWriter:
+    """SQLite 的 executemany，upsert 为 True 时用 INSERT OR REPLACE 替换键相同的行"""
+
+    method = WRITE_METHOD_EXECUTEMANY
+
+    def __init__(self, cursor, table_name, column_names, upsert=False):
+        self.cursor = cursor
+        verb = 'INSERT OR REPLACE' if upsert else 'INSERT'
+        placeholder = ", ".join(["?"] * len(column_names))
+        self.insert_sql = f'{verb} INTO {_quote(table_name)} ({_column_list(column_names, _quote)}) VALUES ({placeholder})'
+
+    def write(self, rows):
+        self.cursor.executemany(self.insert_sql, rows)
+
+
+class SQLiteBackend(Backend):
+    """本地 SQLite 数据库文件，只有一个写入连接
+
+    不需要数据库服务器，可以离线导入和测试吞吐量。DATE/DATETIME 按 ISO 格式的文本保存，
+    DECIMAL 按 NUMERIC 亲和性保存，行哈希按有符号 64 位整数保存。
+    """
+
+    name = BACKEND_SQLITE
+    signed_row_hash = True
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self, buffered=False):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        return sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT)
+
+    @staticmethod
+    def render_type(column_type):
+        """逻辑类型对应的 SQLite 列类型；整数用 INT 而不是 INTEGER，避免单列整数主键成为 rowid 的别名"""
+        logical = parse_column_type(column_type)
+        if logical.kind == KIND_DECIMAL:
+            return f'DECIMAL({logical.precision},{logical.scale})'
+        return {
+            KIND_STRING: 'TEXT',
+            KIND_TEXT: 'TEXT',
+            KIND_INTEGER: 'INT',
+            KIND_BIGINT: 'BIGINT',
+            KIND_DOUBLE: 'REAL',
+            KIND_DATE: 'DATE',
+            KIND_DATETIME: 'DATETIME'
+        }[logical.kind]
+
+    def table_exists(self, cursor, table_name):
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,))
+        return cursor.fetchall()[0][0] > 0
+
+    def existing_columns(self, cursor, table_name):
+        """列类型换回 MariaDB 的写法，与类型推断的结果一致"""
+        cursor.execute(f'PRAGMA table_info({_quote(table_name)})')
+        return [(name, mariadb_type(parse_column_type(column_type)))
+                for _, name, column_type, _, _, _ in cursor.fetchall()]
+
+    def has_unique_key(self, cursor, table_name, key_columns):
+        wanted = {col.lower() for col in key_columns}
+        cursor.execute(f'PRAGMA table_info({_quote(table_name)})')
+        if {row[1].lower() for row in cursor.fetchall() if row[5]} == wanted:
+            return True
+        cursor.execute(f'PRAGMA index_list({_quote(table_name)})')
+        for index in [row[1] for row in cursor.fetchall() if row[2]]:
+            cursor.execute(f'PRAGMA index_info({_quote(index)})')
+            if {row[2].lower() for row in cursor.fetchall()} == wanted:
+                return True
+        return False
+
+    def add_unique_key(self, cursor, table_name, key_columns):
+        # SQLite 的索引名在整个数据库中唯一，加上表名
+        cursor.execute(f'CREATE UNIQUE INDEX {_quote(f"{table_name}__{UNIQUE_KEY_NAME}")} '
+                       f'ON {_quote(table_name)} ({_column_list(key_columns, _quote)})')
+
+    def create_table_sql(self, table_name, column_names, column_types, primary_key=None, unique_key=None,
+                         extra_columns=(), table_options=None):
+        """表选项只适用于 MariaDB，这里忽略"""
+        return _local_create_table_sql(table_name, column_names, column_types, primary_key, unique_key,
+                                       extra_columns, self.render_type)
+
+    def _apply_pragmas(self, cursor, pragmas):
+        applied = []
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}')
+            applied.append((name, cursor.fetchall()[0][0]))
+            cursor.execute(f'PRAGMA {name} = {value}')
+        return applied
+
+    def apply_bulk_session(self, cursor, upsert=False, tuning=False):
+        return self._apply_pragmas(cursor, SQLITE_BULK_PRAGMAS + (SQLITE_TUNING_PRAGMAS if tuning else ()))
+
+    def restore_session(self, cursor, tuning=()):
+        cursor.connection.commit()
+        for name, value in reversed(tuning):
+            cursor.execute(f'PRAGMA {name} = {int(value)}')
+
+    def create_writer(self, cursor, table_name, column_names, upsert=False, key_columns=None):
+        return SQLiteWriter(cursor, table_name, column_names, upsert)
+
+    def finish_table(self, cursor, load_table, table_name, indexes, column_types):
+        """在一个事务中替换目标表并建好二级索引
+
+        SQLite 的索引名在整个数据库中唯一且改表名时不会随之改变，因此索引在替换之后按目标表名创建。
+        """
+        conn = cursor.connection
+        conn.commit()
+        cursor.execute('BEGIN')
+        try:
+            if load_table != table_name:
+                self.replace_table(cursor, load_table, table_name)
+            self.create_indexes(cursor, table_name, table_name, indexes, column_types)
+            cursor.execute('COMMIT')
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+class _DuckDBCursor:
+    """在同一个 DuckDB 连接上执行语句；DuckDB 的 cursor() 会另开一个连接，不在同一个事务中"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.conn = connection.conn
+
+    def execute(self, sql, params=None):
+        self.conn.execute(sql, params or [])
+
+    def executemany(self, sql, rows):
+        self.conn.executemany(sql, rows)
+
+    def fetchall(self):
+        return self.conn.fetchall()
+
+    def fetchmany(self, size=1):
+        return self.conn.fetchmany(size)
+
+    def fetchone(self):
+        return self.conn.fetchone()
+
+    def close(self):
+        pass
+
+
+class _DuckDBConnection:
+    """DuckDB 连接：批量导入期间在显式事务中写入，commit 后立即开始下一个事务，其余时间自动提交"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.in_transaction = False
+
+    def cursor(self):
+        return _DuckDBCursor(self)
+
+    def begin(self):
+        self.conn.begin()
+        self.in_transaction = True
+
+    def commit(self):
+        if self.in_transaction:
+            self.conn.commit()
+            self.conn.begin()
+
+    def end(self):
+        if self.in_transaction:
+            self.conn.commit()
+            self.in_transaction = False
+
+    def close(self):
+        # 未提交的事务随连接关闭回滚
+        self.conn.close()
+
+
+class DuckDBWriter:
+    """把批次作为 DataFrame 注册为视图后用一条 INSERT ... SELECT 插入，由 DuckDB 按列类型转换
+
+    key_columns 不为空时（upsert/diff）先删除键相同的已有行再插入，批次内键相同的行只保留最后一行。
+    """
+
+    method = WRITE_METHOD_APPEND
+
+    def __init__(self, cursor, table_name, column_names, key_columns=None):
+        self.conn = cursor.conn
+        self.names = [f'c{j}' for j in range(len(column_names))]
+        columns = _column_list(column_names, _quote)
+        self.insert_sql = (f'INSERT INTO {_quote(table_name)} ({columns}) '
+                           f'SELECT {", ".join(self.names)} FROM {DUCKDB_BATCH_VIEW}')
+        self.key_names = []
+        self.delete_sql = None
+        if key_columns:
+            by_name = {str(col).lower(): j for j, col in enumerate(column_names)}
+            types = dict(self.conn.execute(
+                "SELECT lower(column_name), data_type FROM information_schema.columns WHERE table_name = ?",
+                [table_name]
+            ).fetchall())
+            self.key_names = [self.names[by_name[col.lower()]] for col in key_columns]
+            conditions = " AND ".join(
+                f'{_quote(table_name)}.{_quote(col)} = CAST({DUCKDB_BATCH_VIEW}.{name} AS {types[col.lower()]})'
+                for col, name in zip(key_columns, self.key_names)
+            )
+            self.delete_sql = f'DELETE FROM {_quote(table_name)} USING {DUCKDB_BATCH_VIEW} WHERE {conditions}'
+
+    def write(self, rows):
+        batch = pd.DataFrame.from_records(rows, columns=self.names)
+        if self.key_names:
+            batch = batch.drop_duplicates(subset=self.key_names, keep='last')
+        self.conn.register(DUCKDB_BATCH_VIEW, batch)
+        try:
+            if self.delete_sql:
+                self.conn.execute(self.delete_sql)
+            self.conn.execute(self.insert_sql)
+        finally:
+            self.conn.unregister(DUCKDB_BATCH_VIEW)
+
+
+class DuckDBBackend(Backend):
+    """本地 DuckDB 数据库文件，按列存储，适合大文件的分析查询
+
+    整批数据由 DuckDB 向量化插入。DuckDB 按数据块的最小值和最大值跳过数据，不建二级索引，
+    也不声明主键和唯一约束（约束检查会拖慢批量写入），按键更新由 DuckDBWriter 先删除再插入完成。
+    带约束或索引的表无法改名，因此不使用临时表。
+    """
+
+    name = BACKEND_DUCKDB
+    staging = False
+    row_hash_type = 'UBIGINT'
+    write_method = WRITE_METHOD_APPEND
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self, buffered=False):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        return _DuckDBConnection(duckdb.connect(self.path))
+
+    @staticmethod
+    def render_type(column_type):
+        logical = parse_column_type(column_type)
+        if logical.kind == KIND_DECIMAL:
+            return f'DECIMAL({logical.precision},{logical.scale})'
+        if logical.kind == KIND_BIGINT:
+            return 'UBIGINT' if logical.unsigned else 'BIGINT'
+        return {
+            KIND_STRING: 'VARCHAR',
+            KIND_TEXT: 'VARCHAR',
+            KIND_INTEGER: 'INTEGER',
+            KIND_DOUBLE: 'DOUBLE',
+            KIND_DATE: 'DATE',
+            KIND_DATETIME: 'TIMESTAMP'
+        }[logical.kind]
+
+    def table_exists(self, cursor, table_name):
+        cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", (table_name,))
+        return cursor.fetchall()[0][0] > 0
+
+    def existing_columns(self, cursor, table_name):
+        """列类型换回 MariaDB 的写法，与类型推断的结果一致"""
+        cursor.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_name = ? ORDER BY ordinal_position",
+            (table_name,)
+        )
+        return [(name, mariadb_type(parse_column_type(column_type))) for name, column_type in cursor.fetchall()]
+
+    def has_unique_key(self, cursor, table_name, key_columns):
+        # 不使用唯一约束，键的唯一性由写入时先删除再插入保证
+        return True
+
+    def add_unique_key(self, cursor, table_name, key_columns):
+        pass
+
+    def create_table_sql(self, table_name, column_names, column_types, primary_key=None, unique_key=None,
+                         extra_columns=(), table_options=None):
+        """不声明主键和唯一约束，表选项只适用于 MariaDB，都忽略"""
+        return _local_create_table_sql(table_name, column_names, column_types, None, None, extra_columns,
+                                       self.render_type)
+
+    def apply_bulk_session(self, cursor, upsert=False, tuning=False):
+        cursor.connection.begin()
+        return ()
+
+    def restore_session(self, cursor, tuning=()):
+        cursor.connection.end()
+
+    def create_writer(self, cursor, table_name, column_names, upsert=False, key_columns=None):
+        return DuckDBWriter(cursor, table_name, column_names, key_columns if upsert else None)
+
+    def create_indexes(self, cursor, load_table, table_name, indexes, column_types):
+        pass
+
+
+class ParquetBackend(DuckDBBackend):
+    """每个表一个 Parquet 文件，path 为输出目录
+
+    数据先导入内存中的 DuckDB，导入成功后由 DuckDB 写成 <表名>.parquet，先写临时文件再替换，
+    读取该文件的程序不会看到写了一半的文件；导入失败或停止时已有的文件保持不变。
+    增量导入时先把已有的文件读入内存。数据只在导入结束时写入文件，因此不记录检查点。
+    """
+
+    name = BACKEND_PARQUET
+    durable = False
+
+    def connect(self, buffered=False):
+        os.makedirs(self.path, exist_ok=True)
+        return _DuckDBConnection(duckdb.connect(':memory:'))
+
+    def file_path(self, table_name):
+        return os.path.join(self.path, f'{table_name}.parquet')
+
+    def _load(self, cursor, table_name):
+        """表还不在内存中而目录中有同名的 Parquet 文件时，把文件读入内存"""
+        if super().table_exists(cursor, table_name) or not os.path.isfile(self.file_path(table_name)):
+            return
+        path = self.file_path(table_name).replace("'", "''")
+        cursor.execute(f"CREATE TABLE {_quote(table_name)} AS SELECT * FROM read_parquet('{path}')")
+
+    def table_exists(self, cursor, table_name):
+        self._load(cursor, table_name)
+        return super().table_exists(cursor, table_name)
+
+    def existing_columns(self, cursor, table_name):
+        self._load(cursor, table_name)
+        return super().existing_columns(cursor, table_name)
+
+    def finish_table(self, cursor, load_table, table_name, indexes, column_types):
+        path = self.file_path(table_name)
+        temp_path = f'{path}.part'
+        quoted = temp_path.replace("'", "''")
+        try:
+            cursor.execute(f"COPY {_quote(load_table)} TO '{quoted}' "
+                           f"(FORMAT PARQUET, COMPRESSION {PARQUET_COMPRESSION})")
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
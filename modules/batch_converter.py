@@ -0,0 +1,159 @@
+import re
+import datetime
+import numpy as np
+import pandas as pd
+from modules.column_type_detector import DATE_FORMATS, VALUE_SEPARATOR, column_spec, _all_values_re
+
+# 转换后的数字：去掉千位分隔符和货币符号之后，整数、小数或科学计数法
+NUMBER_PATTERN = r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+NUMBER_RE = re.compile(NUMBER_PATTERN)
+NUMBER_VALUES_RE = _all_values_re(NUMBER_PATTERN)
+# 每列保留的无法转换的示例值个数
+FAILURE_EXAMPLES = 3
+# 日期格式未知时用第一个批次开头的若干个值确定格式
+FORMAT_SAMPLE_VALUES = 1000
+
+
+def _strip_chars(values, chars):
+    """去掉每个值中的指定字符，返回 (结果, 结果能否拼接后整批检查)
+
+    值中没有拼接用的分隔符时拼接成一个字符串，每个字符只需调用一次 C 实现的 str.replace。
+    """
+    joined = VALUE_SEPARATOR.join(values)
+    whole = joined.count(VALUE_SEPARATOR) == len(values) - 1
+    if not whole:
+        table = str.maketrans('', '', chars)
+        return [value.translate(table) for value in values], False
+    for char in chars:
+        if char in joined:
+            joined = joined.replace(char, '')
+    return joined.split(VALUE_SEPARATOR), True
+
+
+class _NumberColumn:
+    """数字列：去掉千位分隔符和货币符号，得到服务器直接接受的数字字面量"""
+
+    def __init__(self, spec):
+        self.strip_chars = spec.get('strip_chars') or ''
+
+    def __call__(self, values):
+        """返回 (转换后的值, 无法转换的位置)"""
+        values, whole = _strip_chars(values, self.strip_chars)
+        if whole and NUMBER_VALUES_RE.fullmatch(VALUE_SEPARATOR.join(values)):
+            return values, []
+        return values, [i for i, value in enumerate(values) if not NUMBER_RE.fullmatch(value)]
+
+
+def _parse_dates(values, fmt, unit):
+    """按 fmt 整批解析并转换为 ISO 格式，unit 为 D 时只保留日期，返回 (转换后的值, 无法解析的位置)
+
+    pandas 的 datetime64[ns] 只能表示 1677 到 2262 年，整批解析失败的值再用 datetime.strptime
+    逐个解析，MariaDB 允许的 0001-01-01 到 9999-12-31 都能写入。
+    """
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), format=fmt, errors='coerce')
+    text = np.datetime_as_string(parsed.to_numpy(dtype='datetime64[ns]'), unit=unit)
+    if unit == 's':
+        text = VALUE_SEPARATOR.join(text.tolist()).replace('T', ' ').split(VALUE_SEPARATOR)
+    else:
+        text = text.tolist()
+    failed = []
+    for i in np.flatnonzero(parsed.isna().to_numpy()).tolist():
+        try:
+            value = datetime.datetime.strptime(values[i], fmt)
+        except ValueError:
+            failed.append(i)
+            continue
+        text[i] = value.date().isoformat() if unit == 'D' else value.replace(microsecond=0).isoformat(sep=' ')
+    return text, failed
+
+
+class _DateColumn:
+    """日期列：按推断时匹配的格式整批解析，转换为 YYYY-MM-DD 或 YYYY-MM-DD HH:MM:SS
+
+    格式未知时（列类型来自已有的表）按第一个批次开头的值选出无法解析的值最少的格式，并在之后的
+    批次中沿用。整列只使用一种格式，不会把同一列的值分别按日/月和月/日解析；不符合该格式的值
+    记为无法转换。
+    """
+
+    def __init__(self, spec):
+        self.date_format = spec.get('date_format')
+        self.unit = 's' if spec['type'].upper().startswith(('DATETIME', 'TIMESTAMP')) else 'D'
+
+    def _pick_format(self, values):
+        sample = values[:FORMAT_SAMPLE_VALUES]
+        best, best_failed = None, len(sample)
+        for fmt in DATE_FORMATS:
+            failed = len(_parse_dates(sample, fmt, self.unit)[1])
+            if failed < best_failed:
+                best, best_failed = fmt, failed
+                if not failed:
+                    break
+        return best
+
+    def __call__(self, values):
+        """返回 (转换后的值, 无法转换的位置)"""
+        if self.date_format is None:
+            self.date_format = self._pick_format(values)
+            if self.date_format is None:
+                return [None] * len(values), list(range(len(values)))
+        return _parse_dates(values, self.date_format, self.unit)
+
+
+def _column_converter(spec):
+    if 'date_format' in spec:
+        return _DateColumn(spec)
+    if 'strip_chars' in spec:
+        return _NumberColumn(spec)
+    return None
+
+
+class BatchConverter:
+    """按列批量转换数据，生成可直接传给 executemany 的元组列表
+
+    列的转换规则在构造时按 column_specs（见 column_type_detector.column_spec）确定一次；转换时
+    每列整体去除首尾空白（map 直接调用 C 实现的字符串方法）、用 numpy 掩码把空字符串整体替换为
+    NULL，数字列整体去掉千位分隔符和货币符号，日期列整批解析后转换为 ISO 格式，服务器不必再解析
+    各种日期写法。无法转换的值写入 NULL 并记录在 failures 中，不会使整个批次写入失败。
+    最后用 zip 按行拼接成元组，不再对每个单元格逐一判断。
+    column_specs 中也可以直接给出列类型字符串，此时日期格式按数据确定。
+    """
+
+    def __init__(self, column_specs, column_names=None):
+        specs = [column_spec(spec) if isinstance(spec, str) else spec for spec in column_specs]
+        self.converters = [_column_converter(spec) for spec in specs]
+        self.column_names = [str(col) for col in column_names] if column_names is not None else \
+            [str(j + 1) for j in range(len(specs))]
+        # {列名: {'count': 无法转换的值的个数, 'examples': [示例值]}}
+        self.failures = {}
+
+    def _record_failures(self, j, values, failed):
+        entry = self.failures.setdefault(self.column_names[j], {'count': 0, 'examples': []})
+        entry['count'] += len(failed)
+        for i in failed[:FAILURE_EXAMPLES - len(entry['examples'])]:
+            entry['examples'].append(values[i])
+
+    def failed_values(self):
+        return sum(entry['count'] for entry in self.failures.values())
+
+    def __call__(self, batch):
+        """batch 为各列均为字符串的 DataFrame，空单元格可以是 None 或 NaN"""
+        columns = []
+        for j, converter in enumerate(self.converters):
+            column = batch.iloc[:, j]
+            if column.hasnans:
+                # 非快速路径读取的 xlsx/xls 和 pyarrow 读取的数据中空单元格可能是 None/NaN
+                column = column.fillna('')
+            values = np.array(list(map(str.strip, column.tolist())), dtype=object)
+            empty = values == ''
+            values[empty] = None
+            if converter is not None and not empty.all():
+                present = np.flatnonzero(~empty)
+                original = values[present].tolist()
+                converted, failed = converter(original)
+                converted = np.array(converted, dtype=object)
+                if failed:
+                    self._record_failures(j, original, failed)
+                    converted[failed] = None
+                values[present] = converted
+            columns.append(values.tolist())
+        return list(zip(*columns))
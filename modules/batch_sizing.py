@@ -0,0 +1,150 @@
+import threading
+import pandas as pd
+
+# 初始的批次和提交行数，第一个批次写入后按实测结果调整
+DEFAULT_BATCH_ROWS = 10000
+DEFAULT_COMMIT_ROWS = 50000
+MIN_BATCH_ROWS = 100
+MAX_BATCH_ROWS = 500000
+MAX_COMMIT_ROWS = 2000000
+
+# 服务器的 max_allowed_packet 无法查询时使用的值（MariaDB 10.2.4 起的默认值）
+DEFAULT_MAX_ALLOWED_PACKET = 16 * 1024 * 1024
+# executemany 把整个批次拼成一条多行 INSERT，一个批次最多占用 max_allowed_packet 的这一比例，
+# 为行数据量的估计误差和语句本身留出余量
+PACKET_HEADROOM = 0.5
+# 每个批次的数据量上限（字节），服务器允许的包更大时也不超过这个值，避免占用过多内存
+MAX_BATCH_BYTES = 32 * 1024 * 1024
+
+# 每个批次的目标写入耗时（秒）：批次太小时往返开销占比高，太大时停止和出错的响应变慢
+TARGET_BATCH_SECONDS = 0.5
+# 两次提交之间的目标写入时间（秒），以及提交耗时占写入时间的最大比例
+TARGET_COMMIT_SECONDS = 2.0
+MAX_COMMIT_OVERHEAD = 0.1
+# 每次调整时批次行数最多增长的倍数，缩小不受限制
+MAX_GROWTH = 2.0
+# 吞吐量和延迟的指数滑动平均系数
+SMOOTHING = 0.3
+# 估计行数据量时每个批次抽样的行数
+ROW_BYTES_SAMPLE = 200
+# 每个值在 INSERT 语句中的额外开销：引号和分隔符
+_VALUE_OVERHEAD = 3
+_NULL_BYTES = 4
+
+
+def estimate_row_bytes(rows, sample=ROW_BYTES_SAMPLE):
+    """按均匀抽样估计转换后每行在 INSERT 语句中占用的平均字节数"""
+    if not rows:
+        return 0
+    step = max(len(rows) // sample, 1)
+    sampled = rows[::step]
+    total = 0
+    for row in sampled:
+        for value in row:
+            if value is None:
+                total += _NULL_BYTES
+            elif isinstance(value, str):
+                total += len(value.encode('utf-8')) + _VALUE_OVERHEAD
+            else:
+                total += len(str(value)) + _VALUE_OVERHEAD
+    return total / len(sampled)
+
+
+def _ewma(previous, value):
+    return value if previous is None else previous + SMOOTHING * (value - previous)
+
+
+class BatchSizer:
+    """根据行数据量和实测吞吐量调整批次大小和提交间隔
+
+    批次行数取以下各项的最小值：按实测每秒行数在 TARGET_BATCH_SECONDS 内能写完的行数、
+    不超过 max_allowed_packet * PACKET_HEADROOM 和 MAX_BATCH_BYTES 的行数，每次最多增长到
+    原来的 MAX_GROWTH 倍。提交行数按每 TARGET_COMMIT_SECONDS 秒写入的行数计算，提交本身较慢时
+    相应拉长间隔，使提交耗时不超过写入时间的 MAX_COMMIT_OVERHEAD。
+    并行写入时各线程共用一个实例，吞吐量为单个连接的吞吐量，因此批次和提交行数都按单个连接计算。
+    """
+
+    def __init__(self, max_allowed_packet=None, batch_rows=DEFAULT_BATCH_ROWS, commit_rows=DEFAULT_COMMIT_ROWS):
+        self.max_allowed_packet = max_allowed_packet or DEFAULT_MAX_ALLOWED_PACKET
+        self.max_batch_bytes = min(int(self.max_allowed_packet * PACKET_HEADROOM), MAX_BATCH_BYTES)
+        self.batch_rows = batch_rows
+        self.commit_rows = commit_rows
+        self.row_bytes = None
+        self.rows_per_second = None
+        self.write_seconds = None
+        self.commit_seconds = None
+        self._lock = threading.Lock()
+
+    def _max_rows_by_bytes(self):
+        if not self.row_bytes:
+            return MAX_BATCH_ROWS
+        return max(int(self.max_batch_bytes / self.row_bytes), 1)
+
+    def observe_rows(self, rows):
+        """写入前根据转换后的行更新行数据量，返回按数据量应拆分成的各个部分
+
+        第一批数据量未知时按默认行数读取，若按实际数据量一条 INSERT 放不下，则在这里拆开。
+        """
+        row_bytes = estimate_row_bytes(rows)
+        with self._lock:
+            self.row_bytes = row_bytes if self.row_bytes is None else max(row_bytes, _ewma(self.row_bytes, row_bytes))
+            limit = max(int(self.max_batch_bytes / row_bytes), 1) if row_bytes else len(rows)
+            self.batch_rows = min(self.batch_rows, self._max_rows_by_bytes())
+        if len(rows) <= limit:
+            return [rows]
+        return [rows[start:start + limit] for start in range(0, len(rows), limit)]
+
+    def observe_write(self, rows, seconds):
+        """记录一个批次的写入耗时，并据此调整批次行数"""
+        if rows <= 0:
+            return
+        seconds = max(seconds, 1e-6)
+        with self._lock:
+            self.write_seconds = _ewma(self.write_seconds, seconds)
+            self.rows_per_second = _ewma(self.rows_per_second, rows / seconds)
+            target = min(self.rows_per_second * TARGET_BATCH_SECONDS, self.batch_rows * MAX_GROWTH, MAX_BATCH_ROWS)
+            # 数据量上限优先于最小行数
+            self.batch_rows = int(min(max(target, MIN_BATCH_ROWS), self._max_rows_by_bytes()))
+            self._update_commit_rows()
+
+    def observe_commit(self, seconds):
+        with self._lock:
+            self.commit_seconds = _ewma(self.commit_seconds, seconds)
+            self._update_commit_rows()
+
+    def _update_commit_rows(self):
+        if self.rows_per_second is None:
+            return
+        interval = TARGET_COMMIT_SECONDS
+        if self.commit_seconds:
+            interval = max(interval, self.commit_seconds / MAX_COMMIT_OVERHEAD)
+        commit_rows = self.rows_per_second * interval
+        self.commit_rows = int(min(max(commit_rows, self.batch_rows), MAX_COMMIT_ROWS))
+
+    def rebatch(self, chunks):
+        """把按固定行数读取的数据块重新切分为当前的批次行数
+
+        每切出一个批次都重新读取 batch_rows，调整后的值从下一个批次开始生效。
+        """
+        pending = None
+        for chunk in chunks:
+            pending = chunk if pending is None or not len(pending) else pd.concat([pending, chunk])
+            while len(pending) >= self.batch_rows:
+                size = self.batch_rows
+                yield pending.iloc[:size]
+                pending = pending.iloc[size:]
+        if pending is not None and len(pending):
+            yield pending
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'batch_rows': self.batch_rows,
+                'commit_rows': self.commit_rows,
+                'max_allowed_packet': self.max_allowed_packet,
+                'max_batch_bytes': self.max_batch_bytes,
+                'row_bytes': round(self.row_bytes, 1) if self.row_bytes else None,
+                'rows_per_second': round(self.rows_per_second, 1) if self.rows_per_second else None,
+                'write_seconds': round(self.write_seconds, 4) if self.write_seconds else None,
+                'commit_seconds': round(self.commit_seconds, 4) if self.commit_seconds else None
+            }
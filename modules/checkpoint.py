@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import threading
+import pandas as pd
+
+DEFAULT_CHECKPOINT_DIR = './checkpoints'
+
+
+def merge_ranges(ranges):
+    """合并 [start, end) 行区间列表，返回按起点排序且互不重叠的区间"""
+    merged = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def subtract_ranges(start, end, ranges):
+    """返回 [start, end) 中不在 ranges（已合并）内的子区间"""
+    remaining = []
+    position = start
+    for range_start, range_end in ranges:
+        if range_end <= position:
+            continue
+        if range_start >= end:
+            break
+        if range_start > position:
+            remaining.append([position, range_start])
+        position = max(position, range_end)
+        if position >= end:
+            break
+    if position < end:
+        remaining.append([position, end])
+    return remaining
+
+
+def count_rows(ranges):
+    return sum(end - start for start, end in ranges)
+
+
+def skip_committed(batches, committed_ranges):
+    """给源数据块编号并去掉已提交的行
+
+    batches 为按顺序读取的源数据块，返回 (区间列表, 数据块) 的迭代器，区间为数据块中各行在源文件中的
+    位置（行号从 0 开始，不含表头）。整个数据块都已提交时不再返回。
+    """
+    position = 0
+    for batch in batches:
+        start, position = position, position + len(batch)
+        ranges = subtract_ranges(start, position, committed_ranges)
+        if not ranges:
+            continue
+        if ranges != [[start, position]]:
+            batch = pd.concat([batch.iloc[range_start - start:range_end - start]
+                               for range_start, range_end in ranges])
+        yield ranges, batch
+
+
+def file_fingerprint(file_path):
+    stat = os.stat(file_path)
+    return {'file_size': stat.st_size, 'file_mtime_ns': stat.st_mtime_ns}
+
+
+class CheckpointStore:
+    """导入检查点，每个任务一个 JSON 文件
+
+    检查点记录继续导入所需的全部信息：文件及其大小和修改时间、工作表、目标表和实际写入的表、
+    列名和列类型、导入参数（不含数据库密码），以及已提交的源文件行区间 committed_ranges。
+    并行写入时各连接的提交顺序与行的顺序不一致，因此记录的是区间列表而不是单个偏移量。
+    """
+
+    def __init__(self, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+        self.checkpoint_dir = checkpoint_dir
+        self._lock = threading.Lock()
+
+    def _path(self, job_id):
+        return os.path.join(self.checkpoint_dir, f'{job_id}.json')
+
+    def save(self, checkpoint):
+        checkpoint['updated_at'] = time.time()
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._path(checkpoint['job_id'])
+        tmp_path = f'{path}.tmp'
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def load(self, job_id):
+        # 任务 ID 由 uuid4().hex 生成，其他字符一律视为不存在，避免路径穿越
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def delete(self, job_id):
+        try:
+            os.remove(self._path(job_id))
+        except OSError:
+            pass
+
+    def list(self):
+        """按更新时间从新到旧返回所有检查点"""
+        checkpoints = []
+        try:
+            names = os.listdir(self.checkpoint_dir)
+        except OSError:
+            return checkpoints
+        for name in names:
+            if name.endswith('.json'):
+                checkpoint = self.load(name[:-len('.json')])
+                if checkpoint is not None:
+                    checkpoints.append(checkpoint)
+        return sorted(checkpoints, key=lambda c: c.get('updated_at', 0), reverse=True)
@@ -1,6 +1,127 @@
 import pandas as pd
 import re
 
+# 扩展日期时间格式支持
+DATE_FORMATS = (
+    '%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d',  # 标准日期格式
+    '%Y-%m-%d %H:%M:%S', '%Y/%m/%d %H:%M:%S',  # 标准日期时间
+    '%Y年%m月%d日', '%Y年%m月%d日 %H时%M分%S秒',  # 中文格式
+    '%d/%m/%Y', '%m/%d/%Y',  # 其他常见格式
+    '%Y%m%d'  # 紧凑格式
+)
+
+# 单次扫描时用于拼接整批数据的分隔符，以及与 determine_column_type 中
+# 科学计数法、整数、小数三个正则等价的整批匹配正则
+VALUE_SEPARATOR = '\x00'
+CURRENCY_RE = re.compile(r'[,¥$€£]')
+# 数字列写入前去掉的字符，与推断类型时的预处理（CURRENCY_RE）一致
+NUMERIC_STRIP_CHARS = ',¥$€£'
+
+def _all_values_re(pattern):
+    # 前瞻加反向引用相当于原子分组（Python 3.11 之前不支持占有量词），每个值匹配完成后
+    # 不再回溯，匹配整批数据的耗时与数据长度成线性关系
+    return re.compile(f'(?:(?=({pattern}{VALUE_SEPARATOR}))\\1)*(?:{pattern})')
+
+DOUBLE_VALUES_RE = _all_values_re(r'-?\d+\.?\d*[eE][+-]?\d+')
+INT_VALUES_RE = _all_values_re(r'-?\d+')
+DECIMAL_VALUES_RE = _all_values_re(r'-?\d*\.?\d+')
+INTEGER_PART_RE = re.compile(f'(?:^|{VALUE_SEPARATOR})-?(\\d*)')
+DECIMAL_PART_RE = re.compile(r'\.(\d*)')
+
+# 默认的类型推断采样行数，0 或 None 表示不采样
+DEFAULT_SAMPLE_SIZE = 10000
+
+def _date_type(fmt):
+    return 'DATETIME' if any(x in fmt for x in ['%H', '%M', '%S', '时', '分', '秒']) else 'DATE'
+
+def _date_shape(fmt):
+    """把日期格式转换为只看写法的正则，接受的字符串是 pd.to_datetime(format=fmt) 接受的字符串的超集
+
+    %Y 为 4 位数字，其余字段为 1 到 2 位数字（%d 允许前导空格），格式中的空格匹配任意空白。
+    """
+    pattern = ''
+    for part in re.split(r'(%.)', fmt):
+        if part == '%Y':
+            pattern += r'\d{4}'
+        elif part.startswith('%'):
+            pattern += r'\s?\d{1,2}'
+        else:
+            pattern += re.escape(part).replace(r'\ ', r'\s+')
+    return pattern
+
+def _date_shapes():
+    """按写法给 DATE_FORMATS 分组，写法相同的格式（%d/%m/%Y 和 %m/%d/%Y）在同一组"""
+    shapes = {}
+    for fmt in DATE_FORMATS:
+        shapes.setdefault(_date_shape(fmt), []).append(fmt)
+    return [(shape, tuple(formats), _all_values_re(shape)) for shape, formats in shapes.items()]
+
+# 各组的写法互斥，一个值最多属于一组
+DATE_SHAPES = _date_shapes()
+DATE_SHAPE_RE = re.compile('|'.join(f'(?P<s{i}>{shape})' for i, (shape, _, _) in enumerate(DATE_SHAPES)))
+# pd.to_datetime 在任何格式下都接受的写法：缺失值（解析为 NaT）和当前时间
+DATE_SPECIAL_VALUES = frozenset(('NaN', 'nan', 'NAN', 'NaT', 'nat', 'NAT', 'today', 'now'))
+
+def _shape_candidates(values, formats):
+    """第一个值的写法确定唯一可能的格式组，整批数据拼接后用该组的正则匹配一次"""
+    match = DATE_SHAPE_RE.fullmatch(values.iat[0])
+    if match is None:
+        return []
+    _, shape_formats, values_re = DATE_SHAPES[int(match.lastgroup[1:])]
+    candidates = [fmt for fmt in shape_formats if fmt in formats]
+    if not candidates:
+        return []
+    joined = VALUE_SEPARATOR.join(values)
+    if joined.count(VALUE_SEPARATOR) != len(values) - 1 or not values_re.fullmatch(joined):
+        return []
+    return candidates
+
+def match_date_formats(values, formats=DATE_FORMATS):
+    """返回 formats 中能解析全部 values（已去掉首尾空白的非空字符串）的格式
+
+    先按写法筛选（参见 _shape_candidates），写法全部符合时才对候选格式各调用一次 pd.to_datetime 确认。
+    写法不符合时，去掉 DATE_SPECIAL_VALUES 中的值再筛选一次，全部是这些值时所有格式都是候选。
+    """
+    candidates = _shape_candidates(values, formats)
+    if not candidates:
+        special = values.isin(DATE_SPECIAL_VALUES)
+        if not special.any():
+            return []
+        shaped = values[~special]
+        candidates = _shape_candidates(shaped, formats) if len(shaped) else list(formats)
+        if not candidates:
+            return []
+    alive = []
+    for fmt in candidates:
+        try:
+            pd.to_datetime(values, format=fmt, errors='raise')
+            alive.append(fmt)
+        except Exception:
+            continue
+    return alive
+
+def is_date_type(column_type):
+    """DATE、DATETIME、TIMESTAMP 列在写入前转换为 ISO 格式"""
+    column_type = column_type.upper()
+    return column_type.startswith('DATE') or column_type.startswith('TIMESTAMP')
+
+def is_numeric_type(column_type):
+    """INT/DECIMAL/DOUBLE/FLOAT 列在写入前需要去掉千位分隔符和货币符号"""
+    column_type = column_type.upper()
+    return any(name in column_type for name in ('INT', 'DECIMAL', 'DOUBLE', 'FLOAT'))
+
+def column_spec(column_type, date_format=None):
+    """返回列的写入规格 {'type', 'date_format', 'strip_chars'}
+
+    日期列的 date_format 为推断时匹配的格式，列类型来自已有的表时为 None，写入时再按数据确定；
+    数字列的 strip_chars 为写入前去掉的字符。其他列只有 type。
+    """
+    if is_date_type(column_type):
+        return {'type': column_type, 'date_format': date_format}
+    if is_numeric_type(column_type):
+        return {'type': column_type, 'strip_chars': NUMERIC_STRIP_CHARS}
+    return {'type': column_type}
+
 def determine_column_type(column_values):
     """根据列数据推断数据类型，并处理过长的 VARCHAR 列"""
     original_values = column_values.astype(str).str.strip()
@@ -11,19 +132,10 @@ def determine_column_type(column_values):
     
     has_empty = (original_values == '').any()
     
-    # 扩展日期时间格式支持
-    DATE_FORMATS = (
-        '%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d',  # 标准日期格式
-        '%Y-%m-%d %H:%M:%S', '%Y/%m/%d %H:%M:%S',  # 标准日期时间
-        '%Y年%m月%d日', '%Y年%m月%d日 %H时%M分%S秒',  # 中文格式
-        '%d/%m/%Y', '%m/%d/%Y',  # 其他常见格式
-        '%Y%m%d'  # 紧凑格式
-    )
-    
     for fmt in DATE_FORMATS:
         try:
             pd.to_datetime(filtered_values, format=fmt, errors='raise')
-            return 'DATETIME' if any(x in fmt for x in ['%H', '%M', '%S', '时', '分', '秒']) else 'DATE'
+            return _date_type(fmt)
         except Exception:
             continue
     
@@ -66,6 +178,10 @@ def determine_column_type(column_values):
     
     # VARCHAR和TEXT的处理逻辑保持不变
     max_length = column_values.str.len().max()
+    return text_column_type(max_length)
+
+def text_column_type(max_length):
+    """根据最大字符长度选择 VARCHAR 或 TEXT 类型"""
     if max_length <= 50:
         return f'VARCHAR({max_length + 10})'  # 给一点余量
     elif max_length <= 100:
@@ -80,4 +196,144 @@ def determine_column_type(column_values):
         else:
             return 'TEXT'
     else:
-        return 'VARCHAR(255)'
\ No newline at end of file
+        return 'VARCHAR(255)'
+
+class ColumnProfile:
+    """单次扫描的列类型推断，结果与 determine_column_type 完全一致（包括 NaN、today 等 pd.to_datetime 的特殊写法）
+
+    每一列维护一组候选类型：日期格式 → DOUBLE(科学计数法) → INT → DECIMAL，
+    都不满足时退化为 VARCHAR/TEXT。每次 update 只检查仍然存活的候选类型，
+    候选类型只减不增，因此可以对数据块逐块调用，也可以先用样本排除候选再扫描整列。
+    所有统计量都是布尔与或最大值，同一批数据重复 update 不影响结果。
+    """
+
+    def __init__(self):
+        self.has_values = False
+        self.has_empty = False
+        self.max_length = 0
+        self.date_formats = list(DATE_FORMATS)
+        self.is_double = True
+        self.is_int = True
+        self.is_decimal = True
+        self.max_digits = 0  # 整数去掉分隔符后的最大长度（含负号）
+        self.max_integer_length = 0
+        self.max_decimal_length = 0
+
+    def update(self, column_values):
+        """用一批数据更新统计信息"""
+        lengths = column_values.str.len()
+        if lengths.notna().any():
+            self.max_length = max(self.max_length, int(lengths.max()))
+
+        original_values = column_values.astype(str).str.strip()
+        non_empty = original_values != ''
+        filtered_values = original_values[non_empty]
+        if len(filtered_values) < len(original_values):
+            self.has_empty = True
+        if filtered_values.empty:
+            return self
+        self.has_values = True
+
+        if self.date_formats:
+            self.date_formats = match_date_formats(filtered_values, self.date_formats)
+        if any(fmt != '%Y%m%d' for fmt in self.date_formats):
+            # 带分隔符的日期不可能是数字，无需再做数字分析
+            self.is_double = self.is_int = self.is_decimal = False
+
+        if self.is_double or self.is_int or self.is_decimal:
+            self._update_numeric(filtered_values)
+        return self
+
+    def _update_numeric(self, filtered_values):
+        # 将整批数据用分隔符拼接成一个字符串，所有检查都在 C 层的正则引擎中一次完成
+        joined = VALUE_SEPARATOR.join(filtered_values)
+        if joined.count(VALUE_SEPARATOR) != len(filtered_values) - 1:
+            # 值中本身含有分隔符，不可能是数字
+            self.is_double = self.is_int = self.is_decimal = False
+            return
+        # 预处理：移除千位分隔符和货币符号
+        joined = CURRENCY_RE.sub('', joined)
+
+        if INT_VALUES_RE.fullmatch(joined):
+            self.is_double = False
+            if self.is_int:
+                self.max_digits = max(self.max_digits, max(map(len, joined.split(VALUE_SEPARATOR))))
+            if self.is_decimal:
+                self._update_decimal_lengths(joined)
+            return
+        self.is_int = False
+
+        if self.is_decimal:
+            if DECIMAL_VALUES_RE.fullmatch(joined):
+                self.is_double = False
+                self._update_decimal_lengths(joined)
+                return
+            self.is_decimal = False
+
+        if self.is_double:
+            self.is_double = DOUBLE_VALUES_RE.fullmatch(joined) is not None
+
+    def _update_decimal_lengths(self, joined):
+        integer_parts = INTEGER_PART_RE.findall(joined)
+        self.max_integer_length = max(self.max_integer_length, max(map(len, integer_parts)))
+        decimal_parts = DECIMAL_PART_RE.findall(joined)
+        if decimal_parts:
+            self.max_decimal_length = max(self.max_decimal_length, max(map(len, decimal_parts)))
+
+    def merge(self, other):
+        """合并另一批数据的统计信息，结果与依次 update 两批数据相同"""
+        self.has_values = self.has_values or other.has_values
+        self.has_empty = self.has_empty or other.has_empty
+        self.max_length = max(self.max_length, other.max_length)
+        if other.has_values:
+            self.date_formats = [fmt for fmt in self.date_formats if fmt in other.date_formats]
+            self.is_double = self.is_double and other.is_double
+            self.is_int = self.is_int and other.is_int
+            self.is_decimal = self.is_decimal and other.is_decimal
+        self.max_digits = max(self.max_digits, other.max_digits)
+        self.max_integer_length = max(self.max_integer_length, other.max_integer_length)
+        self.max_decimal_length = max(self.max_decimal_length, other.max_decimal_length)
+        return self
+
+    def column_spec(self):
+        """返回列类型以及写入前的转换规则，参见 column_spec"""
+        column_type = self.column_type()
+        return column_spec(column_type, self.date_formats[0] if self.date_formats else None)
+
+    def column_type(self):
+        """根据当前统计信息返回列类型"""
+        if not self.has_values:
+            return 'VARCHAR(100)'
+        if self.date_formats:
+            return _date_type(self.date_formats[0])
+        if self.is_double:
+            return 'DOUBLE'
+        if self.is_int:
+            if self.max_digits > 10 or self.has_empty:
+                return f'VARCHAR({max(self.max_digits + 5, 30)})'
+            return 'INT'
+        if self.is_decimal:
+            if self.has_empty:
+                total_length = self.max_integer_length + (self.max_decimal_length > 0 and self.max_decimal_length + 1 or 0)
+                return f'VARCHAR({max(total_length + 5, 30)})'
+            if self.max_decimal_length > 6 or self.max_integer_length > 12:
+                return 'DOUBLE'
+            precision = min(self.max_integer_length + self.max_decimal_length, 18)
+            scale = min(self.max_decimal_length, 6)
+            return f'DECIMAL({precision},{scale})'
+        return text_column_type(self.max_length)
+
+def profile_column(column_values, sample_size=DEFAULT_SAMPLE_SIZE):
+    """单次扫描统计一列数据，可选先用随机样本排除候选类型
+
+    采样只用于提前淘汰不可能的类型，随后仍会对整列做一次确认扫描，
+    因此无论是否采样，结果都与 determine_column_type 相同。
+    """
+    profile = ColumnProfile()
+    if sample_size and len(column_values) > sample_size:
+        profile.update(column_values.sample(n=sample_size, random_state=0))
+    return profile.update(column_values)
+
+def infer_column_type(column_values, sample_size=DEFAULT_SAMPLE_SIZE):
+    """单次扫描推断列类型，参见 profile_column"""
+    return profile_column(column_values, sample_size).column_type()
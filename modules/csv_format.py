@@ -0,0 +1,265 @@
+import os
+import csv
+import gzip
+import codecs
+import zipfile
+import pandas as pd
+from contextlib import contextmanager
+
+try:
+    import pyarrow.csv  # noqa: F401  只用于判断 pandas 能否使用 pyarrow 解析 CSV
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# CSV 解析引擎：c 为 pandas 自带的解析器；pyarrow 为多线程解析器，只用于一次性读取
+CSV_ENGINE_C = 'c'
+CSV_ENGINE_PYARROW = 'pyarrow'
+CSV_ENGINES = (CSV_ENGINE_C, CSV_ENGINE_PYARROW)
+
+# 编码、分隔符和引号的候选列表，按优先顺序排列
+CSV_ENCODINGS = ['utf-8-sig', 'utf-8', 'gbk', 'gb2312', 'latin1']
+CSV_DELIMITERS = [',', '\t', ';', '|']
+CSV_QUOTECHARS = ['"', "'"]
+# 用于判断编码的文件开头采样字节数；文件较大时另外在后面均匀取 CSV_PROBE_COUNT 段，
+# 减少开头全是 ASCII 而后面才出现 GBK 字符时误判为 UTF-8 的情况
+CSV_SAMPLE_BYTES = 1024 * 1024
+CSV_PROBE_BYTES = 64 * 1024
+CSV_PROBE_COUNT = 8
+# 用于判断分隔符、引号和表头的字符数和最多行数
+CSV_DIALECT_CHARS = 64 * 1024
+CSV_DIALECT_ROWS = 200
+# 没有表头时生成的列名前缀
+HEADERLESS_COLUMN_PREFIX = 'column_'
+# 压缩的 CSV 文件按扩展名识别，读取时边读边解压，不会解压到磁盘
+CSV_COMPRESSIONS = {'.gz': 'gzip', '.zip': 'zip'}
+
+
+class CsvFormat:
+    """CSV 文件的编码、分隔符、引号规则和是否有表头"""
+
+    def __init__(self, encoding, delimiter=',', quotechar='"', escapechar=None, header=True, column_count=0):
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.escapechar = escapechar
+        self.header = header
+        self.column_count = column_count
+        # 同样能解码所有采样的其他编码，整体读取时遇到解码错误依次尝试
+        self.fallback_encodings = []
+
+    def names(self):
+        """没有表头时使用的列名"""
+        return [f'{HEADERLESS_COLUMN_PREFIX}{i + 1}' for i in range(self.column_count)]
+
+    def read_csv_kwargs(self):
+        """传给 pd.read_csv 的参数，所有值按字符串读取，空值保持为空字符串"""
+        kwargs = {
+            'dtype': str,
+            'keep_default_na': False,
+            'encoding': self.encoding,
+            'sep': self.delimiter,
+            'quotechar': self.quotechar,
+            'escapechar': self.escapechar
+        }
+        if not self.header:
+            kwargs.update(header=None, names=self.names())
+        return kwargs
+
+    def describe(self):
+        delimiter = {'\t': '制表符'}.get(self.delimiter, self.delimiter)
+        header = '有表头' if self.header else f'无表头（列名为 {HEADERLESS_COLUMN_PREFIX}1 起）'
+        return f"编码: {self.encoding}, 分隔符: {delimiter}, 引号: {self.quotechar}, {header}"
+
+
+def csv_compression(file_path):
+    """返回 CSV 文件的压缩方式 gzip 或 zip，未压缩时返回 None"""
+    return CSV_COMPRESSIONS.get(os.path.splitext(file_path)[1].lower())
+
+
+def _zip_csv_member(archive):
+    """zip 文件中的第一个 CSV 文件，没有 .csv 文件时若只有一个文件则使用该文件"""
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    for info in members:
+        if info.filename.lower().endswith('.csv'):
+            return info
+    if len(members) == 1:
+        return members[0]
+    raise ValueError("zip 文件中没有 CSV 文件")
+
+
+@contextmanager
+def open_csv_binary(file_path):
+    """以二进制方式打开 CSV 文件，返回 (数据流, 原始文件)
+
+    压缩的文件返回边读边解压的数据流，原始文件的读取位置用于按压缩后的字节计算读取进度。
+    """
+    compression = csv_compression(file_path)
+    with open(file_path, 'rb') as raw:
+        if compression == 'gzip':
+            with gzip.GzipFile(fileobj=raw) as stream:
+                yield stream, raw
+        elif compression == 'zip':
+            with zipfile.ZipFile(raw) as archive:
+                with archive.open(_zip_csv_member(archive)) as stream:
+                    yield stream, raw
+        else:
+            yield raw, raw
+
+
+def _decodes(encoding, data, final):
+    # 增量解码器允许采样末尾截断的多字节字符
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(data, final=final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _read_samples(file_path):
+    """返回 (文件开头的采样, 是否读到了文件末尾, [其余部分均匀分布的采样])"""
+    if csv_compression(file_path):
+        # 压缩的数据流无法跳转，只采样解压后的开头，采样之外的编码问题由 read_csv_file 重新读取
+        with open_csv_binary(file_path) as (stream, _):
+            head = stream.read(CSV_SAMPLE_BYTES)
+            return head, not stream.read(1), []
+    size = os.path.getsize(file_path)
+    probes = []
+    with open(file_path, 'rb') as f:
+        head = f.read(CSV_SAMPLE_BYTES)
+        if size > CSV_SAMPLE_BYTES:
+            step = (size - CSV_SAMPLE_BYTES) / CSV_PROBE_COUNT
+            for i in range(1, CSV_PROBE_COUNT + 1):
+                f.seek(max(int(CSV_SAMPLE_BYTES + step * i) - CSV_PROBE_BYTES, CSV_SAMPLE_BYTES))
+                probe = f.read(CSV_PROBE_BYTES)
+                # 从下一个换行之后开始，保证从完整的字符开始解码（GBK 和 UTF-8 的后续字节都不会是 0x0A）
+                probes.append(probe[probe.find(b'\n') + 1:])
+    return head, len(head) >= size, probes
+
+
+def _candidate_encodings(head, complete, probes):
+    """按优先顺序返回能解码所有采样的编码，有 UTF-8 BOM 时只返回 utf-8-sig"""
+    if head.startswith(codecs.BOM_UTF8):
+        return ['utf-8-sig']
+    return [encoding for encoding in CSV_ENCODINGS if encoding != 'utf-8-sig'
+            and _decodes(encoding, head, complete) and all(_decodes(encoding, probe, False) for probe in probes)]
+
+
+def _parse_sample(text, delimiter, quotechar, escapechar):
+    reader = csv.reader(text.splitlines(True), delimiter=delimiter, quotechar=quotechar,
+                        escapechar=escapechar, strict=False)
+    rows = []
+    try:
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= CSV_DIALECT_ROWS:
+                break
+    except csv.Error:
+        return []
+    return rows
+
+
+def _score(rows):
+    """列数一致的行所占比例越高越好，比例相同时列数越多越好"""
+    if not rows:
+        return 0.0, 0
+    width = len(rows[0])
+    if width < 2:
+        return 0.0, width
+    consistent = sum(1 for row in rows if len(row) == width) / len(rows)
+    return consistent, width
+
+
+def _is_number(value):
+    value = value.strip().replace(',', '')
+    if not value:
+        return False
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _has_header(rows):
+    """第一行在数字列中也是数字时认为没有表头，否则按有表头处理"""
+    if len(rows) < 2:
+        return True
+    body = rows[1:]
+    decided = False
+    for j, first in enumerate(rows[0]):
+        values = [row[j] for row in body if j < len(row) and row[j].strip()]
+        if not values or not all(_is_number(value) for value in values):
+            continue
+        if not _is_number(first):
+            return True  # 数字列的第一行是文字，是表头
+        decided = True
+    return not decided
+
+
+def detect_csv_format(file_path):
+    """根据文件开头以及其余部分均匀分布的几小段采样确定 CSV 的编码、分隔符、引号和表头
+
+    只读取有限的字节，之后整个文件只需按检测结果读取一遍。分隔符和引号的组合按采样中
+    列数一致的行所占的比例选择，比例相同时选择列数更多的，都只有一列时按单列文件处理。
+    """
+    head, complete, probes = _read_samples(file_path)
+    candidates = _candidate_encodings(head, complete, probes)
+    if not candidates:
+        raise ValueError("无法读取CSV文件，请检查文件格式和编码。")
+    encoding = candidates[0]
+    text = codecs.getincrementaldecoder(encoding)().decode(head[:CSV_DIALECT_CHARS * 4], final=complete)
+    text = text[:CSV_DIALECT_CHARS]
+    if not complete or len(text) == CSV_DIALECT_CHARS:
+        # 去掉采样末尾可能不完整的一行
+        text = text[:text.rfind('\n') + 1] or text
+
+    best = None
+    for quotechar in CSV_QUOTECHARS:
+        escapechars = [None]
+        if f'\\{quotechar}' in text:
+            escapechars.append('\\')
+        for delimiter in CSV_DELIMITERS:
+            for escapechar in escapechars:
+                rows = _parse_sample(text, delimiter, quotechar, escapechar)
+                score = _score(rows)
+                # 候选按优先顺序遍历，只有更好时才替换
+                if best is None or score > best[0]:
+                    best = (score, delimiter, quotechar, escapechar, rows)
+    (consistent, _), delimiter, quotechar, escapechar, rows = best
+    if consistent == 0:
+        delimiter, quotechar, escapechar = CSV_DELIMITERS[0], CSV_QUOTECHARS[0], None
+        rows = _parse_sample(text, delimiter, quotechar, escapechar)
+    column_count = len(rows[0]) if rows else 0
+    csv_format = CsvFormat(encoding, delimiter, quotechar, escapechar, _has_header(rows), column_count)
+    csv_format.fallback_encodings = candidates[1:]
+    return csv_format
+
+
+def read_csv_file(file_path, csv_format, engine=CSV_ENGINE_C):
+    """按检测结果一次性读取整个 CSV 文件
+
+    engine 为 pyarrow 且已安装 pyarrow 时使用多线程解析，pyarrow 不支持的文件改用 pandas 解析器。
+    压缩的文件边读边解压。
+    采样之外的部分出现当前编码无法解码的字节时，依次改用其余能解码所有采样的编码重新读取，
+    并更新 csv_format.encoding；这是采样无法覆盖的情况下唯一会再读一遍文件的情形。
+    """
+    while True:
+        kwargs = csv_format.read_csv_kwargs()
+        try:
+            if engine == CSV_ENGINE_PYARROW and HAS_PYARROW:
+                # pyarrow 自动跳过 UTF-8 BOM
+                encoding = 'utf-8' if csv_format.encoding == 'utf-8-sig' else csv_format.encoding
+                try:
+                    with open_csv_binary(file_path) as (stream, _):
+                        return pd.read_csv(stream, engine=CSV_ENGINE_PYARROW, **dict(kwargs, encoding=encoding))
+                except UnicodeDecodeError:
+                    raise
+                except ValueError:
+                    pass
+            with open_csv_binary(file_path) as (stream, _):
+                return pd.read_csv(stream, **kwargs)
+        except UnicodeDecodeError:
+            if not csv_format.fallback_encodings:
+                raise ValueError(f"CSV 文件中有无法按 {csv_format.encoding} 解码的内容，请检查文件编码。")
+            csv_format.encoding = csv_format.fallback_encodings.pop(0)
@@ -0,0 +1,278 @@
+import os
+import shutil
+import tempfile
+import threading
+from operator import methodcaller
+import mysql.connector
+from mysql.connector import errorcode
+
+# 写入方式
+WRITE_METHOD_EXECUTEMANY = 'executemany'
+WRITE_METHOD_LOAD_DATA = 'load_data'
+
+# LOAD DATA 的转义规则：反斜杠本身、制表符、换行、回车和 NUL 需要转义，NULL 写作 \N
+_LOAD_DATA_ESCAPES = methodcaller('translate', str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0'
+}))
+_LOAD_DATA_NULL = '\\N'
+
+# 批量导入时的会话设置及导入结束后的恢复语句，每个写入连接都要执行
+BULK_SESSION_SETTINGS = (
+    "SET autocommit=0",
+    "SET unique_checks=0",
+    "SET foreign_key_checks=0"
+)
+# 按键更新时必须保留唯一性检查，否则 InnoDB 可能漏掉二级唯一索引上的重复键
+UPSERT_SESSION_SETTINGS = (
+    "SET autocommit=0",
+    "SET foreign_key_checks=0"
+)
+RESTORE_SESSION_SETTINGS = (
+    "SET unique_checks=1",
+    "SET foreign_key_checks=1",
+    "SET autocommit=1"
+)
+
+# 可选的批量导入调优（bulk_tuning），没有权限或服务器不支持的设置直接跳过，导入结束后恢复原值。
+# sql_log_bin=0 使导入的数据不写入二进制日志，复制的从库上不会有这些数据
+TUNING_SESSION_SETTINGS = (
+    ('sql_log_bin', 0),
+    ('bulk_insert_buffer_size', 256 * 1024 * 1024)
+)
+# 全局设置对整个服务器生效，由同时进行的导入共用
+TUNING_GLOBAL_SETTINGS = (
+    ('innodb_flush_log_at_trx_commit', 2),
+)
+
+# 服务器或客户端禁止 LOCAL INFILE 时返回的错误码
+_LOCAL_INFILE_DISABLED_ERRORS = {
+    errorcode.ER_NOT_ALLOWED_COMMAND,
+    errorcode.ER_CLIENT_LOCAL_FILES_DISABLED,
+    errorcode.CR_LOAD_DATA_LOCAL_INFILE_REJECTED
+}
+
+
+def connect_options(write_method, spool_dir=None):
+    """返回建立连接时需要额外传入的参数"""
+    if write_method == WRITE_METHOD_LOAD_DATA and spool_dir:
+        # 只允许发送临时目录中的文件，而不是放开任意本地文件
+        return {'allow_local_infile_in_path': spool_dir}
+    return {}
+
+
+def _apply_settings(cursor, scope, settings):
+    """逐项修改系统变量，返回成功修改的 [(变量名, 原值)]"""
+    applied = []
+    for name, value in settings:
+        try:
+            cursor.execute(f"SELECT @@{scope}.{name}")
+            rows = cursor.fetchall()
+            if not rows:
+                continue
+            cursor.execute(f"SET {scope} {name} = {value}")
+        except mysql.connector.Error:
+            continue  # 变量不存在或没有权限
+        applied.append((name, rows[0][0]))
+    return applied
+
+
+def _restore_settings(cursor, scope, applied):
+    for name, value in reversed(applied):
+        try:
+            if isinstance(value, int):
+                cursor.execute(f"SET {scope} {name} = {value}")
+            else:
+                cursor.execute(f"SET {scope} {name} = %s", (value,))
+        except mysql.connector.Error:
+            pass
+
+
+def apply_bulk_session(cursor, upsert=False, tuning=False):
+    """执行批量导入的会话设置，tuning 为 True 时同时尝试 TUNING_SESSION_SETTINGS
+
+    返回成功修改的调优设置及其原值，导入结束后传给 restore_session。
+    """
+    for sql in UPSERT_SESSION_SETTINGS if upsert else BULK_SESSION_SETTINGS:
+        cursor.execute(sql)
+    return _apply_settings(cursor, 'SESSION', TUNING_SESSION_SETTINGS) if tuning else []
+
+
+def restore_session(cursor, tuning=()):
+    _restore_settings(cursor, 'SESSION', tuning)
+    for sql in RESTORE_SESSION_SETTINGS:
+        cursor.execute(sql)
+
+
+class GlobalTuning:
+    """按引用计数修改和恢复 TUNING_GLOBAL_SETTINGS
+
+    第一个开启调优的导入修改全局变量并记住原值，最后一个结束的导入恢复原值。
+    恢复时使用新建的连接，导入连接已经断开时也能恢复。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = 0
+        self._applied = []
+
+    def acquire(self, cursor):
+        with self._lock:
+            if self._users == 0:
+                self._applied = _apply_settings(cursor, 'GLOBAL', TUNING_GLOBAL_SETTINGS)
+            self._users += 1
+
+    def release(self, connect_kwargs):
+        with self._lock:
+            self._users -= 1
+            if self._users > 0 or not self._applied:
+                return
+            applied, self._applied = self._applied, []
+            conn = None
+            try:
+                conn = mysql.connector.connect(**connect_kwargs)
+                cursor = conn.cursor()
+                _restore_settings(cursor, 'GLOBAL', applied)
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+global_tuning = GlobalTuning()
+
+
+def staging_table_name(table_name):
+    return f'{table_name}__staging'
+
+
+def table_exists(cursor, table_name):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (table_name,)
+    )
+    return cursor.fetchall()[0][0] > 0
+
+
+def server_max_allowed_packet(cursor):
+    """查询服务器的 max_allowed_packet（字节），无法查询时返回 None"""
+    try:
+        cursor.execute("SELECT @@max_allowed_packet")
+        rows = cursor.fetchall()
+    except mysql.connector.Error:
+        return None
+    return int(rows[0][0]) if rows and rows[0][0] else None
+
+
+def swap_in_staging_table(cursor, staging_table, table_name):
+    """用一条 RENAME TABLE 语句原子地以临时表替换目标表，然后删除旧表"""
+    old_table = f'{table_name}__old'
+    cursor.execute(f'DROP TABLE IF EXISTS `{old_table}`')
+    if table_exists(cursor, table_name):
+        cursor.execute(f'RENAME TABLE `{table_name}` TO `{old_table}`, `{staging_table}` TO `{table_name}`')
+        cursor.execute(f'DROP TABLE `{old_table}`')
+    else:
+        cursor.execute(f'RENAME TABLE `{staging_table}` TO `{table_name}`')
+
+
+def format_load_data(rows):
+    """将转换后的行编码为 LOAD DATA 使用的制表符分隔文本（utf8mb4）
+
+    转换后的值都是字符串；差异导入追加的行哈希是整数，不含需要转义的字符，直接转为文本。
+    """
+    if not rows:
+        return b''
+    columns = []
+    for values in zip(*rows):
+        columns.append([_LOAD_DATA_NULL if value is None else
+                        _LOAD_DATA_ESCAPES(value) if isinstance(value, str) else str(value) for value in values])
+    lines = map('\t'.join, zip(*columns))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class ExecuteManyWriter:
+    """使用 executemany 批量 INSERT，upsert 为 True 时遇到重复键改为更新整行"""
+
+    method = WRITE_METHOD_EXECUTEMANY
+
+    def __init__(self, cursor, table_name, column_names, upsert=False):
+        self.cursor = cursor
+        placeholder = ", ".join(["%s"] * len(column_names))
+        columns = ", ".join(f"`{col}`" for col in column_names)
+        self.insert_sql = f'INSERT INTO `{table_name}` ({columns}) VALUES ({placeholder})'
+        if upsert:
+            updates = ", ".join(f"`{col}` = VALUES(`{col}`)" for col in column_names)
+            self.insert_sql += f' ON DUPLICATE KEY UPDATE {updates}'
+
+    def write(self, rows):
+        self.cursor.executemany(self.insert_sql, rows)
+
+
+class LoadDataWriter:
+    """通过 LOAD DATA LOCAL INFILE 批量写入
+
+    每个批次先写入临时目录中的文件再由服务器读取。服务器关闭了 local_infile
+    或客户端拒绝发送文件时，自动退回 executemany，并将 method 改为 executemany。
+    注意 LOCAL 方式下数据转换错误在服务器端只产生警告，不会中断导入。
+    upsert 为 True 时使用 REPLACE，遇到重复键时先删除旧行再写入新行。
+    """
+
+    def __init__(self, cursor, table_name, column_names, spool_dir, upsert=False):
+        self.cursor = cursor
+        self.spool_dir = spool_dir
+        self.fallback = ExecuteManyWriter(cursor, table_name, column_names, upsert)
+        columns = ", ".join(f"`{col}`" for col in column_names)
+        self.load_sql = (
+            f"LOAD DATA LOCAL INFILE %s {'REPLACE ' if upsert else ''}INTO TABLE `{table_name}` "
+            f"CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({columns})"
+        )
+        self.method = WRITE_METHOD_LOAD_DATA
+        if not self._server_allows_local_infile():
+            self.method = WRITE_METHOD_EXECUTEMANY
+
+    def _server_allows_local_infile(self):
+        try:
+            self.cursor.execute("SHOW GLOBAL VARIABLES LIKE 'local_infile'")
+            rows = self.cursor.fetchall()
+        except mysql.connector.Error:
+            return True  # 无法查询时直接尝试，失败后再退回
+        return not rows or str(rows[0][1]).upper() in ('ON', '1')
+
+    def write(self, rows):
+        if self.method != WRITE_METHOD_LOAD_DATA:
+            self.fallback.write(rows)
+            return
+        fd, path = tempfile.mkstemp(suffix='.tsv', dir=self.spool_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(format_load_data(rows))
+            self.cursor.execute(self.load_sql, (path,))
+        except mysql.connector.Error as err:
+            if err.errno not in _LOCAL_INFILE_DISABLED_ERRORS:
+                raise
+            self.method = WRITE_METHOD_EXECUTEMANY
+            self.fallback.write(rows)
+        finally:
+            os.remove(path)
+
+
+def create_spool_dir():
+    """为 LOAD DATA 创建临时目录，返回其真实路径"""
+    return os.path.realpath(tempfile.mkdtemp(prefix='xlsx2table_'))
+
+
+def remove_spool_dir(spool_dir):
+    if spool_dir:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+
+def create_writer(write_method, cursor, table_name, column_names, spool_dir=None, upsert=False):
+    if write_method == WRITE_METHOD_LOAD_DATA:
+        return LoadDataWriter(cursor, table_name, column_names, spool_dir, upsert)
+    return ExecuteManyWriter(cursor, table_name, column_names, upsert)
@@ -0,0 +1,217 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+import pandas as pd
+
+try:
+    import pyarrow.parquet  # noqa: F401  只用于判断 pandas 能否读写 Parquet
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+DEFAULT_CACHE_DIR = './cache'
+# 缓存总大小上限（字节），超出时按最近使用时间淘汰，为 0 时不使用缓存
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# 计算文件内容哈希时每次读取的字节数
+HASH_BLOCK_SIZE = 1024 * 1024
+# 缓存内容的格式版本，类型推断或读取规则变化时递增，使旧缓存失效
+CACHE_FORMAT_VERSION = 1
+
+_META_FILE = 'meta.json'
+_PARQUET_FILE = 'data.parquet'
+_PICKLE_FILE = 'data.pkl'
+
+
+def file_digest(file_path):
+    """文件内容的 BLAKE2b 哈希（十六进制）"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_id(file_path):
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class ImportCache:
+    """按文件路径、大小和修改时间缓存解析结果和推断的列类型，命中时再用内容哈希确认
+
+    每个文件（多工作表导入时每个工作表）一个目录，meta.json 保存列名、列类型、行数和文件内容哈希，
+    解析后的数据以列式格式保存：安装了 pyarrow 时为 Parquet，否则为 pandas pickle。
+    缓存键不读取文件内容，第一次导入不会为此多读一遍文件；内容哈希在写入条目后由后台线程计算，
+    命中时重新计算并比较，还没有记录哈希的条目按未命中处理。读取缓存时更新 meta.json 的修改时间
+    作为最近使用时间，写入后总大小超过 max_bytes 时淘汰最久未使用的条目。同一个进程内按
+    (路径, 大小, 修改时间) 记住文件哈希，重复导入时不再重算。
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # 同一个文件的哈希只计算一次，多个工作表的条目同时等待时共用结果
+        self._digest_lock = threading.Lock()
+        self._digests = {}
+        # 正在后台计算哈希的缓存键
+        self._hashing = set()
+        # {缓存键: (文件路径, (绝对路径, 大小, 修改时间))}
+        self._files = {}
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def key(self, file_path, sheet_name=None):
+        """缓存键：文件路径、大小、修改时间、工作表名和缓存格式版本，不读取文件内容"""
+        file_id = _file_id(file_path)
+        key = hashlib.blake2b(digest_size=16)
+        key.update(json.dumps([*file_id, sheet_name, CACHE_FORMAT_VERSION]).encode('utf-8'))
+        key = key.hexdigest()
+        with self._lock:
+            self._files[key] = (file_path, file_id)
+        return key
+
+    def _digest(self, key):
+        file_path, file_id = self._files[key]
+        with self._digest_lock:
+            digest = self._digests.get(file_id)
+            if digest is None:
+                digest = file_digest(file_path)
+                self._digests[file_id] = digest
+        return digest
+
+    def _record_digest(self, key):
+        """计算文件内容哈希并记入条目，计算期间文件被修改或条目被淘汰时不记录"""
+        file_path, file_id = self._files[key]
+        try:
+            digest = self._digest(key)
+            if _file_id(file_path) == file_id:
+                self._update_meta(key, {'digest': digest}, create=False)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._hashing.discard(key)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _read_meta(self, key):
+        try:
+            with open(os.path.join(self._entry_dir(key), _META_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _update_meta(self, key, values, create=True):
+        """更新条目的 meta.json，返回更新后的内容；create 为 False 且条目不存在时不创建"""
+        entry_dir = self._entry_dir(key)
+        with self._lock:
+            meta = self._read_meta(key)
+            if meta is None and not create:
+                return None
+            os.makedirs(entry_dir, exist_ok=True)
+            meta = meta or {}
+            meta.update(values)
+            _write_json(os.path.join(entry_dir, _META_FILE), meta)
+            start_hashing = 'digest' not in meta and key in self._files and key not in self._hashing
+            if start_hashing:
+                self._hashing.add(key)
+        if start_hashing:
+            threading.Thread(target=self._record_digest, args=(key,), daemon=True).start()
+        return meta
+
+    def get(self, key):
+        """返回缓存的元数据 {'columns', 'column_types', 'column_specs', 'total_rows', 'data_file'}，未命中时返回 None"""
+        meta = self._read_meta(key)
+        if meta is None or not meta.get('digest'):
+            return None
+        try:
+            if meta['digest'] != self._digest(key):
+                return None
+        except (KeyError, OSError):
+            return None
+        try:
+            os.utime(os.path.join(self._entry_dir(key), _META_FILE))
+        except OSError:
+            pass
+        return meta
+
+    def load_data(self, key, meta):
+        """读取缓存的数据，没有数据或读取失败时返回 None"""
+        data_file = meta.get('data_file')
+        if not data_file:
+            return None
+        path = os.path.join(self._entry_dir(key), data_file)
+        try:
+            if data_file == _PARQUET_FILE:
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_pickle(path)
+        except Exception:
+            return None
+        df.columns = meta['columns']
+        return df
+
+    def put_data(self, key, df):
+        """保存解析后的数据，列名按位置保存在 meta.json 中"""
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        data = df.set_axis([f'c{i}' for i in range(len(df.columns))], axis=1)
+        data_file = _PARQUET_FILE if HAS_PARQUET else _PICKLE_FILE
+        path = os.path.join(entry_dir, data_file)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        if HAS_PARQUET:
+            data.to_parquet(tmp_path, index=False)
+        else:
+            data.to_pickle(tmp_path, compression=None)
+        os.replace(tmp_path, path)
+        self._update_meta(key, {'columns': [str(col) for col in df.columns], 'total_rows': len(df),
+                                'data_file': data_file})
+        self.evict()
+
+    def put_schema(self, key, columns, column_types, total_rows, column_specs=None):
+        """保存推断的列类型和写入规格"""
+        self._update_meta(key, {'columns': [str(col) for col in columns], 'column_types': column_types,
+                                'column_specs': column_specs, 'total_rows': total_rows})
+        self.evict()
+
+    def _entries(self):
+        """返回 [(最近使用时间, 大小, 目录)]"""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+        for name in names:
+            entry_dir = os.path.join(self.cache_dir, name)
+            try:
+                files = [os.path.join(entry_dir, f) for f in os.listdir(entry_dir)]
+                size = sum(os.path.getsize(f) for f in files)
+                last_used = os.path.getmtime(os.path.join(entry_dir, _META_FILE))
+            except OSError:
+                continue
+            entries.append((last_used, size, entry_dir))
+        return entries
+
+    def evict(self):
+        """删除最久未使用的条目，直到总大小不超过 max_bytes"""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry_dir in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
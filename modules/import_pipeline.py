@@ -0,0 +1,97 @@
+import queue
+import threading
+
+# 各阶段之间队列的最大长度，队列满时上游阶段等待，避免读取速度远超写入时占用过多内存
+PIPELINE_QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+class _StageError:
+    """在队列中向下游传递上游阶段抛出的异常"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(q, item, stopped):
+    # 带超时地放入队列，其他阶段已停止时不会永久阻塞
+    while not stopped():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stopped):
+    while not stopped():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def pipelined(source, convert, should_stop=None, queue_size=PIPELINE_QUEUE_SIZE):
+    """以流水线方式读取和转换数据，返回转换后批次的迭代器
+
+    读取（遍历 source）和转换（调用 convert）分别在独立线程中执行，由调用方在当前线程中
+    写入数据库，三个阶段通过有界队列连接，因此文件解析、数据转换和数据库往返可以重叠进行。
+    should_stop 返回 True 时所有阶段停止，迭代随之结束，调用方需要自行检查是否为中途停止；
+    调用方提前结束迭代时后台线程同样会停止。读取或转换阶段的异常会在调用方的迭代中重新抛出。
+    """
+    stop_event = threading.Event()
+    raw_queue = queue.Queue(maxsize=queue_size)
+    converted_queue = queue.Queue(maxsize=queue_size)
+
+    def stopped():
+        return stop_event.is_set() or (should_stop is not None and should_stop())
+
+    def read_stage():
+        try:
+            for item in source:
+                if stopped() or not _put(raw_queue, item, stopped):
+                    return
+        except Exception as e:
+            _put(raw_queue, _StageError(e), stopped)
+            return
+        finally:
+            # 提前停止时关闭生成器，及时释放其打开的文件
+            if hasattr(source, 'close'):
+                source.close()
+        _put(raw_queue, _DONE, stopped)
+
+    def convert_stage():
+        while True:
+            item = _get(raw_queue, stopped)
+            if item is _DONE or isinstance(item, _StageError):
+                _put(converted_queue, item, stopped)
+                return
+            try:
+                converted = convert(item)
+            except Exception as e:
+                _put(converted_queue, _StageError(e), stopped)
+                return
+            if not _put(converted_queue, converted, stopped):
+                return
+
+    threads = [
+        threading.Thread(target=read_stage, daemon=True),
+        threading.Thread(target=convert_stage, daemon=True)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            item = _get(converted_queue, stopped)
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
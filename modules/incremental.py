@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+# 导入方式：replace 删除并重建目标表；append 追加到已有表；
+# upsert 按键列 INSERT ... ON DUPLICATE KEY UPDATE；diff 只写入新增或内容变化的行
+IMPORT_MODE_REPLACE = 'replace'
+IMPORT_MODE_APPEND = 'append'
+IMPORT_MODE_UPSERT = 'upsert'
+IMPORT_MODE_DIFF = 'diff'
+IMPORT_MODES = (IMPORT_MODE_REPLACE, IMPORT_MODE_APPEND, IMPORT_MODE_UPSERT, IMPORT_MODE_DIFF)
+# 需要键列的导入方式
+KEYED_IMPORT_MODES = (IMPORT_MODE_UPSERT, IMPORT_MODE_DIFF)
+
+# diff 方式在目标表中保存每行内容哈希的列
+ROW_HASH_COLUMN = '_row_hash'
+ROW_HASH_TYPE = 'BIGINT UNSIGNED'
+# 读取已有行哈希时每次取回的行数
+HASH_FETCH_ROWS = 100000
+# 为键列补建唯一索引时使用的索引名
+UNIQUE_KEY_NAME = 'xlsx2table_key'
+
+
+def _text(value):
+    # 部分版本的连接器以 bytes 返回 information_schema 中的值
+    return value.decode('utf-8') if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+def existing_columns(cursor, table_name):
+    """按列顺序返回已有表的 [(列名, 列类型)]，列类型为大写，表不存在时返回空列表"""
+    cursor.execute(
+        "SELECT column_name, column_type FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s ORDER BY ordinal_position",
+        (table_name,)
+    )
+    return [(_text(name), _text(column_type).upper()) for name, column_type in cursor.fetchall()]
+
+
+def has_unique_key(cursor, table_name, key_columns):
+    """表中是否已有恰好由 key_columns 组成的主键或唯一索引"""
+    cursor.execute(
+        "SELECT index_name, column_name FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND non_unique = 0 "
+        "ORDER BY index_name, seq_in_index",
+        (table_name,)
+    )
+    indexes = {}
+    for index_name, column_name in cursor.fetchall():
+        indexes.setdefault(_text(index_name), set()).add(_text(column_name).lower())
+    wanted = {col.lower() for col in key_columns}
+    return any(columns == wanted for columns in indexes.values())
+
+
+def validate_key_columns(key_columns, column_names):
+    """检查键列都在文件的列中，返回按文件中的写法修正大小写后的键列"""
+    by_name = {col.lower(): col for col in column_names}
+    missing = [col for col in key_columns if col.lower() not in by_name]
+    if missing:
+        raise ValueError(f"文件中没有键列: {', '.join(missing)}")
+    return [by_name[col.lower()] for col in key_columns]
+
+
+def prepare_existing_table(backend, cursor, table_name, column_names, import_mode, key_columns=None):
+    """为增量导入检查已有的目标表，返回沿用的列类型；表不存在时返回 None，由调用方推断类型并建表
+
+    已有表的列（不含行哈希列）必须与文件的列一一对应，此时直接沿用表结构，不再推断类型。
+    upsert/diff 方式下表中没有键列的唯一索引时补建一个；diff 方式下没有行哈希列时补建，
+    补建后的第一次导入会把所有行视为已变化。表结构的读取和修改由写入后端 backend 完成。
+    """
+    columns = backend.existing_columns(cursor, table_name)
+    if not columns:
+        return None
+    has_row_hash = any(name.lower() == ROW_HASH_COLUMN for name, _ in columns)
+    columns = [(name, column_type) for name, column_type in columns if name.lower() != ROW_HASH_COLUMN]
+    if [name.lower() for name, _ in columns] != [col.lower() for col in column_names]:
+        raise ValueError(
+            f"目标表 {table_name} 的列 ({', '.join(name for name, _ in columns)}) 与文件的列 "
+            f"({', '.join(column_names)}) 不一致，无法增量导入，请使用替换方式"
+        )
+    if import_mode in KEYED_IMPORT_MODES and not backend.has_unique_key(cursor, table_name, key_columns):
+        backend.add_unique_key(cursor, table_name, key_columns)
+    if import_mode == IMPORT_MODE_DIFF and not has_row_hash:
+        backend.add_row_hash_column(cursor, table_name)
+    return [column_type for _, column_type in columns]
+
+
+def row_hashes(batch):
+    """每行一个 64 位内容哈希，由 pandas 按列向量化计算，不同进程和不同次运行的结果一致"""
+    return pd.util.hash_pandas_object(batch, index=False).to_numpy()
+
+
+def fetch_row_hashes(cursor, signed=False):
+    """取回已执行的行哈希查询的结果，返回排好序的 uint64 数组，每行只占 8 字节
+
+    signed 为 True 时哈希按有符号 64 位整数保存（SQLite）。
+    """
+    dtype = np.int64 if signed else np.uint64
+    parts = []
+    while True:
+        rows = cursor.fetchmany(HASH_FETCH_ROWS)
+        if not rows:
+            break
+        parts.append(np.fromiter((row[0] for row in rows), dtype=dtype, count=len(rows)).view(np.uint64))
+    if not parts:
+        return np.empty(0, dtype=np.uint64)
+    return np.unique(np.concatenate(parts))
+
+
+class RowHashFilter:
+    """diff 方式的批次转换：只保留内容哈希不在已有表中的行，并在每行末尾附加行哈希
+
+    哈希按原始字符串计算，在转换之前过滤，未变化的行既不转换也不发送给数据库。
+    skipped 为已跳过的未变化行数。signed 为 True 时附加的哈希按有符号 64 位整数表示，
+    用于只支持有符号整数的数据库。
+    """
+
+    def __init__(self, convert, existing_hashes, signed=False):
+        self.convert = convert
+        self.existing_hashes = existing_hashes
+        self.signed = signed
+        self.skipped = 0
+
+    def __call__(self, batch):
+        hashes = row_hashes(batch)
+        changed = ~np.isin(hashes, self.existing_hashes)
+        self.skipped += len(batch) - int(changed.sum())
+        rows = self.convert(batch[changed])
+        changed_hashes = hashes[changed].view(np.int64) if self.signed else hashes[changed]
+        return [row + (row_hash,) for row, row_hash in zip(rows, changed_hashes.tolist())]
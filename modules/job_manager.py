@@ -0,0 +1,173 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# 默认同时运行的导入任务数，超出的任务按提交顺序排队
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+# 最多保留的任务记录数，超出时删除最早结束的任务
+MAX_JOB_HISTORY = 100
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_FINISHED = 'finished'
+JOB_FAILED = 'failed'
+JOB_STOPPED = 'stopped'
+
+
+class JobProgress(dict):
+    """任务进度，每次修改都会递增版本号并唤醒等待进度变化的线程"""
+
+    def __init__(self, job, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._job = job
+
+    def __setitem__(self, key, value):
+        with self._job.changed:
+            if self.get(key) == value and key in self:
+                return
+            super().__setitem__(key, value)
+            self._job.touch()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+class ImportJob:
+    """一个导入任务，持有自己的进度和停止标记"""
+
+    def __init__(self, file_name):
+        self.id = uuid.uuid4().hex
+        self.file_name = file_name
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)
+        self.version = 0
+        self._state = JOB_QUEUED
+        self.progress = JobProgress(self, {'percentage': 0, 'message': '排队等待中...', 'status': '', 'can_stop': True})
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # 导入开始后由导入函数设置的计时统计
+        self.metrics = None
+        # 多工作表导入时每个工作表的子任务，元素为 (工作表名, 表名, 子任务)
+        self.children = []
+        # 从检查点继续导入时为原任务的 ID
+        self.resumed_from = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        with self.changed:
+            self._state = value
+            self.touch()
+
+    def touch(self):
+        """标记任务已变化，调用方需持有 changed"""
+        self.version += 1
+        self.changed.notify_all()
+
+    def wait_for_change(self, version, timeout):
+        """等待版本号超过 version，返回最新版本号"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def is_done(self):
+        return self.state in (JOB_FINISHED, JOB_FAILED, JOB_STOPPED)
+
+    def to_dict(self):
+        with self.lock:
+            data = dict(self.progress)
+            data['version'] = self.version
+        data.update({
+            'job_id': self.id,
+            'file_name': self.file_name,
+            'state': self.state,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        })
+        return data
+
+
+def run_job(job, target, args=(), kwargs=None):
+    """在当前线程中执行任务，并根据进度中的 status 设置任务的最终状态
+
+    target 会以关键字参数 job 接收任务对象。开始前已被停止的任务直接标记为已停止。
+    """
+    if job.is_cancelled():
+        job.progress.update({'message': "导入已被用户停止", 'status': "已停止", 'can_stop': False})
+        job.finished_at = time.time()
+        job.state = JOB_STOPPED
+        return
+    job.started_at = time.time()
+    job.state = JOB_RUNNING
+    try:
+        target(*args, job=job, **(kwargs or {}))
+    finally:
+        status = job.progress.get('status')
+        job.finished_at = time.time()
+        if status == "导入失败":
+            job.state = JOB_FAILED
+        elif status == "已停止" or job.is_cancelled():
+            job.state = JOB_STOPPED
+        else:
+            job.state = JOB_FINISHED
+
+
+class JobManager:
+    """导入任务调度器
+
+    任务在有界线程池中执行，超出并发数的任务在线程池内部的 FIFO 队列中等待。
+    排队中的任务被停止时直接标记为已停止，不会再开始执行。
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_CONCURRENT_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='import-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, file_name, target, *args, **kwargs):
+        """提交任务，target 会以关键字参数 job 接收任务对象"""
+        job = ImportJob(file_name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_history()
+        self._executor.submit(run_job, job, target, args, kwargs)
+        return job
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_done()]
+        for job_id in finished[:max(len(self._jobs) - MAX_JOB_HISTORY, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def latest(self):
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
@@ -0,0 +1,66 @@
+import re
+from collections import namedtuple
+
+# 逻辑类型：类型推断、缓存和检查点中的列类型仍按 MariaDB 的写法保存（如 VARCHAR(60)、DECIMAL(10,2)），
+# 各写入后端把它解析为逻辑类型后再生成自己的列类型，读取已有表时再换回 MariaDB 的写法
+KIND_STRING = 'string'      # 有长度上限的字符串，VARCHAR(n)
+KIND_TEXT = 'text'          # 长文本，TEXT/MEDIUMTEXT/LONGTEXT
+KIND_INTEGER = 'integer'    # 32 位整数
+KIND_BIGINT = 'bigint'      # 64 位整数，unsigned 为 True 时无符号
+KIND_DECIMAL = 'decimal'    # 定点小数，precision 和 scale 为总位数和小数位数
+KIND_DOUBLE = 'double'      # 双精度浮点数
+KIND_DATE = 'date'
+KIND_DATETIME = 'datetime'
+
+LogicalType = namedtuple('LogicalType', 'kind length precision scale unsigned', defaults=(None, None, None, False))
+
+_TYPE_RE = re.compile(r'^\s*([A-Z ]+?)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?\s*(UNSIGNED)?\s*$')
+# 类型名（包括 SQLite 和 DuckDB 的写法）对应的逻辑类型，未列出的类型按长文本处理
+_KINDS = {
+    'VARCHAR': KIND_STRING, 'CHAR': KIND_STRING, 'CHARACTER VARYING': KIND_STRING,
+    'TEXT': KIND_TEXT, 'TINYTEXT': KIND_TEXT, 'MEDIUMTEXT': KIND_TEXT, 'LONGTEXT': KIND_TEXT,
+    'STRING': KIND_TEXT, 'CLOB': KIND_TEXT,
+    'INT': KIND_INTEGER, 'INTEGER': KIND_INTEGER, 'INT4': KIND_INTEGER, 'MEDIUMINT': KIND_INTEGER,
+    'SMALLINT': KIND_INTEGER, 'TINYINT': KIND_INTEGER,
+    'BIGINT': KIND_BIGINT, 'INT8': KIND_BIGINT, 'UBIGINT': KIND_BIGINT, 'HUGEINT': KIND_BIGINT,
+    'DECIMAL': KIND_DECIMAL, 'NUMERIC': KIND_DECIMAL,
+    'DOUBLE': KIND_DOUBLE, 'DOUBLE PRECISION': KIND_DOUBLE, 'FLOAT': KIND_DOUBLE, 'FLOAT8': KIND_DOUBLE,
+    'REAL': KIND_DOUBLE,
+    'DATE': KIND_DATE,
+    'DATETIME': KIND_DATETIME, 'TIMESTAMP': KIND_DATETIME
+}
+
+
+def parse_column_type(column_type):
+    """把列类型解析为 LogicalType，无法识别的类型按长文本处理"""
+    match = _TYPE_RE.match(str(column_type).upper())
+    if not match:
+        return LogicalType(KIND_TEXT)
+    name, first, second, unsigned = match.groups()
+    kind = _KINDS.get(name, KIND_TEXT)
+    if kind == KIND_STRING:
+        return LogicalType(kind, length=int(first)) if first else LogicalType(KIND_TEXT)
+    if kind == KIND_DECIMAL:
+        if not first:
+            return LogicalType(KIND_DOUBLE)
+        return LogicalType(kind, precision=int(first), scale=int(second or 0))
+    if kind == KIND_BIGINT:
+        return LogicalType(kind, unsigned=bool(unsigned) or name == 'UBIGINT')
+    return LogicalType(kind)
+
+
+def mariadb_type(logical):
+    """逻辑类型按 MariaDB 的写法表示，与类型推断的结果一致"""
+    if logical.kind == KIND_STRING:
+        return f'VARCHAR({logical.length})'
+    if logical.kind == KIND_DECIMAL:
+        return f'DECIMAL({logical.precision},{logical.scale})'
+    if logical.kind == KIND_BIGINT:
+        return 'BIGINT UNSIGNED' if logical.unsigned else 'BIGINT'
+    return {
+        KIND_TEXT: 'TEXT',
+        KIND_INTEGER: 'INT',
+        KIND_DOUBLE: 'DOUBLE',
+        KIND_DATE: 'DATE',
+        KIND_DATETIME: 'DATETIME'
+    }[logical.kind]
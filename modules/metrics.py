@@ -0,0 +1,307 @@
+import os
+import io
+import sys
+import time
+import pstats
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 批次写入、批次转换和提交耗时直方图的桶上限（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# 导入流程的各个阶段
+PHASE_READ = 'read'
+PHASE_CONNECT = 'connect'
+PHASE_ANALYZE = 'analyze'
+PHASE_DDL = 'ddl'
+PHASE_INSERT = 'insert'
+PHASE_FINALIZE = 'finalize'
+PHASES = (PHASE_READ, PHASE_CONNECT, PHASE_ANALYZE, PHASE_DDL, PHASE_INSERT, PHASE_FINALIZE)
+
+# cProfile 结果文件的保存目录，以及报告中列出的函数数量
+PROFILE_DIR = './profiles'
+PROFILE_TOP_FUNCTIONS = 30
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss():
+    """当前进程的常驻内存（字节），无法读取 /proc 时返回历史峰值"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return peak_rss()
+
+
+def peak_rss():
+    """当前进程的常驻内存峰值（字节）"""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Histogram:
+    """累计分桶的直方图，桶的含义与 Prometheus 的 le 一致"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'count': self.count,
+                'sum': round(self.sum, 6),
+                'max': round(self.max, 6),
+                'mean': round(self.sum / self.count, 6) if self.count else 0,
+                'buckets': {str(upper): count for upper, count in zip(self.buckets, self.counts)}
+            }
+
+    def prometheus_lines(self, name):
+        with self._lock:
+            lines = [f'{name}_bucket{{le="{upper}"}} {count}' for upper, count in zip(self.buckets, self.counts)]
+            lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+            lines.append(f'{name}_sum {self.sum}')
+            lines.append(f'{name}_count {self.count}')
+        return lines
+
+
+class MetricsRegistry:
+    """进程内所有导入任务的累计指标，以 Prometheus 文本格式输出"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.imports = {}
+        self.rows = 0
+        self.bytes_read = 0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.last_rows_per_second = 0.0
+        self.batch_write = Histogram()
+        self.batch_convert = Histogram()
+        self.commit = Histogram()
+
+    def add_rows(self, count):
+        with self._lock:
+            self.rows += count
+
+    def add_bytes_read(self, count):
+        with self._lock:
+            self.bytes_read += count
+
+    def add_phase(self, phase, seconds):
+        with self._lock:
+            self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+
+    def insert_rows_per_second(self):
+        """最近一次导入的写入吞吐量，没有时为所有导入写入阶段的平均值，还没有导入过时返回 None"""
+        with self._lock:
+            if self.last_rows_per_second:
+                return self.last_rows_per_second
+            seconds = self.phase_seconds.get(PHASE_INSERT, 0.0)
+            return self.rows / seconds if self.rows and seconds else None
+
+    def finish_import(self, status, rows_per_second):
+        with self._lock:
+            self.imports[status] = self.imports.get(status, 0) + 1
+            if rows_per_second:
+                self.last_rows_per_second = rows_per_second
+
+    def render(self, job_states=None):
+        """job_states 为 {任务状态: 任务数}，作为当前任务数的 gauge 输出"""
+        with self._lock:
+            lines = [
+                '# HELP xlsx2table_imports_total Finished imports by final status.',
+                '# TYPE xlsx2table_imports_total counter'
+            ]
+            lines += [f'xlsx2table_imports_total{{status="{status}"}} {count}' for status, count in self.imports.items()]
+            lines += [
+                '# HELP xlsx2table_rows_imported_total Rows written to the database.',
+                '# TYPE xlsx2table_rows_imported_total counter',
+                f'xlsx2table_rows_imported_total {self.rows}',
+                '# HELP xlsx2table_bytes_read_total Bytes read from source files.',
+                '# TYPE xlsx2table_bytes_read_total counter',
+                f'xlsx2table_bytes_read_total {self.bytes_read}',
+                '# HELP xlsx2table_phase_seconds_total Time spent in each import phase.',
+                '# TYPE xlsx2table_phase_seconds_total counter'
+            ]
+            lines += [f'xlsx2table_phase_seconds_total{{phase="{phase}"}} {seconds}'
+                      for phase, seconds in self.phase_seconds.items()]
+            lines += [
+                '# HELP xlsx2table_last_import_rows_per_second Insert throughput of the last finished import.',
+                '# TYPE xlsx2table_last_import_rows_per_second gauge',
+                f'xlsx2table_last_import_rows_per_second {self.last_rows_per_second}'
+            ]
+        for name, help_text, histogram in (
+            ('xlsx2table_batch_write_seconds', 'Time to hand one batch to the database writer.', self.batch_write),
+            ('xlsx2table_batch_convert_seconds', 'Time to convert one batch of rows.', self.batch_convert),
+            ('xlsx2table_commit_seconds', 'Commit latency.', self.commit)
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            lines += histogram.prometheus_lines(name)
+        if job_states is not None:
+            lines += ['# HELP xlsx2table_jobs Import jobs by state.', '# TYPE xlsx2table_jobs gauge']
+            lines += [f'xlsx2table_jobs{{state="{state}"}} {count}' for state, count in job_states.items()]
+        lines += [
+            '# HELP xlsx2table_process_peak_rss_bytes Peak resident memory of the process.',
+            '# TYPE xlsx2table_process_peak_rss_bytes gauge',
+            f'xlsx2table_process_peak_rss_bytes {peak_rss()}'
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+class ImportMetrics:
+    """单个导入任务的计时和统计
+
+    阶段按顺序切换：start_phase 会结束上一个阶段，finish 结束最后一个阶段。
+    所有观测值同时累加到 registry（如果提供）中。内存峰值是在阶段切换和每个批次写入时
+    采样的进程常驻内存，多个任务同时运行时相互包含。
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry
+        self.started_at = time.time()
+        self.finished_at = None
+        self.phases = {}
+        self.rows = 0
+        self.bytes_read = 0
+        self.batch_write = Histogram()
+        self.batch_convert = Histogram()
+        self.commit = Histogram()
+        self.peak_rss = current_rss()
+        self.profile = None
+        self._phase = None
+        self._phase_started = None
+        self._start = time.perf_counter()
+        self._total = None
+
+    def start_phase(self, phase):
+        now = time.perf_counter()
+        self._end_phase(now)
+        self._phase = phase
+        self._phase_started = now
+        self.sample_memory()
+
+    def _end_phase(self, now):
+        if self._phase is None:
+            return
+        seconds = now - self._phase_started
+        self.phases[self._phase] = self.phases.get(self._phase, 0.0) + seconds
+        if self.registry:
+            self.registry.add_phase(self._phase, seconds)
+        self._phase = None
+
+    def finish(self, status):
+        if self._total is not None:
+            return
+        now = time.perf_counter()
+        self._end_phase(now)
+        self._total = now - self._start
+        self.finished_at = time.time()
+        self.sample_memory()
+        if self.registry:
+            self.registry.finish_import(status, self.rows_per_second())
+
+    def sample_memory(self):
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+    def add_bytes_read(self, count):
+        self.bytes_read += count
+        if self.registry:
+            self.registry.add_bytes_read(count)
+
+    def add_rows(self, count):
+        self.rows += count
+        if self.registry:
+            self.registry.add_rows(count)
+
+    def observe_write(self, seconds, rows):
+        self.batch_write.observe(seconds)
+        if self.registry:
+            self.registry.batch_write.observe(seconds)
+        self.add_rows(rows)
+        self.sample_memory()
+
+    def observe_convert(self, seconds):
+        self.batch_convert.observe(seconds)
+        if self.registry:
+            self.registry.batch_convert.observe(seconds)
+
+    def observe_commit(self, seconds):
+        self.commit.observe(seconds)
+        if self.registry:
+            self.registry.commit.observe(seconds)
+
+    def timed_convert(self, convert):
+        """包装批次转换函数，记录每个批次的转换耗时"""
+        def wrapper(batch):
+            start = time.perf_counter()
+            result = convert(batch)
+            self.observe_convert(time.perf_counter() - start)
+            return result
+        return wrapper
+
+    def timed_commit(self, conn):
+        """提交并记录耗时，返回提交耗时（秒）"""
+        start = time.perf_counter()
+        conn.commit()
+        seconds = time.perf_counter() - start
+        self.observe_commit(seconds)
+        return seconds
+
+    def elapsed(self):
+        return self._total if self._total is not None else time.perf_counter() - self._start
+
+    def rows_per_second(self):
+        insert_seconds = self.phases.get(PHASE_INSERT, 0.0)
+        return self.rows / insert_seconds if insert_seconds else 0.0
+
+    def save_profile(self, profiler, name):
+        """保存 cProfile 结果，报告中附带按累计耗时排序的前若干个函数"""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f'{name}.prof')
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        self.profile = {'file': os.path.abspath(path), 'summary': summary.getvalue()}
+
+    def report(self):
+        """返回可序列化为 JSON 的计时报告"""
+        elapsed = self.elapsed()
+        report = {
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'elapsed_seconds': round(elapsed, 6),
+            'current_phase': self._phase,
+            'phases': {phase: round(seconds, 6) for phase, seconds in dict(self.phases).items()},
+            'rows': self.rows,
+            'rows_per_second': round(self.rows_per_second(), 1),
+            'overall_rows_per_second': round(self.rows / elapsed, 1) if elapsed else 0,
+            'bytes_read': self.bytes_read,
+            'peak_rss_bytes': self.peak_rss,
+            'batch_write_seconds': self.batch_write.to_dict(),
+            'batch_convert_seconds': self.batch_convert.to_dict(),
+            'commit_seconds': self.commit.to_dict()
+        }
+        if self.profile:
+            report['profile'] = self.profile
+        return report
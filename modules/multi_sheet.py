@@ -0,0 +1,129 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from modules.job_manager import ImportJob, run_job, JOB_RUNNING, JOB_FAILED, JOB_STOPPED
+from modules.parallel_analysis import default_workers
+
+# 默认同时导入的工作表数，每个工作表使用自己的数据库连接
+DEFAULT_SHEET_WORKERS = 4
+# 汇总子任务进度的间隔（秒）
+SHEET_PROGRESS_INTERVAL = 0.2
+
+# 文件名部分和工作表名部分的最大长度。加上分隔符、重名序号和临时表后缀 __staging
+# 后仍不超过 MariaDB 表名的 64 个字符
+TABLE_NAME_LENGTH = 30
+SHEET_NAME_LENGTH = 24
+_TABLE_NAME_INVALID = re.compile(r'[^a-zA-Z0-9_\u4e00-\u9fff]')
+
+
+def clean_table_name(name, max_length=TABLE_NAME_LENGTH):
+    """把文件名或工作表名转换为可用的表名，不允许的字符替换为下划线"""
+    return _TABLE_NAME_INVALID.sub('_', str(name))[:max_length]
+
+
+def sheet_table_names(file_stem, sheet_names):
+    """为每个工作表生成 文件名_工作表名 形式的表名，返回与 sheet_names 等长的列表
+
+    转换或截断后重名的工作表按在工作簿中的顺序依次加上 _2、_3 等后缀。
+    应传入工作簿中的全部工作表，这样只导入其中一部分时表名也与全部导入时相同。
+    """
+    prefix = clean_table_name(file_stem)
+    names = []
+    used = set()
+    for sheet_name in sheet_names:
+        sheet_part = clean_table_name(sheet_name, SHEET_NAME_LENGTH)
+        name = f"{prefix}_{sheet_part}"
+        index = 1
+        # MariaDB 在大小写不敏感的文件系统上不区分表名大小写
+        while name.lower() in used:
+            index += 1
+            suffix = f"_{index}"
+            name = f"{prefix}_{sheet_part[:SHEET_NAME_LENGTH - len(suffix)]}{suffix}"
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+def sheet_analysis_workers(analysis_workers, sheet_workers, sheet_count):
+    """同时导入多个工作表时每个工作表分析列类型的进程数
+
+    各工作表的进程池同时运行，总进程数不超过 analysis_workers（默认等于 CPU 核数）。
+    """
+    concurrent = max(1, min(sheet_workers, sheet_count))
+    return max(1, (analysis_workers or default_workers()) // concurrent)
+
+
+def import_sheets(job, sheets, import_sheet, workers=DEFAULT_SHEET_WORKERS):
+    """并行导入多个工作表，并把各工作表的进度汇总到 job
+
+    sheets 为 [(工作表名, 表名)]，import_sheet(sheet_name, table_name, job=子任务) 导入一个工作表。
+    每个工作表是一个子任务，拥有自己的进度和停止标记，最多 workers 个同时执行；
+    停止 job 时同时停止所有子任务，尚未开始的工作表不再导入。
+    汇总进度为各工作表进度的平均值，已结束的工作表按 100% 计。
+    """
+    progress = job.progress
+    start_time = time.time()
+    job.children = [(sheet_name, table_name, ImportJob(f"{job.file_name} [{sheet_name}]"))
+                    for sheet_name, table_name in sheets]
+    if not job.children:
+        progress.update({'percentage': 0, 'message': "文件中没有可导入的工作表",
+                         'status': "导入失败", 'can_stop': False})
+        return progress['message']
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sheets))),
+                            thread_name_prefix='import-sheet') as executor:
+        pending = {executor.submit(run_job, child, import_sheet, (sheet_name, table_name))
+                   for sheet_name, table_name, child in job.children}
+        while pending:
+            if job.is_cancelled():
+                for _, _, child in job.children:
+                    child.cancel()
+            _, pending = wait(pending, timeout=SHEET_PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            _aggregate_progress(job)
+
+    failed = [(sheet_name, child) for sheet_name, _, child in job.children if child.state == JOB_FAILED]
+    stopped = any(child.state == JOB_STOPPED for _, _, child in job.children)
+    rows = sum(child.metrics.rows for _, _, child in job.children if child.metrics)
+    if failed:
+        progress.update({
+            'message': "；".join(f"{sheet_name}: {child.progress.get('message')}" for sheet_name, child in failed),
+            'status': "导入失败"
+        })
+    elif stopped or job.is_cancelled():
+        progress.update({'message': "导入已被用户停止", 'status': "已停止"})
+    else:
+        elapsed_time = time.time() - start_time
+        progress.update({
+            'percentage': 100,
+            'message': "导入完成！",
+            'status': f"一共导入 {len(job.children)} 个工作表、{rows} 条数据，用时 {elapsed_time:.2f} 秒。"
+        })
+    progress['can_stop'] = False
+    return progress['message']
+
+
+def _aggregate_progress(job):
+    sheets = []
+    total = 0
+    done = running = 0
+    for sheet_name, table_name, child in job.children:
+        snapshot = child.to_dict()
+        if child.is_done():
+            done += 1
+            total += 100
+        else:
+            running += child.state == JOB_RUNNING
+            total += snapshot.get('percentage', 0)
+        sheets.append({
+            'sheet': sheet_name,
+            'table': table_name,
+            'state': snapshot['state'],
+            'percentage': snapshot.get('percentage', 0),
+            'message': snapshot.get('message', ''),
+            'status': snapshot.get('status', '')
+        })
+    job.progress.update({
+        'percentage': min(total // len(job.children), 99),
+        'message': f"正在导入 {len(job.children)} 个工作表：已结束 {done} 个，正在导入 {running} 个",
+        'sheets': sheets
+    })
@@ -0,0 +1,130 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import pandas as pd
+from modules.column_type_detector import DEFAULT_SAMPLE_SIZE, VALUE_SEPARATOR, profile_column
+
+# 数据量（行数 × 列数）低于该值时直接在当前进程中逐列分析，进程池的启动和传输开销得不偿失
+PARALLEL_MIN_CELLS = 1000000
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _mp_context():
+    # Flask 进程中有多个线程，直接 fork 不安全，优先使用 forkserver
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['modules.parallel_analysis'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _profile_shared_column(shm_name, size, sample_size):
+    """子进程：从共享内存中读取一列数据并统计"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        text = bytes(shm.buf[:size]).decode('utf-8')
+    finally:
+        shm.close()
+    values = pd.Series(text.split(VALUE_SEPARATOR), dtype=object)
+    return profile_column(values, sample_size)
+
+
+class ColumnAnalyzer:
+    """按列并行推断类型
+
+    每列数据以分隔符拼接、UTF-8 编码后放入独立的共享内存块，子进程只接收共享内存的名称，
+    避免整个 DataFrame 被序列化传给每个子进程。返回可合并的 ColumnProfile，
+    流式模式下可以逐块分析后再合并。数据量较小或 workers 为 1 时退化为逐列串行分析。
+    """
+
+    def __init__(self, workers=None, sample_size=DEFAULT_SAMPLE_SIZE, min_cells=PARALLEL_MIN_CELLS):
+        self.workers = workers or default_workers()
+        self.sample_size = sample_size
+        self.min_cells = min_cells
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def profile(self, df, on_progress=None):
+        """返回 df 每一列的 ColumnProfile，on_progress(已完成列数, 总列数) 用于汇报进度"""
+        rows, cols = df.shape
+        if self.workers <= 1 or cols < 2 or rows * cols < self.min_cells:
+            return self._profile_serial(df, range(cols), [None] * cols, on_progress)
+        try:
+            return self._profile_parallel(df, on_progress)
+        except (OSError, BrokenProcessPool):
+            # 共享内存不足或子进程异常退出时退回串行分析
+            self.close()
+            return self._profile_serial(df, range(cols), [None] * cols, on_progress)
+
+    def _profile_serial(self, df, positions, profiles, on_progress):
+        done = 0
+        for j in positions:
+            profiles[j] = profile_column(df.iloc[:, j], self.sample_size)
+            done += 1
+            if on_progress:
+                on_progress(done, len(profiles))
+        return profiles
+
+    def _profile_parallel(self, df, on_progress):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+
+        cols = df.shape[1]
+        profiles = [None] * cols
+        serial_positions = []
+        segments = []
+        futures = {}
+        try:
+            for j in range(cols):
+                values = df.iloc[:, j].astype(str)
+                joined = VALUE_SEPARATOR.join(values)
+                if joined.count(VALUE_SEPARATOR) != len(values) - 1:
+                    # 值本身含有分隔符，无法无歧义地拆分，交给当前进程分析
+                    serial_positions.append(j)
+                    continue
+                data = joined.encode('utf-8')
+                del joined
+                shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+                segments.append(shm)
+                shm.buf[:len(data)] = data
+                future = self._executor.submit(_profile_shared_column, shm.name, len(data), self.sample_size)
+                futures[future] = j
+
+            # 子进程分析的同时在当前进程中处理剩余的列
+            self._profile_serial(df, serial_positions, profiles, on_progress)
+            done = len(serial_positions)
+
+            for future in as_completed(futures):
+                profiles[futures[future]] = future.result()
+                done += 1
+                if on_progress:
+                    on_progress(done, cols)
+        finally:
+            for future in futures:
+                future.cancel()
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+        return profiles
+
+
+def merge_profiles(profiles, chunk_profiles):
+    """将一个数据块的分析结果合并到累计结果中"""
+    if profiles is None:
+        return chunk_profiles
+    return [profile.merge(chunk_profile) for profile, chunk_profile in zip(profiles, chunk_profiles)]
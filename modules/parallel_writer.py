@@ -0,0 +1,138 @@
+import time
+import queue
+import threading
+
+_DONE = object()
+
+
+class ParallelWriter:
+    """多连接并行写入
+
+    启动 workers 个写入线程，每个线程通过写入后端 backend 建立一个独立的数据库连接
+    （相当于固定大小的连接池），并在该连接上执行与主连接相同的批量导入会话设置。
+    批次通过有界队列分发给各线程，每个线程写满 sizer.commit_rows 行后各自提交，
+    并把每个批次的写入和提交耗时报告给 sizer，用于调整批次和提交行数。
+    任一线程出错时，后续的 write/close 会抛出该异常。
+    提供 metrics 时记录各线程的提交耗时，tuning 为 True 时各连接同样尝试批量导入调优设置。
+    write 可以附带一个标记，批次提交后可以通过 take_committed 取回，用于记录检查点。
+    """
+
+    def __init__(self, backend, table_name, column_names, workers, sizer, metrics=None, tuning=False):
+        self.method = backend.write_method
+        self._metrics = metrics
+        self._sizer = sizer
+        self.rows_written = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=workers * 2)
+        self._aborted = threading.Event()
+        self._errors = []
+        self._committed_tags = []
+        self._threads = [
+            threading.Thread(
+                target=self._run,
+                args=(backend, table_name, column_names, tuning),
+                daemon=True
+            )
+            for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self, backend, table_name, column_names, tuning):
+        conn = None
+        cursor = None
+        try:
+            conn = backend.connect()
+            cursor = conn.cursor()
+            session_tuning = backend.apply_bulk_session(cursor, tuning=tuning)
+            writer = backend.create_writer(cursor, table_name, column_names)
+            records_since_commit = 0
+            pending_tags = []
+            while not self._aborted.is_set():
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                rows, tag = item
+                # 数据量超过一条 INSERT 的上限时拆开写入
+                for part in self._sizer.observe_rows(rows):
+                    write_start = time.perf_counter()
+                    writer.write(part)
+                    self._sizer.observe_write(len(part), time.perf_counter() - write_start)
+                records_since_commit += len(rows)
+                if tag is not None:
+                    pending_tags.append(tag)
+                if records_since_commit >= self._sizer.commit_rows:
+                    self._commit(conn, pending_tags)
+                    records_since_commit = 0
+                    pending_tags = []
+                with self._lock:
+                    self.rows_written += len(rows)
+            if not self._aborted.is_set():
+                self._commit(conn, pending_tags)
+                backend.restore_session(cursor, session_tuning)
+        except Exception as e:
+            self._errors.append(e)
+            self._aborted.set()
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except:
+                    pass
+            if conn:
+                try:
+                    backend.close_connection(conn)
+                except:
+                    pass
+
+    def _commit(self, conn, tags):
+        start = time.perf_counter()
+        conn.commit()
+        seconds = time.perf_counter() - start
+        if self._metrics:
+            self._metrics.observe_commit(seconds)
+        self._sizer.observe_commit(seconds)
+        with self._lock:
+            self._committed_tags.extend(tags)
+
+    def take_committed(self):
+        """返回并清空自上次调用以来已提交批次的标记"""
+        with self._lock:
+            tags, self._committed_tags = self._committed_tags, []
+        return tags
+
+    def _raise_if_failed(self):
+        if self._errors:
+            raise self._errors[0]
+
+    def write(self, rows, tag=None):
+        """将一个批次交给写入线程，队列已满时等待"""
+        self._put((rows, tag))
+
+    def _put(self, item):
+        while True:
+            self._raise_if_failed()
+            if self._aborted.is_set():
+                raise RuntimeError("并行写入已中止")
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        """等待所有已提交的批次写入并提交"""
+        for _ in self._threads:
+            self._put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        self._raise_if_failed()
+
+    def abort(self):
+        """放弃尚未提交的数据并结束所有写入线程"""
+        self._aborted.set()
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,266 @@
+import os
+import io
+import math
+import time
+import numpy as np
+import pandas as pd
+from modules.column_type_detector import profile_column
+from modules.batch_converter import BatchConverter
+from modules.csv_format import csv_compression
+from modules.stream_reader import ChunkedReader, detect_file_type, file_stem
+from modules.multi_sheet import clean_table_name
+from modules.incremental import validate_key_columns
+from modules.table_ddl import ROW_SIZE_LIMIT
+from modules.backends import BACKEND_MARIADB, ddl_backend
+
+# 预览默认读取的行数和允许的最大行数
+PREVIEW_ROWS = 1000
+MAX_PREVIEW_ROWS = 100000
+# 取样方式：head 为文件开头的若干行，random 为随机抽取的行
+SAMPLE_HEAD = 'head'
+SAMPLE_RANDOM = 'random'
+SAMPLE_METHODS = (SAMPLE_HEAD, SAMPLE_RANDOM)
+# 随机取样时读取的时间上限（秒），无法跳转读取的文件在这段时间内能读到的行中抽样
+PREVIEW_TIME_BUDGET = 1.5
+# 未压缩的 CSV 随机取样时每次跳转后读取的字节数，以及最多跳转的次数
+RANDOM_BLOCK_BYTES = 64 * 1024
+RANDOM_MAX_BLOCKS = 256
+# 结果中附带的样本行数
+PREVIEW_SHOW_ROWS = 10
+# 按 rule of three 估计置信度：n 个值全部符合时，不符合的比例以 95% 的置信度低于 3 / n
+CONFIDENCE_EVENTS = 3
+
+
+def _head_sample(reader, rows):
+    """读取开头的 rows 行，返回 (数据, 已读取比例, 已读取行数)"""
+    chunks = iter(reader)
+    try:
+        for chunk, fraction in chunks:
+            return chunk, fraction, len(chunk)
+    finally:
+        chunks.close()
+    return pd.DataFrame(columns=reader.columns, dtype=object), 1.0, 0
+
+
+def _reservoir_sample(reader, rows, rng):
+    """在限定时间内逐块读取，每行附带一个随机数，保留随机数最小的 rows 行，得到已读部分的均匀抽样
+
+    返回 (数据, 已读取比例, 已读取行数)，读完整个文件时比例为 1。
+    """
+    kept = pd.DataFrame(columns=reader.columns, dtype=object)
+    kept_keys = np.empty(0)
+    fraction = 0.0
+    seen = 0
+    deadline = time.perf_counter() + PREVIEW_TIME_BUDGET
+    chunks = iter(reader)
+    try:
+        for chunk, fraction in chunks:
+            seen += len(chunk)
+            keys = np.concatenate([kept_keys, rng.random(len(chunk))])
+            combined = pd.concat([kept, chunk], ignore_index=True)
+            order = np.argsort(keys, kind='stable')[:rows]
+            kept, kept_keys = combined.iloc[order].reset_index(drop=True), keys[order]
+            if time.perf_counter() > deadline:
+                break
+        else:
+            fraction = 1.0
+    finally:
+        chunks.close()
+    return kept, fraction, seen
+
+
+def _random_csv_sample(reader, rows, rng):
+    """未压缩的 CSV 跳转到随机位置读取若干块，从下一个换行开始解析完整的行
+
+    引号内含有换行的字段可能被从中间切开，列数不一致的行直接丢弃。
+    返回 (数据, 估计的总行数)。
+    """
+    csv_format = reader.csv_format
+    kwargs = csv_format.read_csv_kwargs()
+    kwargs.update(header=None, names=reader.columns, encoding=None)
+    size = reader.file_size
+    parts = []
+    parsed_rows = 0
+    parsed_bytes = 0
+    deadline = time.perf_counter() + PREVIEW_TIME_BUDGET
+    with open(reader.file_path, 'rb') as f:
+        for _ in range(RANDOM_MAX_BLOCKS):
+            f.seek(int(rng.integers(0, max(size - RANDOM_BLOCK_BYTES, 1))))
+            block = f.read(RANDOM_BLOCK_BYTES)
+            start, end = block.find(b'\n') + 1, block.rfind(b'\n') + 1
+            if start <= 0 or end <= start:
+                continue
+            text = block[start:end].decode(csv_format.encoding, errors='replace')
+            try:
+                part = pd.read_csv(io.StringIO(text), on_bad_lines='skip', **kwargs)
+            except (ValueError, pd.errors.ParserError):
+                continue
+            parts.append(part)
+            parsed_rows += len(part)
+            parsed_bytes += end - start
+            if parsed_rows >= rows or time.perf_counter() > deadline:
+                break
+    if not parts:
+        return pd.DataFrame(columns=reader.columns, dtype=object), None
+    sample = pd.concat(parts, ignore_index=True)
+    if len(sample) > rows:
+        sample = sample.iloc[np.sort(rng.choice(len(sample), rows, replace=False))].reset_index(drop=True)
+    return sample, int(size / (parsed_bytes / max(parsed_rows, 1)))
+
+
+def _csv_bytes_per_row(reader, data):
+    """按样本重新编码后的字节数估计未压缩 CSV 每行的字节数"""
+    text = data.to_csv(index=False, header=False, sep=reader.csv_format.delimiter)
+    return len(text.encode(reader.csv_format.encoding, errors='replace')) / max(len(data), 1)
+
+
+def read_sample(file_path, rows=PREVIEW_ROWS, method=SAMPLE_HEAD, sheet_name=None, seed=0):
+    """通过流式读取器读取一部分数据，不会读取整个文件
+
+    返回 {'reader', 'data', 'complete', 'total_rows', 'seconds'}：complete 表示样本覆盖了整个文件，
+    total_rows 为估计的总行数，未压缩的 CSV 按每行的字节数估计，其他文件按已读取的比例估计。
+    """
+    started = time.perf_counter()
+    file_type = detect_file_type(file_path)
+    reader = ChunkedReader(file_path, file_type, chunk_rows=rows, sheet_name=sheet_name)
+    rng = np.random.default_rng(seed)
+    plain_csv = file_type == 'csv' and not csv_compression(file_path)
+    if method == SAMPLE_RANDOM and plain_csv and reader.file_size > RANDOM_BLOCK_BYTES * 4:
+        data, total_rows = _random_csv_sample(reader, rows, rng)
+        complete = False
+    else:
+        if method == SAMPLE_RANDOM:
+            data, fraction, seen = _reservoir_sample(reader, rows, rng)
+            complete = fraction >= 1.0
+        else:
+            data, fraction, seen = _head_sample(reader, rows)
+            complete = seen < rows
+        if complete:
+            total_rows = seen
+        elif plain_csv and len(data):
+            total_rows = int(reader.file_size / _csv_bytes_per_row(reader, data))
+        elif 0 < fraction < 1:
+            total_rows = int(seen / fraction)
+        else:
+            total_rows = None
+    return {
+        'reader': reader,
+        'data': data,
+        'complete': complete,
+        'total_rows': total_rows,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def type_confidence(non_empty, complete):
+    """推断的列类型对整个文件成立的把握
+
+    读完整个文件时为 1；否则按 rule of three，样本中 n 个非空值全部符合该类型（对 VARCHAR
+    而言是长度不超过样本中的最大值）时，其余每个值符合的概率以 95% 的置信度不低于 1 - 3 / n。
+    没有非空值时类型只是默认值，为 0。
+    """
+    if complete:
+        return 1.0
+    if not non_empty:
+        return 0.0
+    # 向下取整，没有读完整个文件时不会显示为 1
+    return math.floor(max(1.0 - CONFIDENCE_EVENTS / non_empty, 0.0) * 10000) / 10000
+
+
+def _rows_per_second(rows, seconds):
+    return rows / seconds if rows and seconds > 0 else None
+
+
+def estimate_seconds(total_rows, read_rps, analyze_rps, insert_rps):
+    """按实测吞吐量估计非流式导入的耗时：读取、类型分析、转换并写入三个阶段依次进行"""
+    if not total_rows or not read_rps or not analyze_rps or not insert_rps:
+        return None
+    return round(total_rows / read_rps + total_rows / analyze_rps + total_rows / insert_rps, 1)
+
+
+def approximate_insert_rate(convert_rps, write_rps):
+    """还没有实测的写入吞吐量时，由样本的转换吞吐量和后端默认的写入速度估计转换并写入的吞吐量"""
+    if not convert_rps or not write_rps:
+        return None
+    return 1 / (1 / convert_rps + 1 / write_rps)
+
+
+def preview_file(file_path, rows=PREVIEW_ROWS, method=SAMPLE_HEAD, sheet_name=None, table_name=None,
+                 primary_key=None, table_options=None, insert_rows_per_second=None, default_write_rows_per_second=None,
+                 backend=None):
+    """读取一部分数据，返回推断的表结构、各列类型的置信度、行大小和预计的导入耗时
+
+    不连接数据库。backend 为写入后端（见 modules.backends.ddl_backend），默认为 MariaDB，
+    键列检查、行大小调整和建表语句都与导入时一样由它完成。insert_rows_per_second 为以往导入实测的写入吞吐量（包括转换）；没有时按样本的转换吞吐量
+    和 default_write_rows_per_second（写入后端默认的写入速度，不包括转换）估计，结果中 estimate_approximate 为 True。
+    """
+    backend = backend or ddl_backend(BACKEND_MARIADB)
+    sample = read_sample(file_path, rows, method, sheet_name)
+    reader, data = sample['reader'], sample['data']
+    columns = list(reader.columns)
+    sampled = len(data)
+
+    analyze_start = time.perf_counter()
+    profiles = [profile_column(data.iloc[:, j], None) for j in range(len(columns))]
+    analyze_seconds = time.perf_counter() - analyze_start
+    specs = [profile.column_spec() for profile in profiles]
+    column_types = [spec['type'] for spec in specs]
+
+    convert_start = time.perf_counter()
+    BatchConverter(specs, columns)(data)
+    convert_rps = _rows_per_second(sampled, time.perf_counter() - convert_start)
+
+    primary_key = validate_key_columns(primary_key, columns) if primary_key else None
+    keep = sorted({columns.index(col) for col in primary_key or []})
+    backend.validate_key_types([columns[i] for i in keep], [column_types[i] for i in keep])
+    ddl_column_types, row_size, text_columns = backend.fit_column_types(column_types, keep)
+    table_name = table_name or clean_table_name(file_stem(file_path))
+    non_empty = [int((data.iloc[:, j].str.strip() != '').sum()) for j in range(len(columns))]
+
+    read_rps = _rows_per_second(sampled, sample['seconds'])
+    analyze_rps = _rows_per_second(sampled, analyze_seconds)
+    approximate = not insert_rows_per_second
+    if approximate:
+        insert_rows_per_second = approximate_insert_rate(convert_rps, default_write_rows_per_second)
+    return {
+        'file': os.path.basename(file_path),
+        'file_type': reader.file_type,
+        'backend': backend.name,
+        'csv_format': reader.csv_format.describe() if reader.csv_format else None,
+        'sheet': sheet_name,
+        'table_name': table_name,
+        'sample': {
+            'method': method,
+            'rows': sampled,
+            'complete': sample['complete'],
+            'seconds': round(sample['seconds'], 3)
+        },
+        'estimated_total_rows': sample['total_rows'],
+        'columns': [
+            {
+                'name': str(col),
+                'type': ddl_type,
+                'inferred_type': spec['type'],
+                'date_format': spec.get('date_format'),
+                'non_empty': count,
+                'confidence': type_confidence(count, sample['complete'])
+            }
+            for col, ddl_type, spec, count in zip(columns, ddl_column_types, specs, non_empty)
+        ],
+        'row_size': {
+            'estimated_bytes': row_size,
+            'limit': ROW_SIZE_LIMIT if backend.row_size_limited else None,
+            'text_columns': [str(columns[i]) for i in text_columns]
+        },
+        'create_table': backend.create_table_sql(table_name, columns, ddl_column_types, primary_key,
+                                                 table_options=table_options),
+        'rows': data.head(PREVIEW_SHOW_ROWS).values.tolist(),
+        'throughput': {
+            'read_rows_per_second': round(read_rps) if read_rps else None,
+            'analyze_rows_per_second': round(analyze_rps) if analyze_rps else None,
+            'convert_rows_per_second': round(convert_rps) if convert_rps else None,
+            'insert_rows_per_second': round(insert_rows_per_second) if insert_rows_per_second else None
+        },
+        'estimated_seconds': estimate_seconds(sample['total_rows'], read_rps, analyze_rps, insert_rows_per_second),
+        'estimate_approximate': approximate
+    }
@@ -0,0 +1,125 @@
+import re
+from modules.incremental import _text
+
+# 可选的存储引擎、行格式和压缩方式，表选项只能从这里选择，不会拼接任意文本
+ENGINES = ('InnoDB', 'Aria', 'MyISAM')
+ROW_FORMATS = ('DYNAMIC', 'COMPACT', 'REDUNDANT', 'COMPRESSED')
+# page 为 InnoDB 页压缩（PAGE_COMPRESSED=1），需要服务器启用相应的压缩算法
+COMPRESSION_NONE = 'none'
+COMPRESSION_PAGE = 'page'
+COMPRESSIONS = (COMPRESSION_NONE, COMPRESSION_PAGE)
+
+# 二级索引包含 TEXT 列时使用的前缀长度（字符）
+INDEX_PREFIX_LENGTH = 255
+# MariaDB 标识符的最大长度
+_IDENTIFIER_LENGTH = 64
+_INDEX_NAME_INVALID = re.compile(r'[^a-zA-Z0-9_\u4e00-\u9fff]')
+
+
+def parse_column_list(text):
+    """把逗号分隔的列名解析为列表"""
+    return [col.strip() for col in (text or '').split(',') if col.strip()]
+
+
+def parse_indexes(text):
+    """解析二级索引定义，返回 [{'columns': [...], 'unique': bool}]
+
+    多个索引用分号分隔，索引内的列用逗号分隔，以 unique 开头的为唯一索引，
+    例如 "name; unique code, region"。
+    """
+    indexes = []
+    for part in (text or '').split(';'):
+        part = part.strip()
+        unique = part[:7].lower() == 'unique '
+        if unique:
+            part = part[7:]
+        columns = parse_column_list(part)
+        if columns:
+            indexes.append({'columns': columns, 'unique': unique})
+    return indexes
+
+
+def validate_table_options(table_options):
+    """检查表选项，返回只包含已设置项的字典 {'engine', 'row_format', 'compression'}"""
+    options = {}
+    for key, allowed in (('engine', ENGINES), ('row_format', ROW_FORMATS), ('compression', COMPRESSIONS)):
+        value = (table_options or {}).get(key)
+        if not value:
+            continue
+        by_name = {name.lower(): name for name in allowed}
+        if value.lower() not in by_name:
+            raise ValueError(f"不支持的 {key}: {value}，可选值为 {', '.join(allowed)}")
+        options[key] = by_name[value.lower()]
+    if options.get('compression') == COMPRESSION_NONE:
+        del options['compression']
+    if options.get('compression') and options.get('engine', 'InnoDB') != 'InnoDB':
+        raise ValueError("页压缩只支持 InnoDB 引擎")
+    if options.get('compression') and options.get('row_format') == 'COMPRESSED':
+        raise ValueError("页压缩不能与 ROW_FORMAT=COMPRESSED 同时使用")
+    return options
+
+
+def table_options_sql(table_options):
+    """返回 CREATE TABLE 末尾的表选项，没有设置时为空字符串"""
+    parts = []
+    if table_options.get('engine'):
+        parts.append(f"ENGINE={table_options['engine']}")
+    if table_options.get('row_format'):
+        parts.append(f"ROW_FORMAT={table_options['row_format']}")
+    if table_options.get('compression') == COMPRESSION_PAGE:
+        parts.append("PAGE_COMPRESSED=1")
+    return ''.join(f' {part}' for part in parts)
+
+
+def index_name(index):
+    """由列名生成索引名：普通索引以 ix_ 开头，唯一索引以 ux_ 开头"""
+    prefix = 'ux_' if index['unique'] else 'ix_'
+    name = prefix + '_'.join(_INDEX_NAME_INVALID.sub('_', col) for col in index['columns'])
+    return name[:_IDENTIFIER_LENGTH]
+
+
+def existing_index_names(cursor, table_name):
+    cursor.execute(
+        "SELECT DISTINCT index_name FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s",
+        (table_name,)
+    )
+    return {_text(name).lower() for name, in cursor.fetchall()}
+
+
+def _index_parts(index, column_types):
+    parts = []
+    for col in index['columns']:
+        is_text = 'TEXT' in column_types.get(col.lower(), '').upper()
+        if is_text and index['unique']:
+            raise ValueError(f"列 {col} 为 TEXT 类型，无法建立唯一索引 {index_name(index)}")
+        parts.append(f"`{col}`({INDEX_PREFIX_LENGTH})" if is_text else f"`{col}`")
+    return parts
+
+
+def validate_indexes(indexes, column_types):
+    """在写入数据之前检查二级索引能否建立，column_types 为 {小写列名: 列类型}"""
+    for index in indexes:
+        _index_parts(index, column_types)
+
+
+def deferred_index_sql(cursor, table_name, indexes, column_types):
+    """返回一次建好所有缺少的二级索引的 ALTER TABLE 语句，都已存在时返回 None
+
+    所有索引放在同一条语句中，InnoDB 只需扫描一遍数据、分别排序后批量构建索引树，
+    比导入过程中逐行维护索引快得多。TEXT 列按 INDEX_PREFIX_LENGTH 个字符的前缀建立普通索引。
+    """
+    if not indexes:
+        return None
+    existing = existing_index_names(cursor, table_name)
+    clauses = []
+    for index in indexes:
+        name = index_name(index)
+        if name.lower() in existing:
+            continue
+        kind = 'UNIQUE INDEX' if index['unique'] else 'INDEX'
+        clauses.append(f"ADD {kind} `{name}` ({', '.join(_index_parts(index, column_types))})")
+        existing.add(name.lower())
+    if not clauses:
+        return None
+    return f"ALTER TABLE `{table_name}` {', '.join(clauses)}"
@@ -0,0 +1,281 @@
+import os
+import pandas as pd
+from pathlib import Path
+from modules.xlsx_reader import FastXlsxReader, UnsupportedWorkbook, cell_to_str
+from modules.csv_format import csv_compression, detect_csv_format, open_csv_binary
+
+# 流式读取时每个数据块的行数
+DEFAULT_CHUNK_ROWS = 10000
+
+
+def detect_file_type(file_path):
+    """根据文件扩展名确定文件类型，.gz 和 .zip 为压缩的 CSV 文件"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.csv' or csv_compression(file_path):
+        return 'csv'
+    elif file_ext == '.xls':
+        return 'xls'
+    elif file_ext == '.xlsx':
+        return 'xlsx'
+    raise ValueError("不支持的文件类型，请提供 .csv, .xls 或 .xlsx 文件，CSV 文件也可以用 gzip 或 zip 压缩。")
+
+
+def file_stem(file_path):
+    """去掉扩展名的文件名，压缩的 CSV 同时去掉 .csv，例如 sales.csv.gz 为 sales"""
+    stem = Path(file_path).stem
+    if csv_compression(file_path) and stem.lower().endswith('.csv'):
+        stem = stem[:-len('.csv')]
+    return stem
+
+
+def _dedupe_columns(columns):
+    """按照 pandas 的规则处理空列名和重复列名
+
+    空列名为 Unnamed: 列号；先处理有名称的列，再处理空列名的列，重复的名称依次加上 .1、.2 等后缀，
+    跳过表头中已有的名称。
+    """
+    names = [f'Unnamed: {i}' if col is None or str(col) == '' else str(col) for i, col in enumerate(columns)]
+    unnamed = [i for i, col in enumerate(columns) if col is None or str(col) == '']
+    named = sorted(set(range(len(names))) - set(unnamed))
+    counts = {}
+    for i in named + unnamed:
+        name = names[i]
+        count = counts.get(name, 0)
+        if count > 0:
+            base = name
+            while count > 0:
+                counts[base] = count + 1
+                name = f'{base}.{count}'
+                count = count + 1 if name in names else counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _row_width(values):
+    """去掉末尾的空单元格后的列数"""
+    width = len(values)
+    while width and (values[width - 1] is None or values[width - 1] == ''):
+        width -= 1
+    return width
+
+
+def _open_fast_xlsx(file_path, sheet_name=None, shared_strings=None):
+    """打开快速 XLSX 读取器，文件结构不支持时返回 None，由调用方改用 openpyxl"""
+    try:
+        return FastXlsxReader(file_path, sheet_name, shared_strings)
+    except UnsupportedWorkbook:
+        return None
+
+
+def xlsx_shared_strings(file_path):
+    """解析 XLSX 文件的共享字符串表，交给读取同一文件各个工作表的 ChunkedReader
+
+    快速读取器不支持的文件返回 None，这时由各读取器自行处理。
+    """
+    fast = _open_fast_xlsx(file_path)
+    if fast is None:
+        return None
+    with fast:
+        return fast.shared_strings
+
+
+def _openpyxl_sheet(wb, sheet_name):
+    if sheet_name is None:
+        return wb.worksheets[0]
+    for ws in wb.worksheets:
+        if ws.title == sheet_name:
+            return ws
+    raise KeyError(f"工作表 {sheet_name} 不存在")
+
+
+def list_sheets(file_path, file_type=None):
+    """按工作簿中的顺序返回所有工作表的名称，CSV 文件没有工作表，返回空列表"""
+    file_type = file_type or detect_file_type(file_path)
+    if file_type == 'csv':
+        return []
+    if file_type == 'xls':
+        import xlrd
+        book = xlrd.open_workbook(file_path, on_demand=True)
+        try:
+            return book.sheet_names()
+        finally:
+            book.release_resources()
+    fast = _open_fast_xlsx(file_path)
+    if fast is not None:
+        with fast:
+            return fast.sheet_names
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        return [ws.title for ws in wb.worksheets]
+    finally:
+        wb.close()
+
+
+class ChunkedReader:
+    """按块读取 CSV/XLSX/XLS 文件，每次只在内存中保留一个数据块
+
+    迭代时返回 (DataFrame, 已读取比例)，DataFrame 的所有值均为字符串，
+    空单元格为空字符串。已读取比例 CSV 和 XLSX 按字节计算，XLS 按行计算。
+    gzip 或 zip 压缩的 CSV 文件边读边解压。
+    XLSX 优先使用 FastXlsxReader 直接解析工作表 XML，文件结构不支持时改用 openpyxl。
+    sheet_name 为要读取的工作表名称，None 表示第一个工作表，CSV 文件忽略此参数。
+    CSV 的编码、分隔符、引号和表头由 detect_csv_format 根据采样确定，结果保存在 csv_format 中。
+    shared_strings 为 xlsx_shared_strings 返回的共享字符串表，没有时在第一次读取时解析，之后沿用。
+    """
+
+    def __init__(self, file_path, file_type=None, chunk_rows=DEFAULT_CHUNK_ROWS, sheet_name=None,
+                 shared_strings=None):
+        self.file_path = file_path
+        self.file_type = file_type or detect_file_type(file_path)
+        self.chunk_rows = chunk_rows
+        self.sheet_name = sheet_name
+        self.shared_strings = shared_strings
+        self.file_size = os.path.getsize(file_path)
+        self.csv_format = None
+        if self.file_type == 'csv':
+            self.csv_format = detect_csv_format(file_path)
+        self.columns = self._read_columns()
+
+    def _read_columns(self):
+        if self.file_type == 'csv':
+            with open_csv_binary(self.file_path) as (stream, _):
+                header = pd.read_csv(stream, nrows=0, **self.csv_format.read_csv_kwargs())
+            return list(header.columns)
+        elif self.file_type == 'xlsx':
+            header, dimension_columns = self._xlsx_header()
+            # 数据行可能比表头宽，按工作表 dimension 记录的列数补齐，多出的列与 pandas 一样命名为 Unnamed: 列号
+            width = max(_row_width(header), dimension_columns or 0)
+            return _dedupe_columns(self._fit_width(header, width))
+        else:
+            header = pd.read_excel(self.file_path, sheet_name=self._xls_sheet(), dtype=str,
+                                   keep_default_na=False, engine='xlrd', nrows=0)
+            return list(header.columns)
+
+    def _xlsx_header(self):
+        """返回 (第一行的字符串列表, 工作表 dimension 记录的列数)，第一行是空行时列表为空"""
+        fast = _open_fast_xlsx(self.file_path, self.sheet_name, self.shared_strings)
+        if fast is not None:
+            with fast:
+                header = next(fast.iter_rows(), [])
+                self.shared_strings = fast.shared_strings
+                return header, fast.dimension_columns
+        from openpyxl import load_workbook
+        wb = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            ws = _openpyxl_sheet(wb, self.sheet_name)
+            header = next(ws.iter_rows(max_row=1, values_only=True), ())
+            return [cell_to_str(v) for v in header], ws.max_column
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _fit_width(values, width):
+        """截断或补齐到 width 列"""
+        values = values[:width]
+        values.extend([''] * (width - len(values)))
+        return values
+
+    def _xls_sheet(self):
+        return 0 if self.sheet_name is None else self.sheet_name
+
+    def __iter__(self):
+        if self.file_type == 'csv':
+            return self._iter_csv()
+        elif self.file_type == 'xlsx':
+            return self._iter_xlsx()
+        return self._iter_xls()
+
+    def _iter_csv(self):
+        # 压缩的文件按已读取的压缩数据计算进度
+        with open_csv_binary(self.file_path) as (stream, raw):
+            reader = pd.read_csv(stream, chunksize=self.chunk_rows, **self.csv_format.read_csv_kwargs())
+            with reader:
+                for chunk in reader:
+                    yield chunk, min(raw.tell() / max(self.file_size, 1), 1.0)
+
+    def _xlsx_rows(self):
+        """从表头开始逐行返回字符串列表，开始读取后 _xlsx_fraction 返回已读取的比例"""
+        fast = _open_fast_xlsx(self.file_path, self.sheet_name, self.shared_strings)
+        if fast is not None:
+            with fast:
+                self._xlsx_fraction = fast.fraction_read
+                yield from fast.iter_rows()
+            return
+
+        from openpyxl import load_workbook
+        wb = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            ws = _openpyxl_sheet(wb, self.sheet_name)
+            total_rows = max(ws.max_row or 0, 1)
+            consumed = 0
+            self._xlsx_fraction = lambda: min(consumed / total_rows, 1.0)
+            for row in ws.iter_rows(values_only=True):
+                consumed += 1
+                yield [cell_to_str(v) for v in row]
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _drop_trailing_empty(rows):
+        """与 pandas 一样丢弃表格末尾的空行，中间的空行保留；暂存的空行遇到非空行时一起返回"""
+        pending_empty = []
+        for values in rows:
+            if not any(values):
+                pending_empty.append(values)
+                continue
+            if pending_empty:
+                yield from pending_empty
+                pending_empty = []
+            yield values
+
+    def _iter_xlsx(self):
+        """把字符串行按列数补齐后组成数据块
+
+        超出列数的非空单元格无法放入已确定的列，直接报错而不是丢弃；工作表没有记录 dimension
+        且数据行比表头宽时会出现这种情况，这时应改用非流式导入。
+        """
+        width = len(self.columns)
+        chunk = []
+        rows = self._xlsx_rows()
+        next(rows, None)  # 跳过表头
+        for row_number, values in enumerate(self._drop_trailing_empty(rows), start=2):
+            if len(values) > width and any(values[width:]):
+                raise ValueError(f"第 {row_number} 行的数据超出了表头的 {width} 列，请关闭流式导入后重试")
+            chunk.append(values if len(values) == width else self._fit_width(values, width))
+            if len(chunk) >= self.chunk_rows:
+                yield pd.DataFrame(chunk, columns=self.columns), self._xlsx_fraction()
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=self.columns), 1.0
+
+    def read_all(self):
+        """读取整个文件为一个 DataFrame
+
+        XLSX 的列数与 pd.read_excel 一致，取表头和各数据行去掉末尾空单元格后最宽的一行，并更新 columns。
+        """
+        if self.file_type == 'xlsx':
+            rows = self._xlsx_rows()
+            header = next(rows, [])
+            rows = list(self._drop_trailing_empty(rows))
+            width = max(map(_row_width, rows), default=0)
+            width = max(width, _row_width(header))
+            self.columns = _dedupe_columns(self._fit_width(header, width))
+            if not rows:
+                return pd.DataFrame(columns=self.columns, dtype=str)
+            return pd.DataFrame([values if len(values) == width else self._fit_width(values, width) for values in rows],
+                                columns=self.columns)
+        chunks = [chunk for chunk, _ in self]
+        if not chunks:
+            return pd.DataFrame(columns=self.columns, dtype=str)
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    def _iter_xls(self):
+        # xlrd 无法按行流式读取 .xls，只能整体读取后再分块
+        df = pd.read_excel(self.file_path, sheet_name=self._xls_sheet(), dtype=str,
+                           keep_default_na=False, engine='xlrd')
+        total_rows = max(len(df), 1)
+        for start in range(0, len(df), self.chunk_rows):
+            end = min(start + self.chunk_rows, len(df))
+            yield df.iloc[start:end], end / total_rows
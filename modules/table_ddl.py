@@ -0,0 +1,73 @@
+import re
+from modules.schema_options import table_options_sql
+
+# InnoDB 的行大小上限为 65535 字节，估计的行大小超过这个阈值时把最长的 VARCHAR 列改为 TEXT，留一些余量
+ROW_SIZE_LIMIT = 65535
+ROW_SIZE_THRESHOLD = 60000
+# TEXT 列在行内只占用长度和指针
+TEXT_COLUMN_BYTES = 2
+
+_VARCHAR_RE = re.compile(r'VARCHAR\((\d+)\)')
+
+
+def column_bytes(column_type):
+    """粗略估计一列在行中占用的字节数，VARCHAR 按 utf8mb4 每个字符 4 字节计算"""
+    match = _VARCHAR_RE.search(column_type)
+    if match:
+        return int(match.group(1)) * 4 + 3
+    if 'TEXT' in column_type:
+        return TEXT_COLUMN_BYTES
+    if 'INT' in column_type:
+        return 4
+    if 'DECIMAL' in column_type or 'DOUBLE' in column_type or 'DATETIME' in column_type:
+        return 8
+    if 'DATE' in column_type:
+        return 3
+    return 0
+
+
+def estimate_row_size(column_types):
+    return sum(column_bytes(column_type) for column_type in column_types)
+
+
+def fit_row_size(column_types, keep=()):
+    """估计的行大小超过 ROW_SIZE_THRESHOLD 时，从最长的 VARCHAR 列开始改为 TEXT
+
+    keep 为不能改为 TEXT 的列的位置（键列和索引列）。
+    返回 (调整后的列类型, 估计的行大小, [改为 TEXT 的列的位置])。
+    """
+    column_types = list(column_types)
+    row_size = estimate_row_size(column_types)
+    converted = []
+    if row_size <= ROW_SIZE_THRESHOLD:
+        return column_types, row_size, converted
+    varchar_columns = []
+    for i, column_type in enumerate(column_types):
+        match = _VARCHAR_RE.search(column_type)
+        if match and i not in keep:
+            varchar_columns.append((i, int(match.group(1))))
+    varchar_columns.sort(key=lambda x: x[1], reverse=True)
+    for i, size in varchar_columns:
+        if row_size <= ROW_SIZE_THRESHOLD:
+            break
+        row_size += TEXT_COLUMN_BYTES - (size * 4 + 3)
+        column_types[i] = _VARCHAR_RE.sub('TEXT', column_types[i])
+        converted.append(i)
+    return column_types, row_size, converted
+
+
+def create_table_sql(table_name, column_names, column_types, primary_key=None, unique_key=None,
+                     extra_columns=(), table_options=None):
+    """生成 CREATE TABLE 语句
+
+    主键决定 InnoDB 的数据组织方式，只能在建表时声明；unique_key 为 (索引名, 列名列表)，
+    extra_columns 为追加在数据列之后的 (列名, 列类型)。二级索引在导入完成后另外创建。
+    """
+    definitions = [f'`{col}` {column_type}' for col, column_type in zip(column_names, column_types)]
+    definitions += [f'`{col}` {column_type}' for col, column_type in extra_columns]
+    if primary_key:
+        definitions.append(f'PRIMARY KEY ({", ".join(f"`{col}`" for col in primary_key)})')
+    if unique_key:
+        name, columns = unique_key
+        definitions.append(f'UNIQUE KEY `{name}` ({", ".join(f"`{col}`" for col in columns)})')
+    return f'CREATE TABLE `{table_name}` ({", ".join(definitions)}){table_options_sql(table_options or {})}'
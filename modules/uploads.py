@@ -0,0 +1,45 @@
+import os
+import tempfile
+from werkzeug.utils import secure_filename
+
+# 可以上传的文件类型，.gz 和 .zip 为压缩的 CSV 文件，导入时边读边解压
+UPLOAD_EXTENSIONS = ('.csv', '.xlsx', '.xls', '.gz', '.zip')
+# 每次从请求体读取并写入磁盘的字节数，上传的文件不会整个放在内存中
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# 上传过程中的临时文件以 . 开头，不会出现在文件列表中
+UPLOAD_TEMP_PREFIX = '.upload-'
+
+
+def upload_file_name(file_name):
+    """返回安全的文件名，缺少文件名或文件类型不支持时抛出 ValueError"""
+    name = secure_filename(file_name or '')
+    if not name:
+        raise ValueError("缺少文件名")
+    if os.path.splitext(name)[1].lower() not in UPLOAD_EXTENSIONS:
+        raise ValueError(f"不支持的文件类型: {name}，可上传 {', '.join(UPLOAD_EXTENSIONS)} 文件")
+    return name
+
+
+def save_stream(stream, directory, file_name, chunk_bytes=UPLOAD_CHUNK_BYTES):
+    """把上传的数据按块写入 directory 下的临时文件，完成后改名为 file_name，返回 (路径, 字节数)
+
+    上传中断时删除临时文件；已有的同名文件在上传完成后才被替换，正在读取它的导入不受影响。
+    """
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=UPLOAD_TEMP_PREFIX, suffix='.part', dir=directory)
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = stream.read(chunk_bytes)
+                if not chunk:
+                    break
+                f.write(chunk)
+                size += len(chunk)
+        path = os.path.join(directory, file_name)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path, size
@@ -0,0 +1,327 @@
+import datetime
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+import pandas as pd
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import from_excel, from_ISO8601, WINDOWS_EPOCH, MAC_EPOCH
+
+# 过渡格式和严格格式（Strict Open XML）使用的命名空间
+_SHEET_NAMESPACES = (
+    'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'http://purl.oclc.org/ooxml/spreadsheetml/main'
+)
+_RELATIONSHIP_NAMESPACES = (
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'http://purl.oclc.org/ooxml/officeDocument/relationships'
+)
+_PACKAGE_RELATIONSHIPS = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+_DEFAULT_WORKBOOK = 'xl/workbook.xml'
+
+
+class UnsupportedWorkbook(Exception):
+    """文件结构无法由快速读取器处理，应改用 openpyxl"""
+
+
+def cell_to_str(value):
+    """将 openpyxl 单元格值转换为与 pd.read_excel(dtype=str) 一致的字符串"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime.datetime):
+        return str(pd.Timestamp(value))
+    return str(value)
+
+
+def _number_to_str(value):
+    # 与 openpyxl 的数字解析加上 cell_to_str 的结果一致：含小数点或指数的按浮点数处理
+    if '.' in value or 'e' in value or 'E' in value:
+        number = float(value)
+        return str(int(number)) if number.is_integer() else str(number)
+    return str(int(value))
+
+
+def _cast_number(value):
+    if '.' in value or 'e' in value or 'E' in value:
+        return float(value)
+    return int(value)
+
+
+def _namespace(tag):
+    return tag[1:tag.index('}')] if tag.startswith('{') else ''
+
+
+def _column_index(ref, cache):
+    """把单元格引用（如 AB12）转换为从 0 开始的列号"""
+    letters = ref.rstrip('0123456789')
+    index = cache.get(letters)
+    if index is None:
+        index = 0
+        for ch in letters:
+            index = index * 26 + ord(ch) - 64
+        index -= 1
+        cache[letters] = index
+    return index
+
+
+class FastXlsxReader:
+    """直接从 zip 中流式解析工作表 XML 的 XLSX 读取器
+
+    共享字符串表解析为列表，单元格按下标取值；工作表用 iterparse 逐行解析，每行处理完立即
+    从树中移除，内存占用与行数无关。单元格值的转换规则与 openpyxl（data_only）加 cell_to_str
+    保持一致，日期格式的识别直接使用 openpyxl 的判断函数。sheet_name 为 None 时读取第一个工作表。
+    遇到无法识别的文件结构时构造函数抛出 UnsupportedWorkbook，调用方应改用 openpyxl；
+    指定的工作表不存在时抛出 KeyError。
+    共享字符串表在第一次读取单元格时才解析；shared_strings 为同一工作簿已经解析过的共享字符串表，
+    同一个文件多次打开（例如并行导入多个工作表）时只需解析一次。
+    """
+
+    def __init__(self, file_path, sheet_name=None, shared_strings=None):
+        self.file_path = file_path
+        self._sheet_file = None
+        self._shared_strings = shared_strings
+        self._shared_strings_part = None
+        # 工作表 dimension 记录的列数，iter_rows 读到时设置，没有记录时为 None
+        self.dimension_columns = None
+        try:
+            self._zip = zipfile.ZipFile(file_path)
+        except zipfile.BadZipFile as e:
+            raise UnsupportedWorkbook(str(e))
+        try:
+            self._load_workbook()
+        except UnsupportedWorkbook:
+            self._zip.close()
+            raise
+        except (KeyError, ET.ParseError, ValueError) as e:
+            self._zip.close()
+            raise UnsupportedWorkbook(str(e))
+        parts = dict(self.sheets)
+        if sheet_name is not None and sheet_name not in parts:
+            self._zip.close()
+            raise KeyError(f"工作表 {sheet_name} 不存在")
+        self.sheet_name = sheet_name if sheet_name is not None else self.sheets[0][0]
+        self.sheet_part = parts[self.sheet_name]
+
+    @property
+    def sheet_names(self):
+        """按工作簿中的顺序返回所有普通工作表的名称"""
+        return [name for name, _ in self.sheets]
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _parse(self, name):
+        with self._zip.open(name) as f:
+            return ET.parse(f).getroot()
+
+    def _relationships(self, part):
+        """返回 {关系 Id: (类型, 目标部件路径)}"""
+        folder, name = posixpath.split(part)
+        rels_name = posixpath.join(folder, '_rels', name + '.rels')
+        if rels_name not in self._zip.NameToInfo:
+            return {}
+        relationships = {}
+        for rel in self._parse(rels_name).iter(_PACKAGE_RELATIONSHIPS):
+            if rel.get('TargetMode') == 'External':
+                continue
+            target = rel.get('Target', '')
+            if target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+            relationships[rel.get('Id')] = (rel.get('Type', ''), target)
+        return relationships
+
+    def _load_workbook(self):
+        workbook_part = _DEFAULT_WORKBOOK
+        for rel_type, target in self._relationships('').values():
+            if rel_type.endswith('/officeDocument'):
+                workbook_part = target
+                break
+        workbook = self._parse(workbook_part)
+        ns = _namespace(workbook.tag)
+        if ns not in _SHEET_NAMESPACES:
+            raise UnsupportedWorkbook(f"未知的工作簿命名空间: {ns}")
+        relationships = self._relationships(workbook_part)
+
+        properties = workbook.find(f'{{{ns}}}workbookPr')
+        date1904 = properties is not None and properties.get('date1904', '').lower() in ('1', 'true')
+        self.epoch = MAC_EPOCH if date1904 else WINDOWS_EPOCH
+
+        # 与 openpyxl 的 worksheets 一致：只包含普通工作表，跳过图表工作表
+        self.sheets = []
+        for sheet in workbook.iter(f'{{{ns}}}sheet'):
+            rel_id = next((sheet.get(f'{{{rel_ns}}}id') for rel_ns in _RELATIONSHIP_NAMESPACES
+                           if sheet.get(f'{{{rel_ns}}}id')), None)
+            rel_type, target = relationships.get(rel_id, ('', None))
+            if rel_type.endswith('/worksheet'):
+                if target not in self._zip.NameToInfo:
+                    raise UnsupportedWorkbook(f"找不到工作表 {sheet.get('name')}")
+                self.sheets.append((sheet.get('name'), target))
+        if not self.sheets:
+            raise UnsupportedWorkbook("找不到工作表")
+
+        self.date_styles = set()
+        self.timedelta_styles = set()
+        for rel_type, target in relationships.values():
+            if target not in self._zip.NameToInfo:
+                continue
+            if rel_type.endswith('/sharedStrings'):
+                self._shared_strings_part = target
+            elif rel_type.endswith('/styles'):
+                self._read_styles(target)
+
+    @property
+    def shared_strings(self):
+        """共享字符串表，按下标取值的字符串列表"""
+        if self._shared_strings is None:
+            part = self._shared_strings_part
+            self._shared_strings = self._read_shared_strings(part) if part else []
+        return self._shared_strings
+
+    def _read_shared_strings(self, part):
+        strings = []
+        with self._zip.open(part) as f:
+            for _, element in ET.iterparse(f):
+                ns = _namespace(element.tag)
+                if element.tag == f'{{{ns}}}si':
+                    text = _text_content(element, ns).replace('x005F_', '')
+                    strings.append(text)
+                    element.clear()
+        return strings
+
+    def _read_styles(self, part):
+        styles = self._parse(part)
+        ns = _namespace(styles.tag)
+        custom = {}
+        num_fmts = styles.find(f'{{{ns}}}numFmts')
+        if num_fmts is not None:
+            for fmt in num_fmts.iter(f'{{{ns}}}numFmt'):
+                custom[int(fmt.get('numFmtId'))] = fmt.get('formatCode')
+        cell_xfs = styles.find(f'{{{ns}}}cellXfs')
+        if cell_xfs is None:
+            return
+        for index, xf in enumerate(cell_xfs.iter(f'{{{ns}}}xf')):
+            fmt_id = int(xf.get('numFmtId', 0))
+            fmt = custom[fmt_id] if fmt_id in custom else BUILTIN_FORMATS.get(fmt_id)
+            if is_date_format(fmt):
+                self.date_styles.add(index)
+            if is_timedelta_format(fmt):
+                self.timedelta_styles.add(index)
+
+    def _date_to_str(self, value, style):
+        try:
+            return cell_to_str(from_excel(_cast_number(value), self.epoch,
+                                          timedelta=style in self.timedelta_styles))
+        except (OverflowError, ValueError):
+            return '#VALUE!'
+
+    def iter_rows(self):
+        """逐行返回字符串列表，空单元格为空字符串
+
+        行号不连续时补齐中间的空行，行内只包含到最后一个单元格为止的列。
+        工作表的 dimension 在第一行之前，读到时记录在 dimension_columns 中。
+        """
+        shared_strings = self.shared_strings
+        date_styles = self.date_styles
+        column_cache = {}
+        with self._zip.open(self.sheet_part) as f:
+            self._sheet_file = f
+            context = ET.iterparse(f, events=('start', 'end'))
+            ns = None
+            row_tag = cell_tag = value_tag = inline_tag = sheet_data_tag = dimension_tag = None
+            sheet_data = None
+            next_row = 1
+            for event, element in context:
+                if ns is None:
+                    ns = _namespace(element.tag)
+                    row_tag = f'{{{ns}}}row'
+                    cell_tag = f'{{{ns}}}c'
+                    value_tag = f'{{{ns}}}v'
+                    inline_tag = f'{{{ns}}}is'
+                    sheet_data_tag = f'{{{ns}}}sheetData'
+                    dimension_tag = f'{{{ns}}}dimension'
+                if event == 'start':
+                    if element.tag == sheet_data_tag:
+                        sheet_data = element
+                    continue
+                if element.tag != row_tag:
+                    if element.tag == dimension_tag and element.get('ref'):
+                        # ref 形如 A1:H100，只有一个单元格时为 A1
+                        last = element.get('ref').split(':')[-1]
+                        self.dimension_columns = _column_index(last, column_cache) + 1
+                    continue
+
+                row_number = element.get('r')
+                if row_number is not None:
+                    row_number = int(row_number)
+                    while next_row < row_number:
+                        yield []
+                        next_row += 1
+                next_row += 1
+
+                values = []
+                column = -1
+                for cell in element:
+                    if cell.tag != cell_tag:
+                        continue
+                    ref = cell.get('r')
+                    column = _column_index(ref, column_cache) if ref else column + 1
+                    data_type = cell.get('t', 'n')
+                    if data_type == 'inlineStr':
+                        inline = cell.find(inline_tag)
+                        value = _text_content(inline, ns) if inline is not None else ''
+                    else:
+                        value = cell.findtext(value_tag)
+                        if not value:
+                            value = ''
+                        elif data_type == 'n':
+                            style = cell.get('s')
+                            if style and int(style) in date_styles:
+                                value = self._date_to_str(value, int(style))
+                            else:
+                                value = _number_to_str(value)
+                        elif data_type == 's':
+                            value = shared_strings[int(value)]
+                        elif data_type == 'b':
+                            value = str(bool(int(value)))
+                        elif data_type == 'd':
+                            value = cell_to_str(from_ISO8601(value))
+                    if column >= len(values):
+                        values.extend([''] * (column - len(values) + 1))
+                    values[column] = value
+                yield values
+
+                # 已处理的行从树中移除，避免整个工作表留在内存中
+                element.clear()
+                if sheet_data is not None:
+                    sheet_data.remove(element)
+
+    def fraction_read(self):
+        """按已解压的工作表字节数估算的读取进度"""
+        if self._sheet_file is None or self._sheet_file.closed:
+            return 1.0
+        size = self._zip.getinfo(self.sheet_part).file_size
+        return min(self._sheet_file.tell() / max(size, 1), 1.0)
+
+
+def _text_content(element, ns):
+    # 与 openpyxl 的 Text.content 一致：直接的 t 加上各个 r 中的 t，不包含注音 rPh
+    t_tag = f'{{{ns}}}t'
+    r_tag = f'{{{ns}}}r'
+    parts = []
+    for child in element:
+        if child.tag == t_tag:
+            parts.append(child.text or '')
+        elif child.tag == r_tag:
+            t = child.find(t_tag)
+            if t is not None:
+                parts.append(t.text or '')
+    return ''.join(parts)
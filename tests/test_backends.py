@@ -0,0 +1,52 @@
+import pytest
+
+from modules.backends import Backend, MariaDBBackend, SQLiteBackend
+
+
+@pytest.fixture
+def sqlite_cursor(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'test.sqlite'))
+    conn = backend.connect()
+    yield backend, conn.cursor()
+    backend.close_connection(conn)
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        Backend()
+
+
+def test_key_and_index_checks_follow_backend_limits(tmp_path):
+    mariadb = MariaDBBackend('u', 'p', 'h', 'd', 3306)
+    with pytest.raises(ValueError):
+        mariadb.validate_key_types(['a'], ['TEXT'])
+    with pytest.raises(ValueError):
+        mariadb.validate_indexes([{'columns': ['a'], 'unique': True}], {'a': 'TEXT'})
+    assert mariadb.fit_column_types(['VARCHAR(30000)'] * 3)[2]
+
+    sqlite = SQLiteBackend(str(tmp_path / 'test.sqlite'))
+    sqlite.validate_key_types(['a'], ['TEXT'])
+    sqlite.validate_indexes([{'columns': ['a'], 'unique': True}], {'a': 'TEXT'})
+    assert sqlite.fit_column_types(['VARCHAR(30000)'] * 3) == (['VARCHAR(30000)'] * 3, None, [])
+
+
+def test_sqlite_finish_table_replaces_target_and_builds_indexes(sqlite_cursor):
+    backend, cursor = sqlite_cursor
+    for table, value in (('t', 1), ('t__staging', 2)):
+        cursor.execute(backend.create_table_sql(table, ['a'], ['INT']))
+        cursor.execute(f'INSERT INTO {backend.quote(table)} VALUES ({value})')
+    backend.create_indexes(cursor, 't', 't', [{'columns': ['a'], 'unique': False}], {})
+    backend.finish_table(cursor, 't__staging', 't', [{'columns': ['a'], 'unique': False}], {})
+    assert not backend.table_exists(cursor, 't__staging')
+    cursor.execute('SELECT a FROM t')
+    assert cursor.fetchall() == [(2,)]
+    cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND tbl_name = 't'")
+    assert cursor.fetchall() == [(1,)]
+
+
+def test_sqlite_row_hashes_round_trip(sqlite_cursor):
+    backend, cursor = sqlite_cursor
+    cursor.execute(backend.create_table_sql('t', ['a'], ['INT']))
+    backend.add_row_hash_column(cursor, 't')
+    cursor.executemany('INSERT INTO t VALUES (?, ?)', [(1, -1), (2, 5), (3, None)])
+    assert backend.load_row_hashes(cursor, 't').tolist() == [5, 2 ** 64 - 1]
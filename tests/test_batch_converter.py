@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from modules.batch_converter import BatchConverter
+
+
+def test_strips_values_and_writes_null_for_empty():
+    df = pd.DataFrame({'a': [' x ', '', 'y'], 'b': ['1', ' ', '2 ']}, dtype=object)
+    assert BatchConverter(['VARCHAR(10)', 'INT'], df.columns)(df) == [('x', '1'), (None, None), ('y', '2')]
+
+
+def test_none_and_nan_cells_are_null():
+    """非快速路径读取的 xlsx/xls 中空单元格是 None/NaN"""
+    df = pd.DataFrame({'a': [' 1,000 ', None, np.nan], 'b': ['2024/1/2', None, ''], 'c': [None] * 3},
+                      dtype=object)
+    converter = BatchConverter(['INT', 'DATE', 'VARCHAR(10)'], df.columns)
+    assert converter(df) == [('1000', '2024-01-02', None), (None, None, None), (None, None, None)]
+    assert converter.failures == {}
+
+
+def test_failed_values_are_null_and_recorded():
+    df = pd.DataFrame({'n': ['¥1,200.50', 'abc'], 'd': ['2024-01-02 03:04:05', 'soon']}, dtype=object)
+    converter = BatchConverter(['DECIMAL(10,2)', 'DATETIME'], df.columns)
+    assert converter(df) == [('1200.50', '2024-01-02 03:04:05'), (None, None)]
+    assert converter.failures == {'n': {'count': 1, 'examples': ['abc']}, 'd': {'count': 1, 'examples': ['soon']}}
+    assert converter.failed_values() == 2
+
+
+def test_dates_outside_the_pandas_range_are_converted():
+    df = pd.DataFrame({'d': ['9999-12-31', '0001-01-01', '2024-01-02'],
+                       't': ['9999-12-31 23:59:59', '1000-01-02 03:04:05', '2024-01-02 03:04:05']}, dtype=object)
+    converter = BatchConverter(['DATE', 'DATETIME'], df.columns)
+    assert converter(df) == [('9999-12-31', '9999-12-31 23:59:59'), ('0001-01-01', '1000-01-02 03:04:05'),
+                             ('2024-01-02', '2024-01-02 03:04:05')]
+    assert converter.failures == {}
+
+
+def test_unknown_date_format_is_pinned_per_column():
+    converter = BatchConverter(['DATE'], ['d'])
+    first = pd.DataFrame({'d': ['01/02/2024', '13/02/2024', '03/04/2024']}, dtype=object)
+    assert converter(first) == [('2024-02-01',), ('2024-02-13',), ('2024-04-03',)]
+    # 之后的批次沿用日/月格式，不会把 02/13/2024 改按月/日解析
+    second = pd.DataFrame({'d': ['05/06/2024', '02/13/2024']}, dtype=object)
+    assert converter(second) == [('2024-06-05',), (None,)]
+    assert converter.failures == {'d': {'count': 1, 'examples': ['02/13/2024']}}
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from modules.batch_sizing import MAX_GROWTH, MIN_BATCH_ROWS, BatchSizer, estimate_row_bytes
+
+
+def test_estimate_row_bytes():
+    assert estimate_row_bytes([]) == 0
+    assert estimate_row_bytes([('ab', None, 12), ('名', None, 3)]) == ((5 + 4 + 5) + (6 + 4 + 4)) / 2
+
+
+def test_observe_rows_splits_batches_larger_than_the_packet_limit():
+    sizer = BatchSizer(max_allowed_packet=2000)
+    rows = [('x' * 97,)] * 50  # 每行 100 字节，单条语句最多 10 行
+    parts = sizer.observe_rows(rows)
+    assert [len(part) for part in parts] == [10] * 5
+    assert sizer.batch_rows == 10
+
+
+def test_observe_write_grows_batches_gradually():
+    sizer = BatchSizer(batch_rows=1000)
+    sizer.observe_write(1000, 0.001)
+    assert sizer.batch_rows == 1000 * MAX_GROWTH
+    sizer.observe_write(10, 10.0)
+    assert sizer.batch_rows >= MIN_BATCH_ROWS
+    assert sizer.commit_rows >= sizer.batch_rows
+
+
+def test_rebatch_follows_current_batch_rows():
+    sizer = BatchSizer(batch_rows=3)
+    chunks = [pd.DataFrame({'a': range(start, start + 4)}) for start in (0, 4)]
+    batches = sizer.rebatch(chunks)
+    assert next(batches)['a'].tolist() == [0, 1, 2]
+    sizer.batch_rows = 4
+    assert [batch['a'].tolist() for batch in batches] == [[3, 4, 5, 6], [7]]
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from modules.checkpoint import count_rows, merge_ranges, skip_committed, subtract_ranges
+
+
+def test_merge_ranges_sorts_and_joins_overlapping_and_adjacent():
+    assert merge_ranges([[10, 20], [0, 5], [5, 8], [15, 30], [40, 50]]) == [[0, 8], [10, 30], [40, 50]]
+
+
+def test_merge_ranges_drops_empty_ranges():
+    assert merge_ranges([[3, 3], [5, 2], [0, 1]]) == [[0, 1]]
+    assert merge_ranges([]) == []
+
+
+def test_subtract_ranges():
+    committed = [[0, 10], [20, 30], [35, 40]]
+    assert subtract_ranges(0, 50, committed) == [[10, 20], [30, 35], [40, 50]]
+    assert subtract_ranges(5, 25, committed) == [[10, 20]]
+    assert subtract_ranges(20, 30, committed) == []
+    assert subtract_ranges(12, 18, committed) == [[12, 18]]
+    assert subtract_ranges(0, 10, []) == [[0, 10]]
+
+
+def test_subtract_then_merge_covers_whole_range():
+    committed = merge_ranges([[3, 7], [12, 15], [14, 20]])
+    remaining = subtract_ranges(0, 25, committed)
+    assert merge_ranges(committed + remaining) == [[0, 25]]
+    assert count_rows(committed) + count_rows(remaining) == 25
+
+
+def test_skip_committed_numbers_rows_and_drops_committed_ones():
+    batches = [pd.DataFrame({'a': [str(i) for i in range(start, start + 4)]}) for start in (0, 4, 8)]
+    result = list(skip_committed(batches, [[2, 8]]))
+    assert [ranges for ranges, _ in result] == [[[0, 2]], [[8, 12]]]
+    assert [batch['a'].tolist() for _, batch in result] == [['0', '1'], ['8', '9', '10', '11']]
+
+
+def test_skip_committed_keeps_gaps_inside_a_batch():
+    batch = pd.DataFrame({'a': [str(i) for i in range(6)]})
+    [(ranges, rows)] = skip_committed([batch], [[1, 2], [4, 5]])
+    assert ranges == [[0, 1], [2, 4], [5, 6]]
+    assert rows['a'].tolist() == ['0', '2', '3', '5']
@@ -0,0 +1,45 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from modules.column_type_detector import determine_column_type, infer_column_type, profile_column
+from modules.parallel_analysis import merge_profiles
+
+# 回归语料：每一项为一列数据和 determine_column_type 对它推断的类型，
+# 覆盖各种日期格式、数字、货币、空值混合的列以及各类型判断的边界
+CORPUS_PATH = Path(__file__).parent / 'data' / 'type_corpus.json'
+CORPUS = json.loads(CORPUS_PATH.read_text(encoding='utf-8'))
+CHUNK_ROWS = 7
+
+
+def _column(item):
+    return pd.Series(item['values'], dtype=object)
+
+
+@pytest.mark.parametrize('item', CORPUS, ids=[str(i) for i in range(len(CORPUS))])
+def test_reference_type(item):
+    assert determine_column_type(_column(item)) == item['type']
+
+
+@pytest.mark.parametrize('item', CORPUS, ids=[str(i) for i in range(len(CORPUS))])
+def test_single_pass_matches_reference(item):
+    assert infer_column_type(_column(item), sample_size=None) == item['type']
+
+
+@pytest.mark.parametrize('item', CORPUS, ids=[str(i) for i in range(len(CORPUS))])
+def test_sampled_matches_reference(item):
+    """采样只用于排除候选类型，结果与不采样相同"""
+    assert infer_column_type(_column(item), sample_size=3) == item['type']
+
+
+@pytest.mark.parametrize('item', CORPUS, ids=[str(i) for i in range(len(CORPUS))])
+def test_chunked_merge_matches_reference(item):
+    """逐块分析后合并的结果与整列分析相同"""
+    column = _column(item)
+    profiles = None
+    for start in range(0, len(column), CHUNK_ROWS):
+        chunk = column.iloc[start:start + CHUNK_ROWS].reset_index(drop=True)
+        profiles = merge_profiles(profiles, [profile_column(chunk, None)])
+    assert profiles[0].column_type() == item['type']
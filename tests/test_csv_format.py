@@ -0,0 +1,42 @@
+import gzip
+
+from modules.csv_format import CSV_ENGINE_C, detect_csv_format, read_csv_file
+
+
+def _write(path, text, encoding='utf-8'):
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def test_detects_delimiter_quote_and_header(tmp_path):
+    path = _write(tmp_path / 'a.csv', 'id;name;amount\n1;"a;b";1,5\n2;c;2\n')
+    csv_format = detect_csv_format(path)
+    assert (csv_format.encoding, csv_format.delimiter, csv_format.quotechar, csv_format.header) == \
+        ('utf-8', ';', '"', True)
+    df = read_csv_file(path, csv_format, CSV_ENGINE_C)
+    assert df.values.tolist() == [['1', 'a;b', '1,5'], ['2', 'c', '2']]
+
+
+def test_detects_gbk_and_missing_header(tmp_path):
+    path = _write(tmp_path / 'b.csv', '1\t名称\t3.5\n2\t数据\t4\n', encoding='gbk')
+    csv_format = detect_csv_format(path)
+    assert csv_format.encoding == 'gbk'
+    assert csv_format.delimiter == '\t'
+    assert csv_format.header is False
+    assert list(read_csv_file(path, csv_format).columns) == ['column_1', 'column_2', 'column_3']
+
+
+def test_utf8_bom(tmp_path):
+    path = _write(tmp_path / 'c.csv', '\ufeffa,b\nx,y\n')
+    csv_format = detect_csv_format(path)
+    assert csv_format.encoding == 'utf-8-sig'
+    assert list(read_csv_file(path, csv_format).columns) == ['a', 'b']
+
+
+def test_gzip_csv(tmp_path):
+    path = tmp_path / 'd.csv.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write('a|b\n1|2\n')
+    csv_format = detect_csv_format(str(path))
+    assert csv_format.delimiter == '|'
+    assert read_csv_file(str(path), csv_format).values.tolist() == [['1', '2']]
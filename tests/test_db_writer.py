@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from modules.db_writer import LoadDataWriter, format_load_data
+from modules.incremental import RowHashFilter, row_hashes
+
+
+class _LoadDataCursor:
+    """允许 LOCAL INFILE，记录 LOAD DATA 读取的文件内容"""
+
+    def __init__(self):
+        self.loaded = []
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self._result = [('local_infile', 'ON')] if sql.startswith('SHOW GLOBAL VARIABLES') else []
+        if sql.startswith('LOAD DATA'):
+            with open(params[0], 'rb') as f:
+                self.loaded.append(f.read())
+
+    def fetchall(self):
+        return self._result
+
+
+def test_format_load_data_escapes_strings_and_writes_null():
+    assert format_load_data([('a\tb', None), ('c\\d', 'e\nf')]) == b'a\\tb\t\\N\nc\\\\d\te\\nf\n'
+
+
+def test_diff_rows_are_written_with_load_data(tmp_path):
+    df = pd.DataFrame({'a': ['1', '2'], 'b': ['x', None]})
+    row_filter = RowHashFilter(lambda batch: [tuple(row) for row in batch.itertuples(index=False)],
+                               np.empty(0, dtype=np.uint64))
+    rows = row_filter(df)
+    cursor = _LoadDataCursor()
+    writer = LoadDataWriter(cursor, 't', ['a', 'b', '_row_hash'], str(tmp_path))
+    writer.write(rows)
+    hashes = row_hashes(df).tolist()
+    assert cursor.loaded == [f'1\tx\t{hashes[0]}\n2\t\\N\t{hashes[1]}\n'.encode()]
@@ -0,0 +1,87 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from modules import import_cache
+from modules.import_cache import ImportCache
+
+
+@pytest.fixture
+def digest_calls(monkeypatch):
+    calls = []
+    file_digest = import_cache.file_digest
+
+    def counting_digest(file_path):
+        calls.append(file_path)
+        return file_digest(file_path)
+
+    monkeypatch.setattr(import_cache, 'file_digest', counting_digest)
+    return calls
+
+
+def _wait_for_digest(cache, key):
+    deadline = time.time() + 5
+    while not (cache._read_meta(key) or {}).get('digest'):
+        assert time.time() < deadline, '后台线程没有记录文件哈希'
+        time.sleep(0.01)
+
+
+def _data_file(tmp_path, text='a,b\n1,2\n'):
+    path = tmp_path / 'data.csv'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_key_does_not_read_the_file(tmp_path, digest_calls):
+    cache = ImportCache(str(tmp_path / 'cache'))
+    path = _data_file(tmp_path)
+    key = cache.key(path)
+    assert cache.get(key) is None
+    assert key == cache.key(path) != cache.key(path, 'Sheet1')
+    assert digest_calls == []
+
+
+def test_entry_hits_after_digest_is_recorded(tmp_path, digest_calls):
+    path = _data_file(tmp_path)
+    cache = ImportCache(str(tmp_path / 'cache'))
+    key = cache.key(path)
+    df = pd.DataFrame({'a': ['1'], 'b': ['2']})
+    cache.put_data(key, df)
+    cache.put_schema(key, ['a', 'b'], ['INT', 'INT'], 1)
+    _wait_for_digest(cache, key)
+    meta = cache.get(key)
+    assert meta['column_types'] == ['INT', 'INT']
+    pd.testing.assert_frame_equal(cache.load_data(key, meta), df)
+    assert len(digest_calls) == 1
+
+    # 另一个进程命中时重新计算哈希确认
+    other = ImportCache(str(tmp_path / 'cache'))
+    assert other.get(other.key(path)) is not None
+    assert len(digest_calls) == 2
+
+
+def test_rewritten_file_with_same_timestamp_misses(tmp_path):
+    path = _data_file(tmp_path)
+    cache = ImportCache(str(tmp_path / 'cache'))
+    key = cache.key(path)
+    cache.put_schema(key, ['a', 'b'], ['INT', 'INT'], 1)
+    _wait_for_digest(cache, key)
+
+    stat = os.stat(path)
+    _data_file(tmp_path, 'a,b\n3,4\n')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    other = ImportCache(str(tmp_path / 'cache'))
+    assert other.key(path) == key
+    assert other.get(key) is None
+
+
+def test_entry_without_digest_misses(tmp_path):
+    path = _data_file(tmp_path)
+    cache = ImportCache(str(tmp_path / 'cache'))
+    key = cache.key(path)
+    entry_dir = tmp_path / 'cache' / key
+    entry_dir.mkdir(parents=True)
+    (entry_dir / 'meta.json').write_text('{"columns": ["a", "b"]}', encoding='utf-8')
+    assert cache.get(key) is None
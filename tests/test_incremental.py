@@ -0,0 +1,53 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.incremental import RowHashFilter, row_hashes
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _frame():
+    return pd.DataFrame({'a': ['1', '2'], 'b': ['x', '']})
+
+
+def test_row_hashes_are_stable():
+    """行哈希保存在目标表中，升级或换进程后必须得到相同的值"""
+    assert row_hashes(_frame()).tolist() == [4969073292335518484, 1315954173133866095]
+
+
+def test_row_hashes_match_in_another_process():
+    code = ('import pandas as pd; from modules.incremental import row_hashes; '
+            "print(row_hashes(pd.DataFrame({'a': ['1', '2'], 'b': ['x', '']})).tolist())")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == str(row_hashes(_frame()).tolist())
+
+
+def test_row_hashes_ignore_index_and_depend_on_every_cell():
+    df = _frame()
+    assert row_hashes(df.set_axis([7, 9])).tolist() == row_hashes(df).tolist()
+    changed = df.copy()
+    changed.iloc[1, 1] = 'y'
+    hashes, changed_hashes = row_hashes(df), row_hashes(changed)
+    assert hashes[0] == changed_hashes[0] and hashes[1] != changed_hashes[1]
+
+
+def test_row_hash_filter_skips_existing_rows_and_appends_hash():
+    df = _frame()
+    hashes = row_hashes(df)
+    existing = np.sort(hashes[:1])
+    row_filter = RowHashFilter(lambda batch: [tuple(row) for row in batch.itertuples(index=False)], existing)
+    assert row_filter(df) == [('2', '', int(hashes[1]))]
+    assert row_filter.skipped == 1
+
+
+def test_row_hash_filter_signed_hashes():
+    df = pd.DataFrame({'a': [str(i) for i in range(50)]})
+    hashes = row_hashes(df)
+    row_filter = RowHashFilter(lambda batch: [()] * len(batch), np.empty(0, dtype=np.uint64), signed=True)
+    appended = [row[0] for row in row_filter(df)]
+    assert all(-2 ** 63 <= value < 2 ** 63 for value in appended)
+    assert np.array(appended, dtype=np.int64).view(np.uint64).tolist() == hashes.tolist()
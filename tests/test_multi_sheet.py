@@ -0,0 +1,35 @@
+from modules.multi_sheet import (SHEET_NAME_LENGTH, TABLE_NAME_LENGTH, clean_table_name, sheet_analysis_workers,
+                                 sheet_table_names)
+
+
+def test_clean_table_name():
+    assert clean_table_name('sales 2024-Q1.v2') == 'sales_2024_Q1_v2'
+    assert clean_table_name('销售/数据') == '销售_数据'
+    assert len(clean_table_name('x' * 100)) == TABLE_NAME_LENGTH
+
+
+def test_sheet_table_names_deduplicates_in_workbook_order():
+    long_name = 'x' * 30
+    names = sheet_table_names('sales 2024', ['Q1', 'q1', 'Q/1', 'Q_1', long_name, long_name, '数据'])
+    assert names == [
+        'sales_2024_Q1',
+        'sales_2024_q1_2',
+        'sales_2024_Q_1',
+        'sales_2024_Q_1_2',
+        'sales_2024_' + 'x' * SHEET_NAME_LENGTH,
+        'sales_2024_' + 'x' * (SHEET_NAME_LENGTH - 2) + '_2',
+        'sales_2024_数据'
+    ]
+    assert len({name.lower() for name in names}) == len(names)
+
+
+def test_sheet_table_names_do_not_depend_on_selection():
+    sheets = ['A', 'a', 'b']
+    assert sheet_table_names('f', sheets)[1] == 'f_a_2'
+
+
+def test_sheet_analysis_workers_share_the_pool_size():
+    assert sheet_analysis_workers(8, 4, 10) == 2
+    assert sheet_analysis_workers(8, 4, 2) == 4
+    assert sheet_analysis_workers(2, 4, 10) == 1
+    assert sheet_analysis_workers(None, 1, 3) >= 1
@@ -0,0 +1,46 @@
+import pytest
+
+from modules.backends import ddl_backend
+from modules.preview import approximate_insert_rate, estimate_seconds, preview_file
+
+
+def test_estimate_seconds():
+    assert estimate_seconds(1000, 1000, 500, 250) == 7.0
+    assert estimate_seconds(1000, 1000, 500, None) is None
+
+
+def test_approximate_insert_rate_adds_convert_and_write_time():
+    assert approximate_insert_rate(1000, 1000) == pytest.approx(500)
+    assert approximate_insert_rate(None, 1000) is None
+
+
+def _csv_file(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('id,name\n' + ''.join(f'{i},n{i}\n' for i in range(200)), encoding='utf-8')
+    return str(path)
+
+
+def test_preview_estimates_with_default_write_rate(tmp_path):
+    result = preview_file(_csv_file(tmp_path), default_write_rows_per_second=1000)
+    assert result['estimate_approximate'] is True
+    assert result['estimated_seconds'] is not None
+    assert result['throughput']['insert_rows_per_second'] < 1000
+
+
+def test_preview_prefers_measured_insert_rate(tmp_path):
+    result = preview_file(_csv_file(tmp_path), insert_rows_per_second=1000, default_write_rows_per_second=10)
+    assert result['estimate_approximate'] is False
+    assert result['throughput']['insert_rows_per_second'] == 1000
+
+
+def test_preview_builds_ddl_with_the_selected_backend(tmp_path):
+    path = _csv_file(tmp_path)
+    mariadb = preview_file(path, primary_key=['id'])
+    assert mariadb['backend'] == 'mariadb'
+    assert mariadb['create_table'] == 'CREATE TABLE `data` (`id` INT, `name` VARCHAR(14), PRIMARY KEY (`id`))'
+    assert mariadb['row_size']['limit'] is not None
+
+    sqlite = preview_file(path, primary_key=['id'], backend=ddl_backend('sqlite'))
+    assert sqlite['backend'] == 'sqlite'
+    assert sqlite['create_table'] == 'CREATE TABLE "data" ("id" INT, "name" TEXT, PRIMARY KEY ("id"))'
+    assert sqlite['row_size'] == {'estimated_bytes': None, 'limit': None, 'text_columns': []}
@@ -0,0 +1,43 @@
+import pytest
+
+from modules.schema_options import (index_name, parse_column_list, parse_indexes, table_options_sql,
+                                    validate_indexes, validate_table_options)
+
+
+def test_parse_column_list():
+    assert parse_column_list(' id, name ,,region ') == ['id', 'name', 'region']
+    assert parse_column_list(None) == []
+
+
+def test_parse_indexes():
+    assert parse_indexes('name; unique code, region;; UNIQUE  x ;') == [
+        {'columns': ['name'], 'unique': False},
+        {'columns': ['code', 'region'], 'unique': True},
+        {'columns': ['x'], 'unique': True}
+    ]
+    assert parse_indexes('') == []
+    # unique 后面没有空格时是列名
+    assert parse_indexes('uniquely') == [{'columns': ['uniquely'], 'unique': False}]
+
+
+def test_index_name():
+    assert index_name({'columns': ['code', 'region'], 'unique': True}) == 'ux_code_region'
+    assert index_name({'columns': ['a-b', '名称'], 'unique': False}) == 'ix_a_b_名称'
+    assert len(index_name({'columns': ['c' * 100], 'unique': False})) == 64
+
+
+def test_validate_indexes_rejects_unique_text_columns():
+    column_types = {'name': 'TEXT', 'code': 'VARCHAR(20)'}
+    validate_indexes([{'columns': ['name'], 'unique': False}, {'columns': ['code'], 'unique': True}], column_types)
+    with pytest.raises(ValueError):
+        validate_indexes([{'columns': ['name'], 'unique': True}], column_types)
+
+
+def test_validate_table_options():
+    assert validate_table_options({'engine': 'innodb', 'row_format': 'dynamic', 'compression': 'none'}) == \
+        {'engine': 'InnoDB', 'row_format': 'DYNAMIC'}
+    assert table_options_sql(validate_table_options({'compression': 'page'})) == ' PAGE_COMPRESSED=1'
+    with pytest.raises(ValueError):
+        validate_table_options({'engine': 'CSV'})
+    with pytest.raises(ValueError):
+        validate_table_options({'engine': 'Aria', 'compression': 'page'})
@@ -0,0 +1,29 @@
+from modules.table_ddl import ROW_SIZE_THRESHOLD, create_table_sql, estimate_row_size, fit_row_size
+
+
+def test_fit_row_size_keeps_small_rows():
+    column_types = ['INT', 'VARCHAR(100)', 'DATE']
+    assert fit_row_size(column_types) == (column_types, 4 + 403 + 3, [])
+
+
+def test_fit_row_size_converts_longest_varchar_first():
+    column_types = ['VARCHAR(10000)', 'VARCHAR(8000)', 'INT', 'VARCHAR(5000)']
+    fitted, row_size, converted = fit_row_size(column_types)
+    assert fitted == ['TEXT', 'VARCHAR(8000)', 'INT', 'VARCHAR(5000)']
+    assert converted == [0]
+    assert row_size == estimate_row_size(fitted) <= ROW_SIZE_THRESHOLD
+
+
+def test_fit_row_size_keeps_key_and_index_columns():
+    fitted, row_size, converted = fit_row_size(['VARCHAR(10000)', 'VARCHAR(8000)', 'INT', 'VARCHAR(5000)'], {0})
+    assert fitted == ['VARCHAR(10000)', 'TEXT', 'INT', 'TEXT']
+    assert converted == [1, 3]
+    assert row_size == estimate_row_size(fitted)
+
+
+def test_create_table_sql():
+    sql = create_table_sql('t', ['id', 'name'], ['INT', 'VARCHAR(20)'], primary_key=['id'],
+                           unique_key=('uk', ['name']), extra_columns=[('_row_hash', 'BIGINT UNSIGNED')],
+                           table_options={'engine': 'InnoDB'})
+    assert sql == ('CREATE TABLE `t` (`id` INT, `name` VARCHAR(20), `_row_hash` BIGINT UNSIGNED, '
+                   'PRIMARY KEY (`id`), UNIQUE KEY `uk` (`name`)) ENGINE=InnoDB')
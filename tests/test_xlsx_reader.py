@@ -0,0 +1,167 @@
+import datetime
+import zipfile
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from modules import stream_reader
+from modules.stream_reader import ChunkedReader
+from modules.xlsx_reader import FastXlsxReader, cell_to_str
+
+
+def test_cell_to_str_matches_read_excel():
+    assert cell_to_str(None) == ''
+    assert cell_to_str(1.0) == '1'
+    assert cell_to_str(-0.0) == '0'
+    assert cell_to_str(1e20) == '100000000000000000000'
+    assert cell_to_str(1.5) == '1.5'
+    assert cell_to_str(3) == '3'
+    assert cell_to_str(True) == 'True'
+    assert cell_to_str(datetime.datetime(2024, 1, 2, 3, 4, 5)) == '2024-01-02 03:04:05'
+    assert cell_to_str(datetime.time(1, 2)) == '01:02:00'
+    assert cell_to_str('a') == 'a'
+
+
+def _workbook(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'data'
+    ws.append(['id', 'num', 'date', 'dt', 'flag', 'text', 'dup', 'dup'])
+    ws.append([1, 1.5, datetime.date(2024, 1, 2), datetime.datetime(2024, 1, 2, 3, 4, 5), True, 'a&b<c>', 'x', 'y'])
+    ws.append([2, 1e20, datetime.datetime(1900, 1, 1), None, False, '  sp ', None, 'z'])
+    ws.append([])
+    ws.append([3, -0.25, None, 45000.75, None, '0012', '=1+1'])
+    ws['D5'].number_format = 'yyyy-mm-dd hh:mm'
+    wb.create_sheet('second').append(['only'])
+    wb.save(path)
+
+
+def test_fast_reader_matches_read_excel(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    _workbook(path)
+    expected = pd.read_excel(path, dtype=str, keep_default_na=False, engine='openpyxl')
+    expected.columns = [str(col) for col in expected.columns]
+    actual = ChunkedReader(str(path), 'xlsx', chunk_rows=2).read_all()
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected)
+
+
+def test_fast_reader_sheet_names(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    _workbook(path)
+    with FastXlsxReader(str(path), 'second') as reader:
+        assert reader.sheet_names == ['data', 'second']
+        assert [row for row in reader.iter_rows()] == [['only']]
+
+
+def _trailing_blank_header(ws):
+    ws.append(['id', 'name', None, None])
+    ws.append([1, 'a', 'x', None])
+    ws.append([2, 'b', None, 'y'])
+
+
+def _blank_first_row(ws):
+    ws.append([])
+    ws.append(['id', 'name'])
+    ws.append([1, 'a'])
+
+
+def _leading_blank_column(ws):
+    ws['B1'], ws['C1'], ws['B2'], ws['C2'], ws['A3'] = 'id', 'name', 1, 'a', 'z'
+
+
+def _styled_empty_cell(ws):
+    ws.append(['id'])
+    ws.append([1])
+    ws['F1'].number_format = '0.00'
+
+
+def _duplicate_and_unnamed_columns(ws):
+    ws.append(['a', 'a', None, 'a.1', 'Unnamed: 4', None])
+    ws.append([1, 2, 3, 4, 5, 6, 7])
+
+
+def _header_only(ws):
+    ws.append(['id', 'name'])
+
+
+SHEETS = [_trailing_blank_header, _blank_first_row, _leading_blank_column, _styled_empty_cell,
+          _duplicate_and_unnamed_columns, _header_only]
+
+
+@pytest.mark.parametrize('fast', [True, False], ids=['fast', 'openpyxl'])
+@pytest.mark.parametrize('build', SHEETS)
+def test_read_all_keeps_every_column_like_read_excel(tmp_path, monkeypatch, build, fast):
+    path = tmp_path / 'book.xlsx'
+    wb = Workbook()
+    build(wb.active)
+    wb.save(path)
+    if not fast:
+        monkeypatch.setattr(stream_reader, '_open_fast_xlsx', lambda *args: None)
+    expected = pd.read_excel(path, dtype=str, keep_default_na=False, engine='openpyxl')
+    reader = ChunkedReader(str(path), 'xlsx', chunk_rows=1)
+    actual = reader.read_all()
+    assert list(actual.columns) == list(expected.columns) == reader.columns
+    assert actual.values.tolist() == expected.values.tolist()
+
+
+def test_streaming_uses_sheet_dimension_for_wide_rows(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    wb = Workbook()
+    _trailing_blank_header(wb.active)
+    wb.save(path)
+    reader = ChunkedReader(str(path), 'xlsx', chunk_rows=1)
+    assert reader.columns == ['id', 'name', 'Unnamed: 2', 'Unnamed: 3']
+    assert pd.concat([chunk for chunk, _ in reader]).values.tolist() == [['1', 'a', 'x', ''], ['2', 'b', '', 'y']]
+
+
+def test_streaming_rejects_rows_wider_than_the_columns(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    wb = Workbook()
+    _trailing_blank_header(wb.active)
+    wb.save(path)
+    reader = ChunkedReader(str(path), 'xlsx')
+    reader.columns = reader.columns[:2]
+    with pytest.raises(ValueError):
+        list(reader)
+
+
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def _shared_strings_book(path, sheets):
+    """写入用共享字符串表保存文本的工作簿（openpyxl 只写内联字符串），sheets 为 {名称: [[下标, ...], ...]}"""
+    strings = sorted({text for rows in sheets.values() for row in rows for text in row})
+    rels = [f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(sheets) + 1)]
+    rels.append(f'<Relationship Id="rIdS" Type="{_REL_NS}/sharedStrings" Target="sharedStrings.xml"/>')
+    with zipfile.ZipFile(path, 'w') as z:
+        z.writestr('xl/workbook.xml', f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>' + ''.join(
+            f'<sheet name="{name}" sheetId="{i}" r:id="rId{i}"/>' for i, name in enumerate(sheets, 1))
+                   + '</sheets></workbook>')
+        z.writestr('xl/_rels/workbook.xml.rels',
+                   '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                   + ''.join(rels) + '</Relationships>')
+        z.writestr('xl/sharedStrings.xml', f'<sst xmlns="{_MAIN_NS}">' + ''.join(
+            f'<si><t>{text}</t></si>' for text in strings) + '</sst>')
+        for i, rows in enumerate(sheets.values(), 1):
+            z.writestr(f'xl/worksheets/sheet{i}.xml', f'<worksheet xmlns="{_MAIN_NS}"><sheetData>' + ''.join(
+                f'<row r="{r}">' + ''.join(f'<c r="{chr(65 + c)}{r}" t="s"><v>{strings.index(text)}</v></c>'
+                                           for c, text in enumerate(row)) + '</row>'
+                for r, row in enumerate(rows, 1)) + '</sheetData></worksheet>')
+
+
+def test_sheet_readers_reuse_shared_strings(tmp_path, monkeypatch):
+    path = str(tmp_path / 'book.xlsx')
+    _shared_strings_book(path, {'first': [['id', 'name'], ['1', 'a']], 'second': [['name'], ['a']]})
+    calls = []
+    parse = FastXlsxReader._read_shared_strings
+    monkeypatch.setattr(FastXlsxReader, '_read_shared_strings',
+                        lambda self, part: calls.append(part) or parse(self, part))
+    shared_strings = stream_reader.xlsx_shared_strings(path)
+    frames = [ChunkedReader(path, 'xlsx', sheet_name=sheet, shared_strings=shared_strings).read_all()
+              for sheet in ('first', 'second')]
+    assert len(calls) == 1
+    assert frames[0].values.tolist() == [['1', 'a']]
+    assert frames[1].values.tolist() == [['a']]
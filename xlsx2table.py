@@ -1,123 +1,184 @@
 import flask
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, render_template, request, redirect, url_for, jsonify, Response, stream_with_context
 import pandas as pd
-from pathlib import Path
-import re
-import mysql.connector
 import time
 import json
 import os
-import threading
 import csv
+import cProfile
+import threading
 from werkzeug.utils import secure_filename
-from modules.column_type_detector import determine_column_type  # 导入字符判断模块
+from modules.column_type_detector import ColumnProfile, DEFAULT_SAMPLE_SIZE, column_spec  # 导入字符判断模块
+from modules.parallel_analysis import ColumnAnalyzer, merge_profiles
+from modules.import_pipeline import pipelined
+from modules.batch_converter import BatchConverter
+from modules.db_writer import WRITE_METHOD_EXECUTEMANY, staging_table_name
+from modules.backends import (BACKEND_MARIADB, BACKENDS, DATABASE_ERRORS, DEFAULT_LOCAL_DB_DIR,
+                              DEFAULT_WRITE_ROWS_PER_SECOND, create_backend, ddl_backend, local_database_path)
+from modules.parallel_writer import ParallelWriter
+from modules.stream_reader import (ChunkedReader, DEFAULT_CHUNK_ROWS, detect_file_type, file_stem, list_sheets,
+                                  xlsx_shared_strings)
+from modules.batch_sizing import BatchSizer
+from modules.csv_format import CSV_ENGINE_C, detect_csv_format, read_csv_file
+from modules.schema_options import parse_column_list, parse_indexes, validate_table_options, ENGINES, ROW_FORMATS
+from modules.table_ddl import ROW_SIZE_LIMIT
+from modules.incremental import (IMPORT_MODE_REPLACE, IMPORT_MODE_DIFF, IMPORT_MODES, KEYED_IMPORT_MODES,
+                                 ROW_HASH_COLUMN, ROW_HASH_TYPE, RowHashFilter, UNIQUE_KEY_NAME,
+                                 prepare_existing_table, validate_key_columns)
+from modules.checkpoint import (CheckpointStore, DEFAULT_CHECKPOINT_DIR, count_rows, file_fingerprint, merge_ranges,
+                               skip_committed)
+from modules.import_cache import ImportCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES
+from modules.multi_sheet import (DEFAULT_SHEET_WORKERS, clean_table_name, sheet_table_names, sheet_analysis_workers,
+                                 import_sheets)
+from modules.job_manager import (ImportJob, JobManager, DEFAULT_MAX_CONCURRENT_JOBS, JOB_FINISHED, JOB_FAILED,
+                                 JOB_STOPPED)
+from modules.uploads import upload_file_name, save_stream
+from modules.preview import PREVIEW_ROWS, MAX_PREVIEW_ROWS, SAMPLE_HEAD, SAMPLE_METHODS, preview_file
+from modules.metrics import (ImportMetrics, MetricsRegistry, PHASE_READ, PHASE_CONNECT, PHASE_ANALYZE, PHASE_DDL,
+                             PHASE_INSERT, PHASE_FINALIZE)
 
 EXCEL_DIR = './upfile'
-progress_lock = threading.Lock()
+# 进度推送的最小间隔（秒），间隔内的多次变化合并为一次推送
+PROGRESS_STREAM_INTERVAL = 0.2
+# 进度长时间没有变化时发送心跳注释，防止代理断开空闲连接
+PROGRESS_STREAM_KEEPALIVE = 15
 app = Flask(__name__)
+# 所有导入任务的累计指标，由 /metrics 输出
+import_metrics = MetricsRegistry()
 
-# 统一全局变量定义
-progress = {'percentage': 0, 'message': '', 'status': '', 'can_stop': True}
-import_flag = False  # 重命名为 import_flag 避免与函数名冲突
+def excel2mariadb_with_progress(excel_path, username, password, host, database, port, streaming=False,
+                                sample_size=DEFAULT_SAMPLE_SIZE, analysis_workers=None,
+                                write_method=WRITE_METHOD_EXECUTEMANY, write_workers=1, use_staging=False,
+                                profile=False, sheet_name=None, table_name=None, import_mode=IMPORT_MODE_REPLACE,
+                                key_columns=None, primary_key=None, indexes=None, table_options=None, bulk_tuning=False,
+                                csv_engine=CSV_ENGINE_C, cache=None, checkpoints=None, resume=None, job=None,
+                                backend=BACKEND_MARIADB, shared_strings=None):
+    """将文件导入 MariaDB，或导入 backend 指定的其他数据库
 
-def excel2mariadb_with_progress(excel_path, username, password, host, database, port):
-    global progress, import_flag
+    streaming 为 True 时使用流式导入：文件按块读取，第一遍扫描分析列类型，
+    第二遍逐块写入数据库，内存占用与文件大小无关。
+    sample_size 为类型推断的采样行数，采样只用于提前排除候选类型，结果与全量分析一致。
+    analysis_workers 为并行分析列类型的进程数，默认等于 CPU 核数，为 1 时串行分析。
+    write_method 为 'load_data' 时使用 LOAD DATA LOCAL INFILE 写入，服务器不允许时自动退回 executemany。
+    write_workers 大于 1 时使用多个连接并行写入。
+    写入的批次行数和提交行数不固定：按行数据量和服务器的 max_allowed_packet 限制批次大小，
+    并按实测的每秒行数和写入、提交耗时调整，当前值见进度中的 batch_sizing。
+    use_staging 为 True 时先导入临时表，完成后用 RENAME TABLE 原子替换目标表，导入过程中目标表保持不变。
+    profile 为 True 时用 cProfile 记录本次导入（只包含执行导入的线程，不含读取和转换线程），
+    结果保存在 profiles 目录中，路径和摘要见任务的计时报告。
+    sheet_name 为要导入的工作表，默认第一个工作表；table_name 为目标表名，默认由文件名生成。
+    shared_strings 为已解析的 XLSX 共享字符串表（见 stream_reader.xlsx_shared_strings），导入同一文件的多个工作表时共用。
+    import_mode 为导入方式：'replace' 删除并重建目标表；'append' 追加到已有表；'upsert' 按 key_columns
+    更新已有的行、插入新行；'diff' 与 upsert 相同，但先按行内容哈希跳过未变化的行。除 replace 外，
+    目标表已存在且列与文件一致时沿用表结构、跳过类型推断，表不存在时按推断的类型创建；
+    这几种方式不使用临时表，upsert 和 diff 只使用一个写入连接。
+    primary_key 为主键列，在建表时声明；indexes 为二级索引 [{'columns': [...], 'unique': bool}]，
+    在全部数据写入之后用一条 ALTER TABLE 一次建好；table_options 为 {'engine', 'row_format', 'compression'}。
+    沿用已有表时不修改表结构，只补建缺少的二级索引。
+    bulk_tuning 为 True 时在权限允许的范围内关闭二进制日志（sql_log_bin）、加大批量插入缓冲区，
+    并临时把 innodb_flush_log_at_trx_commit 改为 2，导入结束后恢复。
+    csv_engine 为 'pyarrow' 且已安装 pyarrow 时，非流式导入用 pyarrow 多线程解析 CSV。
+    cache 为 ImportCache 时按文件缓存解析结果和推断的列类型，重新导入同一文件时跳过解析和类型分析；
+    流式导入只缓存列类型。
+    checkpoints 为 CheckpointStore 时每次提交后记录检查点，导入失败或停止后保留，成功后删除。
+    resume 为之前任务的检查点时继续该次导入：沿用已建好的表和列类型，跳过已提交的行。
+    检查点在提交之后写入，进程恰好在两者之间退出时，继续导入会重复写入最后一次提交的行。
+    job 为调度器分配的任务，进度和停止标记都保存在任务中；直接调用时自动创建一个任务。
+    backend 为写入后端（见 modules.backends）：'sqlite'、'duckdb' 时 database 为本地数据库文件的路径，
+    'parquet' 时为输出目录，其余连接参数不使用。读取和类型推断与后端无关，列类型由后端转换为各自的类型；
+    后端不支持的选项（并行写入、临时表、LOAD DATA、表选项、检查点等）自动忽略。
+    """
+    if job is None:
+        job = ImportJob(os.path.basename(excel_path))
+    progress = job.progress
+    metrics = job.metrics = ImportMetrics(import_metrics)
+    profiler = cProfile.Profile() if profile else None
     cursor = None
     conn = None
+    df = None
+    checkpoint = None
+    db_backend = None
+    writer = None
     start_time = time.time()
+
+    # 读取文件时每个数据块的行数；写入的批次和提交行数由 BatchSizer 按实测结果调整
+    chunk_rows = DEFAULT_CHUNK_ROWS
+    if profiler:
+        profiler.enable()
     try:
+        metrics.start_phase(PHASE_READ)
         # 根据文件扩展名确定文件类型和读取方式
-        file_ext = os.path.splitext(excel_path)[1].lower()
-        
-        if file_ext == '.csv':
-            file_type = 'csv'
-        elif file_ext == '.xls':
-            file_type = 'xls'
-        elif file_ext == '.xlsx':
-            file_type = 'xlsx'
-        else:
-            raise ValueError("不支持的文件类型，请提供 .csv, .xls 或 .xlsx 文件。")
+        file_type = detect_file_type(excel_path)
+        cache_key = cache.key(excel_path, sheet_name) if cache and cache.enabled else None
+        cache_meta = cache.get(cache_key) if cache_key else None
+        cached_df = None
+        if cache_meta and not streaming:
+            cached_df = cache.load_data(cache_key, cache_meta)
         
+        # 旋转动画由页面绘制，这里只在进度真正变化时更新消息
         progress['percentage'] = 5
-        loading_message = f"正在读取{file_type.upper()}文件,如果文件较大此过程将会很慢，请耐心等待"
-        
-        # 创建一个事件来控制加载消息线程
-        file_loaded_event = threading.Event()
-        
-        # 创建一个线程来更新加载消息
-        def update_loading_message():
-            # 使用优雅的旋转动画
-            indicators = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
-            i = 0
-            while not file_loaded_event.is_set():
-                with progress_lock:
-                    progress['message'] = f"{loading_message} {indicators[i]}"
-                i = (i + 1) % len(indicators)
-                time.sleep(0.08)  # 调整动画速度
-
-        loading_thread = threading.Thread(target=update_loading_message, daemon=True)
-        loading_thread.start()
+        progress['message'] = f"正在读取{file_type.upper()}文件,如果文件较大此过程将会很慢，请耐心等待"
         
         # 根据文件类型读取数据
-        if file_type == 'csv':
-            # 尝试检测CSV文件编码，优先使用 UTF-8 with BOM 和 UTF-8
-            encodings = ['utf-8-sig', 'utf-8', 'gbk', 'gb2312', 'latin1']
-            df = None
-            
-            for encoding in encodings:
-                try:
-                    # 先尝试直接读取表头来检测分隔符
-                    with open(excel_path, 'r', encoding=encoding) as f:
-                        header = f.readline()
-                        # 常见的分隔符
-                        for delimiter in [',', '\t', ';']:
-                            if delimiter in header:
-                                progress['message'] = f"检测到分隔符: {delimiter}, 使用编码: {encoding}"
-                                
-                                # 直接一次性读取文件
-                                df = pd.read_csv(
-                                    excel_path,
-                                    dtype=str,
-                                    keep_default_na=False,
-                                    encoding=encoding,
-                                    delimiter=delimiter,
-                                    low_memory=False  # 对于大文件，禁用内存优化以提高速度
-                                )
-                                break
-                    if df is not None:
-                        break
-                except Exception as e:
-                    continue
-            
-            if df is None:
-                raise ValueError("无法读取CSV文件，请检查文件格式和编码。")
-                
+        if streaming:
+            # 流式模式只读取表头，数据在分析和导入阶段按块读取
+            reader = ChunkedReader(excel_path, file_type, chunk_rows=chunk_rows, sheet_name=sheet_name,
+                                   shared_strings=shared_strings)
+            source_columns = reader.columns
+        elif cached_df is not None:
+            # 同一文件已经解析过，直接读取缓存的列式副本
+            df = cached_df
+            progress['message'] = "使用缓存的解析结果"
+        elif file_type == 'csv':
+            # 根据有限的采样确定编码、分隔符、引号和表头，然后只读取一遍文件
+            csv_format = detect_csv_format(excel_path)
+            progress['message'] = f"检测到 {csv_format.describe()}"
+            df = read_csv_file(excel_path, csv_format, engine=csv_engine)
+
         elif file_type == 'xlsx':
-            df = pd.read_excel(
-                excel_path,
-                dtype=str,
-                keep_default_na=False,
-                engine='openpyxl',
-                engine_kwargs={
-                    'read_only': True,
-                    'data_only': True
-                }
-            )
+            # 直接解析工作表 XML，比 pd.read_excel 经由 openpyxl 单元格对象快得多
+            df = ChunkedReader(excel_path, 'xlsx', chunk_rows=chunk_rows, sheet_name=sheet_name,
+                               shared_strings=shared_strings).read_all()
         else:  # .xls 文件
             df = pd.read_excel(
                 excel_path,
+                sheet_name=0 if sheet_name is None else sheet_name,
                 dtype=str,
                 keep_default_na=False,
                 engine='xlrd'
             )
-            
-        # 标记文件已加载完成
-        file_loaded_event.set()
+
+        if df is not None:
+            source_columns = df.columns
+            metrics.add_bytes_read(os.path.getsize(excel_path))
+            if cache_key and cached_df is None:
+                # 在连接数据库之前保存，连接失败后重试也能跳过解析
+                cache.put_data(cache_key, df)
         
-        original_columns = [str(col).strip() for col in df.columns]
-        table_name = Path(excel_path).stem
-        table_name = re.sub(r'[^a-zA-Z0-9_\u4e00-\u9fff]', '_', table_name)[:30]
+        original_columns = [str(col).strip() for col in source_columns]
+        if table_name is None:
+            table_name = clean_table_name(file_stem(excel_path))
+        if resume:
+            if file_fingerprint(excel_path) != {key: resume[key] for key in ('file_size', 'file_mtime_ns')}:
+                checkpoints.delete(resume['job_id'])
+                raise ValueError("文件在上次导入后已被修改，无法继续导入，请重新导入")
+            if resume['columns'] != original_columns:
+                raise ValueError("文件的列与检查点不一致，无法继续导入")
+        if import_mode not in IMPORT_MODES:
+            raise ValueError(f"不支持的导入方式: {import_mode}")
+        incremental = import_mode != IMPORT_MODE_REPLACE
+        keyed = import_mode in KEYED_IMPORT_MODES
+        if keyed:
+            if not key_columns:
+                raise ValueError("按键更新和差异导入需要指定键列")
+            key_columns = validate_key_columns(key_columns, original_columns)
+        if primary_key:
+            primary_key = validate_key_columns(primary_key, original_columns)
+        indexes = [dict(index, columns=validate_key_columns(index['columns'], original_columns))
+                   for index in indexes or []]
+        table_options = validate_table_options(table_options)
         
+        metrics.start_phase(PHASE_CONNECT)
         progress['percentage'] = 10
         progress['message'] = "正在连接数据库..."
         
@@ -126,172 +187,319 @@ def excel2mariadb_with_progress(excel_path, username, password, host, database,
         threshold = 10 * 1024 * 1024  # 10MB
         buffered = file_size < threshold
 
-        conn = mysql.connector.connect(
-            user=username, 
-            password=password, 
-            host=host, 
-            database=database, 
-            port=int(port), 
-            charset='utf8mb4',
-            buffered=buffered
-        )
+        # 读取和类型推断与写入后端无关，建表、写入和提交都由后端完成
+        db_backend = create_backend(backend, username, password, host, database, port, write_method)
+        use_staging = use_staging and db_backend.staging
+        if not db_backend.durable:
+            checkpoints = None
+        conn = db_backend.connect(buffered=buffered)
         cursor = conn.cursor()
+        # 批次大小受服务器允许的最大包限制
+        sizer = BatchSizer(db_backend.max_packet_bytes(cursor))
+        progress['batch_sizing'] = sizer.to_dict()
         
         # 优化数据类型分析过程
+        metrics.start_phase(PHASE_ANALYZE)
         progress['percentage'] = 15
-        analysis_message = "正在分析数据类型"
-        analysis_event = threading.Event()
-        
-        def update_analysis_message():
-            indicators = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
-            i = 0
-            while not analysis_event.is_set():
-                with progress_lock:
-                    progress['message'] = f"{analysis_message} {indicators[i]}"
-                i = (i + 1) % len(indicators)
-                time.sleep(0.08)
-
-        analysis_thread = threading.Thread(target=update_analysis_message, daemon=True)
-        analysis_thread.start()
-        
-        cursor.execute(f'DROP TABLE IF EXISTS `{table_name}`')
-        columns_definition = []
-        
-        # 计算预估的行大小
-        estimated_row_size = 0
-        for col in original_columns:
-            column_type = determine_column_type(df[col])  # 使用导入的函数
-            columns_definition.append(f'`{col}` {column_type}')
-            
-            # 粗略估计每列占用的字节数
-            if 'VARCHAR' in column_type:
-                match = re.search(r'VARCHAR\((\d+)\)', column_type)
-                if match:
-                    varchar_size = int(match.group(1))
-                    estimated_row_size += varchar_size * 4 + 3
-            elif 'INT' in column_type:
-                estimated_row_size += 4
-            elif 'DECIMAL' in column_type:
-                estimated_row_size += 8
-            elif 'DATE' in column_type:
-                estimated_row_size += 3
-            elif 'DATETIME' in column_type:
-                estimated_row_size += 8
-                
-        progress['percentage'] = 20
-        progress['message'] = f"估计的行大小: {estimated_row_size} 字节"
-        
-        # 如果预估行大小接近或超过限制，进行调整
-        if estimated_row_size > 60000:  # 留一些余量
-            progress['message'] = f"警告: 表结构可能超出行大小限制(65535)，正在自动调整列类型..."
-            
-            varchar_columns = []
-            for i, col_def in enumerate(columns_definition):
-                match = re.search(r'VARCHAR\((\d+)\)', col_def)
-                if match:
-                    varchar_size = int(match.group(1))
-                    varchar_columns.append((i, varchar_size))
-            
-            varchar_columns.sort(key=lambda x: x[1], reverse=True)
-            
-            for i, size in varchar_columns:
-                if estimated_row_size > 60000:
-                    if 'VARCHAR' in columns_definition[i]:
-                        estimated_row_size -= (size * 4 + 3)
-                        estimated_row_size += 2
-                        columns_definition[i] = re.sub(r'VARCHAR\(\d+\)', 'TEXT', columns_definition[i])
-                        progress['message'] = f"将列 {original_columns[i]} 从VARCHAR转为TEXT，现在估计行大小: {estimated_row_size} 字节"
-                else:
-                    break
-        
-        # 分析完成，停止分析动画
-        analysis_event.set()
+        progress['message'] = "正在分析数据类型"
         
-        progress['percentage'] = 25
-        progress['message'] = "正在创建表结构..."
-        
-        ddl = f'CREATE TABLE `{table_name}` ({", ".join(columns_definition)})'
-        cursor.execute(ddl)
-        
-        cursor.execute("SET autocommit=0")
-        cursor.execute("SET unique_checks=0")
-        cursor.execute("SET foreign_key_checks=0")
-        
-        # 修改：增加批量提交大小，减少网络通信
-        batch_size = 10000  # 增加批量大小
-        commit_size = 50000  # 每20000条记录提交一次
+        # 推断类型时得到的写入规格（日期格式和数字的清理规则），沿用已有的表时没有
+        column_specs = None
+        if resume:
+            # 继续之前的导入：表已经建好，沿用检查点中的列类型
+            load_table = resume['load_table']
+            if not db_backend.table_exists(cursor, load_table):
+                raise ValueError(f"表 {load_table} 不存在，无法继续导入")
+            column_types = resume['column_types']
+            column_specs = resume.get('column_specs')
+            total_rows = resume['total_rows'] if streaming else len(df)
+        elif incremental:
+            # 增量导入写入已有的表，列与文件一致时沿用表结构，跳过类型推断
+            load_table = table_name
+            column_types = prepare_existing_table(db_backend, cursor, table_name, original_columns, import_mode,
+                                                  key_columns)
+            total_rows = None if streaming else len(df)
+        else:
+            # 使用临时表时目标表在导入完成前保持不变
+            load_table = staging_table_name(table_name) if use_staging else table_name
+            db_backend.drop_table(cursor, load_table)
+            column_types = None
+
+        if column_types is None:
+            cached_types = cache_meta.get('column_types') if cache_meta else None
+            if cached_types is not None and cache_meta['columns'] == original_columns:
+                # 同一文件已经分析过，直接使用缓存的列类型
+                column_types = cached_types
+                column_specs = cache_meta.get('column_specs')
+                total_rows = cache_meta['total_rows'] if streaming else len(df)
+                progress['message'] = "使用缓存的列类型，跳过类型分析"
+            else:
+                with ColumnAnalyzer(analysis_workers, sample_size) as analyzer:
+                    if streaming:
+                        # 第一遍扫描：逐块分析列类型并统计总行数，第一个数据块起到采样的作用
+                        profiles = None
+                        total_rows = 0
+                        for chunk, fraction in reader:
+                            if job.is_cancelled():
+                                progress['message'] = "导入已被用户停止"
+                                progress['status'] = "已停止"
+                                progress['can_stop'] = False
+                                return "导入已停止"
+                            total_rows += len(chunk)
+                            profiles = merge_profiles(profiles, analyzer.profile(chunk))
+                            progress['percentage'] = int(15 + fraction * 5)
+                            progress['message'] = f"正在分析数据类型，已扫描 {total_rows} 行 ({fraction:.0%})"
+                        metrics.add_bytes_read(os.path.getsize(excel_path))
+                        if profiles is None:
+                            profiles = [ColumnProfile() for _ in original_columns]
+                    else:
+                        total_rows = len(df)
+
+                        def on_analysis_progress(done, total):
+                            progress['message'] = f"正在分析数据类型，已完成 {done} / {total} 列"
+
+                        profiles = analyzer.profile(df, on_progress=on_analysis_progress)
+                column_specs = [profile.column_spec() for profile in profiles]
+                column_types = [spec['type'] for spec in column_specs]
+                if cache_key:
+                    cache.put_schema(cache_key, original_columns, column_types, total_rows, column_specs)
+            # 键列和主键列要建唯一索引，不能转为 TEXT；二级索引的列同样保持 VARCHAR
+            unique_columns = (key_columns if keyed else []) + (primary_key or [])
+            key_indexes = sorted({original_columns.index(col) for col in unique_columns})
+            db_backend.validate_key_types([original_columns[i] for i in key_indexes],
+                                          [column_types[i] for i in key_indexes])
+            index_columns = set(key_indexes) | {original_columns.index(col) for index in indexes for col in index['columns']}
+
+            # 估计行大小，接近或超过限制时从最长的 VARCHAR 列开始转为 TEXT（只有 MariaDB 有行大小限制）
+            ddl_column_types, estimated_row_size, text_columns = db_backend.fit_column_types(column_types, index_columns)
+            progress['percentage'] = 20
+            if estimated_row_size is not None:
+                progress['message'] = f"估计的行大小: {estimated_row_size} 字节"
+            if text_columns:
+                names = ', '.join(str(original_columns[i]) for i in text_columns)
+                progress['message'] = (f"警告: 表结构可能超出行大小限制({ROW_SIZE_LIMIT})，已将列 {names} 从VARCHAR转为TEXT，"
+                                       f"现在估计行大小: {estimated_row_size} 字节")
+
+            metrics.start_phase(PHASE_DDL)
+            progress['percentage'] = 25
+            progress['message'] = "正在创建表结构..."
+
+            # 主键决定 InnoDB 的数据组织方式，只能在建表时声明；二级索引在导入完成后再建
+            # 按键更新和差异方式没有声明主键时以键列为主键，与主键不同时另建唯一索引
+            unique_key = None
+            if primary_key and keyed and {col.lower() for col in key_columns} != {col.lower() for col in primary_key}:
+                unique_key = (UNIQUE_KEY_NAME, key_columns)
+            extra_columns = [(ROW_HASH_COLUMN, ROW_HASH_TYPE)] if import_mode == IMPORT_MODE_DIFF else []
+            ddl = db_backend.create_table_sql(load_table, original_columns, ddl_column_types,
+                                           primary_key or (key_columns if keyed else None), unique_key, extra_columns,
+                                           table_options)
+            cursor.execute(ddl)
         
+        # 二级索引在导入完成后才建，先确认能够建立，避免写完数据才失败
+        index_column_types = {col.lower(): column_type for col, column_type in zip(original_columns, column_types)}
+        db_backend.validate_indexes(indexes, index_column_types)
+
+        # 建表时 VARCHAR 可能被改为 TEXT，写入规格按最终的列类型生成，沿用推断时匹配的日期格式
+        date_formats = [spec.get('date_format') for spec in column_specs or [{}] * len(column_types)]
+        column_specs = [column_spec(column_type, date_format)
+                        for column_type, date_format in zip(column_types, date_formats)]
+
+        session_tuning = db_backend.apply_bulk_session(cursor, upsert=keyed, tuning=bulk_tuning)
+        if bulk_tuning:
+            db_backend.tune_server(cursor)
+
+        # diff 方式先取出已有的行哈希，转换前过滤掉未变化的行
+        write_columns = list(original_columns)
+        row_filter = None
+        if import_mode == IMPORT_MODE_DIFF:
+            progress['message'] = "正在读取已有数据的行哈希..."
+            row_filter = RowHashFilter(None, db_backend.load_row_hashes(cursor, load_table), db_backend.signed_row_hash)
+            write_columns.append(ROW_HASH_COLUMN)
+
+        # 检查点记录已提交的源文件行区间，继续导入时从上一个任务的检查点开始
+        committed_ranges = merge_ranges(resume['committed_ranges']) if resume else []
+        checkpoint = None
+        if checkpoints:
+            checkpoint = {
+                'job_id': job.id,
+                'file_path': os.path.abspath(excel_path),
+                'file_name': job.file_name,
+                **file_fingerprint(excel_path),
+                'sheet_name': sheet_name,
+                'table_name': table_name,
+                'load_table': load_table,
+                'columns': original_columns,
+                'column_types': column_types,
+                'column_specs': column_specs,
+                'total_rows': total_rows,
+                'committed_ranges': committed_ranges,
+                'committed_rows': count_rows(committed_ranges),
+                'connection': {'username': username, 'host': host, 'database': database, 'port': str(port)},
+                'options': {
+                    'streaming': streaming, 'sample_size': sample_size, 'analysis_workers': analysis_workers,
+                    'write_method': write_method, 'write_workers': write_workers, 'use_staging': use_staging,
+                    'import_mode': import_mode, 'key_columns': key_columns, 'primary_key': primary_key,
+                    'indexes': indexes, 'table_options': table_options, 'bulk_tuning': bulk_tuning,
+                    'csv_engine': csv_engine, 'backend': backend
+                },
+                'error': None
+            }
+            checkpoints.save(checkpoint)
+            if resume:
+                checkpoints.delete(resume['job_id'])
+
+        def record_commit(ranges):
+            nonlocal committed_ranges
+            if checkpoint is None or not ranges:
+                return
+            committed_ranges = merge_ranges(committed_ranges + ranges)
+            checkpoint['committed_ranges'] = committed_ranges
+            checkpoint['committed_rows'] = count_rows(committed_ranges)
+            checkpoints.save(checkpoint)
+
+        if write_workers > 1 and not keyed and db_backend.parallel_writes:
+            # 每个写入线程使用自己的连接并各自提交
+            writer = ParallelWriter(db_backend, load_table, write_columns, write_workers, sizer,
+                                    metrics=metrics, tuning=bulk_tuning)
+        else:
+            # 按键更新时多个连接会争抢同一个键上的锁，且同一个键的先后顺序无法保证，只使用一个连接
+            write_workers = 1
+            writer = db_backend.create_writer(cursor, load_table, write_columns, upsert=keyed,
+                                              key_columns=key_columns)
+
+        metrics.start_phase(PHASE_INSERT)
         progress['percentage'] = 30
-        progress['message'] = "开始数据导入..."
-        
-        total_rows = len(df)
-        total_batches = (total_rows + batch_size - 1) // batch_size
-        column_names = [f"`{col}`" for col in original_columns]
-        placeholder = ", ".join(["%s"] * len(original_columns))
-        insert_sql = f'INSERT INTO `{table_name}` ({", ".join(column_names)}) VALUES ({placeholder})'
+        progress['message'] = f"开始数据导入（写入方式: {writer.method}）..."
+
+        read_fraction = 0.0
+        if streaming:
+            # 第二遍扫描：每读取一个数据块就直接写入数据库
+            def read_batches():
+                nonlocal read_fraction
+                for chunk, fraction in reader:
+                    read_fraction = fraction
+                    yield chunk
+            batches = sizer.rebatch(read_batches())
+        else:
+            batches = sizer.rebatch([df])
+
+        # 每个数据块附带其各行在源文件中的区间，已提交的行在转换前去掉
+        batches = skip_committed(batches, committed_ranges)
+
+        # 列的转换规则只确定一次，之后按列批量转换，日期转换为 ISO 格式，数字去掉分隔符和货币符号
+        converter = convert_batch = BatchConverter(column_specs, original_columns)
+        if row_filter:
+            row_filter.convert = convert_batch
+            convert_batch = row_filter
+        convert_batch = metrics.timed_convert(convert_batch)
+
+        def convert_numbered(numbered_batch):
+            ranges, batch = numbered_batch
+            return ranges, convert_batch(batch)
 
         records_since_commit = 0
-        for batch_num in range(total_batches):
-            if import_flag:
-                progress['message'] = "导入已被用户停止"
-                progress['status'] = "已停止"
-                progress['can_stop'] = False
-                if records_since_commit > 0:
-                    conn.commit()
-                if cursor:
-                    cursor.execute("SET unique_checks=1")
-                    cursor.execute("SET foreign_key_checks=1")
-                    cursor.execute("SET autocommit=1")
-                return "导入已停止"
-
-            start = batch_num * batch_size
-            end = min(start + batch_size, total_rows)
-            batch = df.iloc[start:end].values
-            
-            # 数据处理优化：预先处理整个批次的数据
-            processed_batch = []
-            for row in batch:
-                processed_row = []
-                for j, col in enumerate(original_columns):
-                    cell_value = str(row[j]).strip()
-                    if cell_value == '':
-                        processed_row.append(None)
-                    else:
-                        column_type = columns_definition[j]
-                        if 'INT' in column_type or 'DECIMAL' in column_type:
-                            processed_row.append(cell_value.replace(',', ''))
-                        else:
-                            processed_row.append(cell_value)
-                processed_batch.append(tuple(processed_row))
-
-            cursor.executemany(insert_sql, processed_batch)
-            records_since_commit += (end - start)
-
-            # 只在达到commit_size时提交，减少网络通信
-            if records_since_commit >= commit_size:
-                conn.commit()
+        uncommitted_ranges = []
+        end = 0
+        done = count_rows(committed_ranges)
+        # 读取和转换在后台线程中进行，当前线程只负责写入数据库
+        for ranges, processed_batch in pipelined(batches, convert_numbered, should_stop=job.is_cancelled):
+            start = end
+            end = start + len(processed_batch)
+            # diff 方式跳过的行也计入进度
+            done += count_rows(ranges)
+
+            if processed_batch:
+                write_start = time.perf_counter()
+                if write_workers > 1:
+                    writer.write(processed_batch, ranges)
+                else:
+                    # 数据量超过一条 INSERT 的上限时拆开写入
+                    for part in sizer.observe_rows(processed_batch):
+                        part_start = time.perf_counter()
+                        writer.write(part)
+                        sizer.observe_write(len(part), time.perf_counter() - part_start)
+                metrics.observe_write(time.perf_counter() - write_start, end - start)
+                records_since_commit += (end - start)
+            uncommitted_ranges += ranges
+
+            if write_workers > 1:
+                # 各写入线程自行提交，这里只记录已提交的批次
+                record_commit(sum(writer.take_committed(), []))
+                uncommitted_ranges = []
+            elif records_since_commit >= sizer.commit_rows:
+                # 只在达到提交行数时提交，减少网络通信
+                sizer.observe_commit(metrics.timed_commit(conn))
                 records_since_commit = 0
+                record_commit(uncommitted_ranges)
+                uncommitted_ranges = []
 
-            progress['percentage'] = int(30 + (batch_num + 1) / total_batches * 70)
-            progress['message'] = f"已导入 {end} / {total_rows} 行"
+            progress['batch_sizing'] = sizer.to_dict()
+            if total_rows is None:
+                # 沿用表结构的流式导入没有预先扫描，按已读取的字节估计进度
+                progress['percentage'] = int(30 + read_fraction * 70)
+                progress['message'] = f"已导入 {done} 行 ({read_fraction:.0%})"
+            else:
+                progress['percentage'] = int(30 + min(done / max(total_rows, 1), 1) * 70)
+                progress['message'] = f"已导入 {done} / {total_rows} 行"
             # 移除 time.sleep
 
+        if write_workers > 1:
+            # 等待写入线程写完队列中的批次并提交
+            writer.close()
+            record_commit(sum(writer.take_committed(), []))
+            writer = None
+
+        metrics.start_phase(PHASE_FINALIZE)
+        if job.is_cancelled():
+            progress['message'] = "导入已被用户停止"
+            progress['status'] = "已停止"
+            progress['can_stop'] = False
+            if records_since_commit > 0:
+                metrics.timed_commit(conn)
+            record_commit(uncommitted_ranges)
+            if cursor:
+                db_backend.restore_session(cursor, session_tuning)
+                if load_table != table_name:
+                    db_backend.drop_table(cursor, load_table)
+                    # 临时表已删除，检查点不再有效
+                    if checkpoint is not None:
+                        checkpoints.delete(job.id)
+                        checkpoint = None
+            return "导入已停止"
+
+        if streaming:
+            metrics.add_bytes_read(os.path.getsize(excel_path))
+
         # 确保最后的数据被提交
         if records_since_commit > 0:
-            conn.commit()
+            metrics.timed_commit(conn)
 
-        cursor.execute("SET unique_checks=1")
-        cursor.execute("SET foreign_key_checks=1")
-        cursor.execute("SET autocommit=1")
+        db_backend.restore_session(cursor, session_tuning)
+
+        # 数据全部写入后一次性建好二级索引，比导入过程中逐行维护索引快；使用临时表时再替换目标表。
+        # Parquet 后端在这一步把表写入文件
+        if indexes:
+            progress['message'] = "正在创建索引..."
+        elif load_table != table_name:
+            progress['message'] = "正在替换目标表..."
+        db_backend.finish_table(cursor, load_table, table_name, indexes, index_column_types)
 
         progress['percentage'] = 100
         elapsed_time = time.time() - start_time
         progress['message'] = f"导入完成！"
-        progress['status'] = f"一共导入 {total_rows} 条数据，用时 {elapsed_time:.2f} 秒。"
+        if row_filter:
+            progress['status'] = (f"一共读取 {done} 条数据，写入新增或变化的 {end} 条，"
+                                  f"跳过未变化的 {row_filter.skipped} 条，用时 {elapsed_time:.2f} 秒。")
+        else:
+            progress['status'] = f"一共导入 {done} 条数据，用时 {elapsed_time:.2f} 秒。"
+        if converter.failures:
+            # 无法按列类型转换的值已写入 NULL，列出各列的个数和示例
+            progress['conversion_failures'] = converter.failures
+            progress['status'] += f"其中 {converter.failed_values()} 个值无法按列类型转换，已写入 NULL。"
         return progress['message']
-    except mysql.connector.Error as err:
+    except DATABASE_ERRORS as err:
         progress['percentage'] = 0
-        progress['message'] = f"数据库连接失败: {err}"
+        progress['message'] = f"{'数据库连接失败' if backend == BACKEND_MARIADB else '数据库错误'}: {err}"
         progress['status'] = "导入失败"
         progress['can_stop'] = False
         return progress['message']
@@ -302,6 +510,27 @@ def excel2mariadb_with_progress(excel_path, username, password, host, database,
         progress['can_stop'] = False
         return progress['message']
     finally:
+        if profiler:
+            profiler.disable()
+            metrics.save_profile(profiler, job.id)
+        status = progress.get('status')
+        metrics.finish(JOB_FAILED if status == "导入失败" else JOB_STOPPED if status == "已停止" else JOB_FINISHED)
+
+        if isinstance(writer, ParallelWriter):
+            writer.abort()
+            if checkpoint is not None:
+                # 写入线程在最后一次记录之后可能还提交过批次
+                record_commit(sum(writer.take_committed(), []))
+
+        # 失败或停止时保留检查点以便继续导入，成功后删除
+        if checkpoint is not None:
+            if status in ("导入失败", "已停止"):
+                checkpoint['error'] = progress.get('message')
+                checkpoints.save(checkpoint)
+                progress['resumable'] = True
+            else:
+                checkpoints.delete(job.id)
+
         # 释放数据库资源
         progress['can_stop'] = False
         if cursor:
@@ -309,25 +538,19 @@ def excel2mariadb_with_progress(excel_path, username, password, host, database,
                 cursor.close()
             except:
                 pass
-        if conn and conn.is_connected():
+        if conn:
             try:
-                conn.close()
+                db_backend.close_connection(conn)
             except:
                 pass
-        
-        # 释放文件加载事件
-        try:
-            file_loaded_event.set()
-        except:
-            pass
-            
+        if db_backend:
+            db_backend.close()
+
         # 释放pandas和numpy相关资源
         try:
             del df
-            del batch
             del processed_batch
             del original_columns
-            del columns_definition
         except:
             pass
         
@@ -335,6 +558,43 @@ def excel2mariadb_with_progress(excel_path, username, password, host, database,
         import gc
         gc.collect()
 
+def excel2mariadb_sheets(excel_path, username, password, host, database, port, sheet_names=None,
+                         sheet_workers=DEFAULT_SHEET_WORKERS, job=None, **options):
+    """把工作簿中的多个工作表分别导入各自的表
+
+    sheet_names 为要导入的工作表名称列表，None 表示全部工作表。表名为 文件名_工作表名，
+    由 sheet_table_names 根据全部工作表生成，同一个工作表每次导入的表名都相同。
+    最多 sheet_workers 个工作表同时读取和写入，其余参数与 excel2mariadb_with_progress 相同。
+    XLSX 的共享字符串表只解析一次，交给各工作表的读取器；analysis_workers 由同时导入的工作表平分，
+    总的分析进程数不超过 CPU 核数。
+    """
+    if job is None:
+        job = ImportJob(os.path.basename(excel_path))
+    progress = job.progress
+    try:
+        all_sheets = list_sheets(excel_path)
+        if not all_sheets:
+            raise ValueError("CSV 文件没有工作表，请使用普通导入")
+        table_names = dict(zip(all_sheets, sheet_table_names(file_stem(excel_path), all_sheets)))
+        if sheet_names is None:
+            sheet_names = all_sheets
+        missing = [name for name in sheet_names if name not in table_names]
+        if missing:
+            raise ValueError(f"工作表不存在: {', '.join(missing)}")
+        options['analysis_workers'] = sheet_analysis_workers(options.get('analysis_workers'), sheet_workers,
+                                                             len(sheet_names))
+        if detect_file_type(excel_path) == 'xlsx':
+            options['shared_strings'] = xlsx_shared_strings(excel_path)
+    except Exception as e:
+        progress.update({'percentage': 0, 'message': f"发生错误：{str(e)}", 'status': "导入失败", 'can_stop': False})
+        return progress['message']
+
+    def import_sheet(sheet_name, table_name, job):
+        return excel2mariadb_with_progress(excel_path, username, password, host, database, port,
+                                           sheet_name=sheet_name, table_name=table_name, job=job, **options)
+
+    return import_sheets(job, [(name, table_names[name]) for name in sheet_names], import_sheet, sheet_workers)
+
 # 在文件顶部添加线程锁
 
 def load_config():
@@ -354,73 +614,363 @@ def save_config(config):
     except Exception as e:
         return f"保存配置文件失败: {str(e)}"
 
+# 导入任务调度器，并发数可在 config.json 中通过 max_concurrent_jobs 配置
+job_manager = JobManager(load_config().get('max_concurrent_jobs', DEFAULT_MAX_CONCURRENT_JOBS))
+# 解析结果和列类型缓存，可在 config.json 中通过 cache_dir、cache_max_bytes 配置，cache_max_bytes 为 0 时关闭
+import_cache = ImportCache(load_config().get('cache_dir', DEFAULT_CACHE_DIR),
+                           load_config().get('cache_max_bytes', DEFAULT_CACHE_MAX_BYTES))
+# 导入检查点，可在 config.json 中通过 checkpoint_dir 配置保存目录
+checkpoint_store = CheckpointStore(load_config().get('checkpoint_dir', DEFAULT_CHECKPOINT_DIR))
+# 防止同一个检查点同时被继续两次
+resume_lock = threading.Lock()
+# 上传文件的大小上限（字节），可在 config.json 中通过 max_upload_bytes 配置，默认不限制
+app.config['MAX_CONTENT_LENGTH'] = load_config().get('max_upload_bytes')
+# 数据库连接参数，开始导入时必须提供，并保存到 config.json
+DB_FIELDS = ['host', 'username', 'password', 'database', 'port']
+# 本地写入后端（SQLite、DuckDB、Parquet）的数据库文件目录，可在 config.json 中通过 local_db_dir 配置
+LOCAL_DB_DIR = load_config().get('local_db_dir', DEFAULT_LOCAL_DB_DIR)
+
+def form_flag(form, name):
+    """表单中的复选框，API 调用时也接受 1、true、yes"""
+    return str(form.get(name, '')).lower() in ('on', '1', 'true', 'yes')
+
+def excel_file_path(excel_file_name):
+    """返回 EXCEL_DIR 中文件的路径，文件名不合法或文件不存在时抛出 ValueError"""
+    # 文件名安全处理
+    excel_file_name = secure_filename(excel_file_name or '')
+    if not excel_file_name:
+        raise ValueError("请选择 Excel 文件")
+
+    excel_path = os.path.abspath(os.path.join(EXCEL_DIR, excel_file_name))
+    if not os.path.realpath(excel_path).startswith(os.path.realpath(EXCEL_DIR)):
+        raise ValueError("非法文件路径")
+    if not os.path.exists(excel_path) or not os.path.isfile(excel_path):
+        raise ValueError(f"文件 {excel_file_name} 不存在或不是有效文件")
+    return excel_path
+
+def submit_import(form, excel_file_name):
+    """按表单参数校验并提交一个导入任务，返回任务；参数不合法时抛出 ValueError"""
+    excel_path = excel_file_path(excel_file_name)
+    excel_file_name = os.path.basename(excel_path)
+
+    # 写入后端：MariaDB 需要连接参数，本地后端只需要数据库文件名
+    backend = form.get('backend') or BACKEND_MARIADB
+    if backend not in BACKENDS:
+        raise ValueError(f"不支持的写入后端: {backend}，可选值为 {', '.join(BACKENDS)}")
+    local = backend != BACKEND_MARIADB
+
+    # 端口号验证
+    port = None
+    if not local:
+        try:
+            port = int(form.get('port') or '')
+        except ValueError:
+            raise ValueError("端口号必须是有效的数字")
+        if not (0 < port < 65536):
+            raise ValueError("端口号必须在1-65535之间")
+
+    # 并行写入连接数验证
+    try:
+        write_workers = int(form.get('write_workers') or 1)
+    except ValueError:
+        raise ValueError("并行写入连接数必须是有效的数字")
+    if not (1 <= write_workers <= 32):
+        raise ValueError("并行写入连接数必须在1-32之间")
+
+    # 导入方式验证，按键更新和差异导入需要键列
+    import_mode = form.get('import_mode') or IMPORT_MODE_REPLACE
+    if import_mode not in IMPORT_MODES:
+        raise ValueError(f"不支持的导入方式: {import_mode}")
+    key_columns = parse_column_list(form.get('key_columns'))
+    if import_mode in KEYED_IMPORT_MODES and not key_columns:
+        raise ValueError("按键更新和差异导入需要填写键列")
+
+    # 表结构选项：主键、导入完成后创建的二级索引和表选项
+    table_options = validate_table_options({
+        'engine': form.get('engine'),
+        'row_format': form.get('row_format'),
+        'compression': form.get('compression')
+    })
+
+    config = load_config()  # 保留配置文件中的其他选项
+    if local:
+        # 本地后端不使用连接参数，也不覆盖保存的 MariaDB 连接参数
+        connection = {'username': '', 'password': '', 'host': '', 'port': '',
+                      'database': local_database_path(LOCAL_DB_DIR, backend, form.get('database'))}
+    else:
+        # 验证数据库参数
+        missing_fields = [field for field in DB_FIELDS if not form.get(field)]
+        if missing_fields:
+            raise ValueError(f"请填写以下必填字段: {', '.join(missing_fields)}")
+        config.update({field: form.get(field) for field in DB_FIELDS})
+        save_config(config)
+        connection = dict(config, port=str(port))
+
+    # 工作表：留空只导入第一个工作表，* 导入全部，否则为逗号分隔的工作表名
+    sheets = (form.get('sheets') or '').strip()
+    if not sheets:
+        target, sheet_kwargs = excel2mariadb_with_progress, {}
+    else:
+        selected = None if sheets == '*' else [name.strip() for name in sheets.split(',') if name.strip()]
+        target = excel2mariadb_sheets
+        sheet_kwargs = dict(sheet_names=selected,
+                            sheet_workers=config.get('sheet_workers', DEFAULT_SHEET_WORKERS))
+
+    # 每次导入都是一个独立的任务，拥有自己的进度和停止标记
+    return job_manager.submit(
+        excel_file_name,
+        target,
+        excel_path, connection['username'], connection['password'],
+        connection['host'], connection['database'], connection['port'],
+        **sheet_kwargs,
+        backend=backend,
+        streaming=form_flag(form, 'streaming'),
+        sample_size=config.get('type_sample_size', DEFAULT_SAMPLE_SIZE),
+        analysis_workers=config.get('analysis_workers'),
+        write_method=form.get('write_method') or WRITE_METHOD_EXECUTEMANY,
+        write_workers=write_workers,
+        use_staging=form_flag(form, 'use_staging'),
+        import_mode=import_mode,
+        key_columns=key_columns or None,
+        primary_key=parse_column_list(form.get('primary_key')) or None,
+        indexes=parse_indexes(form.get('indexes')),
+        table_options=table_options,
+        bulk_tuning=form_flag(form, 'bulk_tuning'),
+        cache=import_cache,
+        checkpoints=checkpoint_store,
+        csv_engine=config.get('csv_engine', CSV_ENGINE_C),
+        profile=form_flag(form, 'profile')
+    )
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
         try:
-            # 文件名安全处理
-            excel_file_name = secure_filename(request.form.get('excel_file', ''))
-            if not excel_file_name:
-                return "请选择 Excel 文件"
-
-            excel_path = os.path.abspath(os.path.join(EXCEL_DIR, excel_file_name))
-            if not os.path.realpath(excel_path).startswith(os.path.realpath(EXCEL_DIR)):
-                return "非法文件路径"
-            if not os.path.exists(excel_path) or not os.path.isfile(excel_path):
-                return f"文件 {excel_file_name} 不存在或不是有效文件"
-
-            # 端口号验证
-            try:
-                port = int(request.form.get('port', ''))
-                if not (0 < port < 65536):
-                    return "端口号必须在1-65535之间"
-            except ValueError:
-                return "端口号必须是有效的数字"
-
-            # 验证数据库参数
-            required_fields = ['host', 'username', 'password', 'database', 'port']
-            missing_fields = [field for field in required_fields if not request.form.get(field)]
-            if missing_fields:
-                return f"请填写以下必填字段: {', '.join(missing_fields)}"
-
-            config = {field: request.form.get(field) for field in required_fields}
-            save_config(config)
-
-            # 重置导入状态
-            # 使用线程锁保护全局变量
-            with progress_lock:
-                global import_flag, progress
-                import_flag = False
-                progress = {'percentage': 0, 'message': '', 'status': '', 'can_stop': True}
-
-            thread = threading.Thread(
-                target=excel2mariadb_with_progress,
-                args=(excel_path, config['username'], config['password'],
-                      config['host'], config['database'], str(port)),
-                daemon=True  # 设置为守护线程
-            )
-            thread.start()
-
-            return redirect(url_for('progress_page'))
+            job = submit_import(request.form, request.form.get('excel_file', ''))
+            return redirect(url_for('progress_page', job_id=job.id))
+        except ValueError as e:
+            return str(e)
         except Exception as e:
             app.logger.error(f"导入过程发生错误: {str(e)}", exc_info=True)
             return f"发生错误: {str(e)}"
 
     try:
         config = load_config()
-        file_list = os.listdir(EXCEL_DIR)
-        return render_template('index.html', config=config, file_list=file_list)
+        # 以 . 开头的是正在上传的临时文件
+        file_list = [name for name in os.listdir(EXCEL_DIR) if not name.startswith('.')]
+        return render_template('index.html', config=config, file_list=file_list,
+                               checkpoints=checkpoint_store.list(), engines=ENGINES,
+                               row_formats=ROW_FORMATS)
     except Exception as e:
         app.logger.error(f"加载页面时发生错误: {str(e)}", exc_info=True)
         return "加载页面时发生错误，请检查服务器日志"
 
 @app.route('/progress')
 def progress_page():
-    return render_template('progress.html')
+    job_id = request.args.get('job_id')
+    if not job_id:
+        job = job_manager.latest()
+        job_id = job.id if job else ''
+    return render_template('progress.html', job_id=job_id)
 
 @app.route('/progress_data')
 def progress_data():
-    return jsonify(progress)
+    """兼容旧接口：返回最近一个任务的进度"""
+    job = job_manager.latest()
+    if job is None:
+        return jsonify({'percentage': 0, 'message': '', 'status': '', 'can_stop': False})
+    return jsonify(job.to_dict())
+
+@app.route('/progress_data/<job_id>')
+def job_progress_data(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/progress_stream/<job_id>')
+def progress_stream(job_id):
+    """以 Server-Sent Events 推送任务进度，只在进度变化时发送，任务结束后关闭连接"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+
+    def events():
+        version = -1
+        while True:
+            latest = job.wait_for_change(version, PROGRESS_STREAM_KEEPALIVE)
+            if latest == version:
+                yield ": keepalive\n\n"
+                continue
+            version = latest
+            # 先判断是否结束再取快照，保证最后一次推送包含任务的最终状态
+            done = job.is_done()
+            yield f"data: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+            if done:
+                return
+            # 合并推送间隔内的连续变化
+            time.sleep(PROGRESS_STREAM_INTERVAL)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/job_report/<job_id>')
+def job_report(job_id):
+    """返回任务的计时报告（JSON）"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    report = job.metrics.report() if job.metrics else None
+    result = {'job_id': job.id, 'file_name': job.file_name, 'state': job.state, 'report': report}
+    if job.children:
+        result['sheets'] = [{
+            'sheet': sheet_name,
+            'table': table_name,
+            'state': child.state,
+            'report': child.metrics.report() if child.metrics else None
+        } for sheet_name, table_name, child in job.children]
+    return jsonify(result)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """以 Prometheus 文本格式输出累计指标"""
+    job_states = {}
+    for job in job_manager.list_jobs():
+        job_states[job.state] = job_states.get(job.state, 0) + 1
+    return Response(import_metrics.render(job_states), mimetype='text/plain; version=0.0.4')
+
+@app.route('/jobs')
+def list_jobs():
+    """列出所有任务及其状态"""
+    return jsonify([job.to_dict() for job in job_manager.list_jobs()])
+
+@app.route('/stop_import/<job_id>', methods=['POST'])
+def stop_import(job_id):
+    if not job_manager.cancel(job_id):
+        return jsonify({'error': '任务不存在'}), 404
+    return jsonify({'job_id': job_id, 'stopping': True})
+
+@app.route('/checkpoints')
+def list_checkpoints():
+    """列出可以继续的导入（失败或停止后保留的检查点）"""
+    return jsonify(checkpoint_store.list())
+
+@app.route('/resume_import/<job_id>', methods=['POST'])
+def resume_import(job_id):
+    """从任务的检查点继续导入，返回新任务的 ID；数据库密码使用 config.json 中保存的密码"""
+    checkpoint = checkpoint_store.load(job_id)
+    if checkpoint is None:
+        return jsonify({'error': '检查点不存在'}), 404
+    if not os.path.isfile(checkpoint['file_path']):
+        return jsonify({'error': f"文件 {checkpoint['file_name']} 已不存在"}), 409
+    connection = checkpoint['connection']
+    with resume_lock:
+        # 旧检查点在新任务写入自己的检查点后才删除，新任务提前失败时仍可再次继续
+        if any(other.resumed_from == job_id and not other.is_done() for other in job_manager.list_jobs()):
+            return jsonify({'error': '该导入已在继续中'}), 409
+        job = job_manager.submit(
+            checkpoint['file_name'],
+            excel2mariadb_with_progress,
+            checkpoint['file_path'], connection['username'], load_config().get('password', ''),
+            connection['host'], connection['database'], connection['port'],
+            sheet_name=checkpoint['sheet_name'],
+            table_name=checkpoint['table_name'],
+            cache=import_cache,
+            checkpoints=checkpoint_store,
+            resume=checkpoint,
+            **checkpoint['options']
+        )
+        job.resumed_from = job_id
+    return jsonify({'job_id': job.id, 'progress_url': url_for('progress_page', job_id=job.id)})
+
+@app.route('/upload', methods=['POST'])
+def upload_file():
+    """上传文件到 EXCEL_DIR，start 为 1 时上传完成后立即开始导入
+
+    文件可以作为 multipart 表单的 file 字段上传，也可以直接作为请求体上传，文件名由 filename 参数指定，
+    后者不经过表单解析，数据直接按块写入磁盘。开始导入的参数与首页表单相同，可以放在表单或查询参数中，
+    未提供的数据库连接参数使用 config.json 中保存的值。
+    """
+    try:
+        # 先读取请求体，再读取表单参数
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('file')
+            if upload is None:
+                raise ValueError("缺少上传的文件（file 字段）")
+            file_name, stream = upload.filename, upload.stream
+        else:
+            file_name, stream = request.args.get('filename'), request.stream
+        file_name = upload_file_name(file_name)
+        _, size = save_stream(stream, EXCEL_DIR, file_name)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    result = {'file': file_name, 'size': size}
+
+    config = load_config()
+    params = {field: config[field] for field in DB_FIELDS if config.get(field)}
+    params.update(request.args.to_dict())
+    params.update(request.form.to_dict())
+    if form_flag(params, 'start'):
+        try:
+            job = submit_import(params, file_name)
+        except ValueError as e:
+            # 文件已经保存，可以修正参数后在首页开始导入
+            return jsonify(dict(result, error=str(e))), 400
+        except Exception as e:
+            app.logger.error(f"开始导入失败: {str(e)}", exc_info=True)
+            return jsonify(dict(result, error=f"发生错误: {str(e)}")), 500
+        result.update(job_id=job.id, progress_url=url_for('progress_page', job_id=job.id))
+    return jsonify(result), 201
+
+@app.route('/preview')
+def preview():
+    """预览导入将要创建的表结构、各列类型的置信度、行大小和预计耗时
+
+    只通过流式读取器读取 rows 行（sample=random 时为随机抽取的行），不连接数据库，也不修改已有的表。
+    建表语句按 backend 指定的写入后端生成；还没有导入过时按该后端的默认写入速度粗略估计耗时。
+    """
+    try:
+        excel_path = excel_file_path(request.args.get('file'))
+        try:
+            rows = int(request.args.get('rows') or PREVIEW_ROWS)
+        except ValueError:
+            raise ValueError("预览行数必须是有效的数字")
+        if not (1 <= rows <= MAX_PREVIEW_ROWS):
+            raise ValueError(f"预览行数必须在1-{MAX_PREVIEW_ROWS}之间")
+        method = request.args.get('sample') or SAMPLE_HEAD
+        if method not in SAMPLE_METHODS:
+            raise ValueError(f"不支持的取样方式: {method}，可选值为 {', '.join(SAMPLE_METHODS)}")
+        backend = request.args.get('backend') or BACKEND_MARIADB
+        if backend not in BACKENDS:
+            raise ValueError(f"不支持的写入后端: {backend}，可选值为 {', '.join(BACKENDS)}")
+        table_options = validate_table_options({
+            'engine': request.args.get('engine'),
+            'row_format': request.args.get('row_format'),
+            'compression': request.args.get('compression')
+        })
+        # 指定工作表时表名与多工作表导入相同
+        sheet_name = request.args.get('sheet') or None
+        table_name = None
+        if sheet_name is not None:
+            all_sheets = list_sheets(excel_path)
+            if sheet_name not in all_sheets:
+                raise ValueError(f"工作表不存在: {sheet_name}")
+            table_name = dict(zip(all_sheets, sheet_table_names(file_stem(excel_path), all_sheets)))[sheet_name]
+        result = preview_file(excel_path, rows, method, sheet_name=sheet_name, table_name=table_name,
+                              primary_key=parse_column_list(request.args.get('primary_key')) or None,
+                              table_options=table_options,
+                              insert_rows_per_second=import_metrics.insert_rows_per_second(),
+                              default_write_rows_per_second=DEFAULT_WRITE_ROWS_PER_SECOND[backend],
+                              backend=ddl_backend(backend))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"预览失败: {str(e)}", exc_info=True)
+        return jsonify({'error': f"发生错误: {str(e)}"}), 500
+    return jsonify(result)
 
 @app.route('/refresh')
 def refresh_file_list():